@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class LookupCache:
+    """
+    Bounded LRU cache whose entries expire ttl_seconds after they were stored.
+    Instances created at module level live as long as the Lambda container,
+    so warm invocations reuse rows read by earlier ones. Safe to share
+    between the threads of bdfl.workers
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """Whether key has an unexpired entry, without counting a hit or miss or refreshing its recency"""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, key):
+        """Returns cached value for key or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def put(self, key, value, ttl_seconds=None):
+        """Stores value for key, expiring after ttl_seconds when given instead of the cache's ttl"""
+        with self._lock:
+            ttl_seconds = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries)
+        }
+
+
+# shared by every handler in the container, players are re-synced daily and franchises monthly
+lookup_cache = LookupCache(
+    ttl_seconds=float(os.getenv('LOOKUP_CACHE_TTL_SECONDS', 6 * 60 * 60)),
+    max_entries=int(os.getenv('LOOKUP_CACHE_MAX_ENTRIES', 5000))
+)
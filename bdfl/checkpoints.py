@@ -0,0 +1,29 @@
+from . import runtime
+
+CHECKPOINTS_TABLE = 'checkpoints'
+# how far back the first run without a checkpoint looks, one day plus the 15 min max lambda run time
+BOOTSTRAP_WINDOW_SECS = 87300
+
+
+def get_checkpoint(name):
+    """Returns the stored value of checkpoint name as an int, None if it was never set"""
+    item = runtime.storage().get(CHECKPOINTS_TABLE, name)
+
+    if item is None:
+        return None
+
+    return int(item['value'])
+
+def advance_checkpoint(name, value):
+    """
+    Moves checkpoint name forward to value in a single conditional write, returns False
+    without writing if the stored value is already at or past value
+    """
+    return runtime.storage().put_if_greater(
+        CHECKPOINTS_TABLE,
+        {
+            'name': name,
+            'value': int(value)
+        },
+        'value'
+    )
@@ -0,0 +1,102 @@
+from .lookups import entity_lookup as default_entity_lookup
+from . import pipeline
+
+
+class TransactionDispatcher:
+    """
+    Routes transactions to the stage registered for their type. Transactions
+    are read a chunk at a time, and before any stage sees a chunk every
+    franchise and player the stages will name is prefetched in one pass, so
+    all types share the same batched lookups. A stage takes a list of its
+    transactions, in feed order, and lazily yields messages, which stream on
+    chunk by chunk. A type registered with join has what its stage yields
+    collected over the whole feed and handed to join at the end, for types
+    whose new transactions go out together in one message, and when a later
+    chunk raises what was collected is still joined and yielded before the
+    error. Types without a stage are skipped
+    """
+
+    def __init__(self, entity_lookup=None, chunk_size: int = pipeline.PREFETCH_CHUNK_SIZE):
+        self._entity_lookup = entity_lookup if entity_lookup is not None else default_entity_lookup
+        self._chunk_size = chunk_size
+        self._handlers = []
+        self._handlers_by_type = {}
+
+    def register(self, transaction_types, stage, entity_ids=None, join=None):
+        """
+        Routes transaction_types, a type or a tuple of types handled together, to
+        stage. entity_ids takes one transaction and yields (table_name, id) pairs,
+        join takes everything stage yielded and returns the messages to publish
+        """
+        if isinstance(transaction_types, str):
+            transaction_types = (transaction_types,)
+
+        handler = (stage, entity_ids, join)
+        self._handlers.append(handler)
+
+        for transaction_type in transaction_types:
+            self._handlers_by_type[transaction_type] = handler
+
+    def handles(self, transaction_type):
+        return transaction_type in self._handlers_by_type
+
+    def dispatch(self, transactions):
+        """Returns all the messages stream yields for transactions"""
+        return list(self.stream(transactions))
+
+    def stream(self, transactions):
+        """
+        Yields the messages of each chunk of transactions as its stages produce
+        them, in registration order within a chunk, then the joined messages in
+        registration order
+        """
+        joined = {}
+
+        try:
+            for chunk in pipeline.chunks(transactions, self._chunk_size):
+                transactions_by_handler = {}
+
+                for transaction in chunk:
+                    handler = self._handlers_by_type.get(transaction.transaction_type)
+                    if handler is not None:
+                        transactions_by_handler.setdefault(handler, []).append(transaction)
+
+                self._prefetch(transactions_by_handler)
+
+                for handler in self._handlers:
+                    if handler in transactions_by_handler:
+                        stage, _, join = handler
+                        output = stage(transactions_by_handler[handler])
+
+                        if join is None:
+                            yield from output
+                        else:
+                            collected = joined.setdefault(handler, [])
+                            for message in output:
+                                collected.append(message)
+        except Exception:
+            # the lines collected so far were claimed already, a retry would not send them
+            yield from self._join(joined)
+            raise
+
+        yield from self._join(joined)
+
+    def _join(self, joined):
+        for handler in self._handlers:
+            if handler in joined:
+                _, _, join = handler
+                yield from join(joined[handler])
+
+    def _prefetch(self, transactions_by_handler):
+        ids_by_table = {}
+
+        for (_, entity_ids, _), handler_transactions in transactions_by_handler.items():
+            if entity_ids is None:
+                continue
+
+            for transaction in handler_transactions:
+                for table_name, primary_id in entity_ids(transaction):
+                    ids_by_table.setdefault(table_name, []).append(primary_id)
+
+        for table_name, ids in ids_by_table.items():
+            self._entity_lookup.prefetch(table_name, ids)
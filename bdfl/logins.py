@@ -0,0 +1,30 @@
+from . import runtime
+
+LOGINS_TABLE = 'logins'
+
+
+class StoredLogins:
+    """
+    Store for pymfl.auth.LoginCache that keeps MFL login cookies in the storage
+    backend, so a cold container reuses the login a previous one made
+    """
+
+    def get(self, key):
+        item = runtime.storage().get(LOGINS_TABLE, key)
+
+        if item is None:
+            return None
+
+        return {'cookie': item['cookie'], 'expires': int(item['expires'])}
+
+    def put(self, key, login):
+        """Keeps login unless a stored one expires later"""
+        runtime.storage().put_if_greater(
+            LOGINS_TABLE,
+            {
+                'key': key,
+                'cookie': login['cookie'],
+                'expires': int(login['expires'])
+            },
+            'expires'
+        )
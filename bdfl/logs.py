@@ -0,0 +1,12 @@
+"""
+Structured log records: each is a dict with a 'type' and is printed as one
+JSON line on stdout, which Lambda sends to CloudWatch Logs. Tracing emits
+span and latency records, metrics emits embedded metric format records, and
+readers such as bdfl.tracing's report pick the records by type
+"""
+import json
+
+
+def emit(record):
+    """Prints record, a dict with a 'type', as one JSON line"""
+    print(json.dumps(record))
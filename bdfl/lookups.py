@@ -0,0 +1,76 @@
+import os
+
+from .cache import lookup_cache
+from .snapshots import LookupSnapshots, lookup_snapshots
+from . import runtime
+
+
+class EntityLookup:
+    """
+    Resolves player and franchise ids to their stored rows. Ids are read from
+    the table's lookup snapshot when a fresh one is published, see
+    bdfl.snapshots, so most lookups cost no reads at all. The rest are loaded
+    with one batch_get per table (projected down to the fields notifications
+    use) and cached in the container-wide lookup_cache, so repeated field
+    lookups for the same id cost no extra reads, even across warm invocations
+    """
+    # ids without a row are cached briefly, a player added by the next sync should show up soon after
+    MISSING_TTL_SECONDS = float(os.getenv('LOOKUP_MISSING_TTL_SECONDS', 60))
+    TABLE_FIELDS = {
+        'players': ['name', 'position', 'team'],
+        'franchises': ['name']
+    }
+
+    def __init__(self, storage=None, cache=None, snapshots=None):
+        self._storage = storage
+        self._cache = cache if cache is not None else lookup_cache
+        if snapshots is None:
+            # snapshots come from the same storage as the rows they stand in for
+            snapshots = LookupSnapshots(storage) if storage is not None else lookup_snapshots
+        self._snapshots = snapshots
+
+    @property
+    def storage(self):
+        return self._storage if self._storage is not None else runtime.storage()
+
+    def clear(self):
+        self._cache.clear()
+
+    def prefetch(self, table_name, ids):
+        """Loads every id that is neither in the snapshot nor already cached in a single batch_get"""
+        snapshot = self._snapshots.get(table_name)
+        missing_ids = [
+            primary_id for primary_id in dict.fromkeys(ids)
+            if (snapshot is None or snapshot.get(primary_id) is None)
+            and (table_name, primary_id) not in self._cache
+        ]
+
+        if missing_ids:
+            self._batch_get(table_name, missing_ids)
+
+    def get_field(self, table_name, field, primary_id):
+        """Returns field of the row with primary_id, raises KeyError if the row or field does not exist"""
+        snapshot = self._snapshots.get(table_name)
+        item = snapshot.get(primary_id) if snapshot is not None else None
+
+        if item is None:
+            item = self._cache.get((table_name, primary_id))
+
+        if item is None:
+            item = self._batch_get(table_name, [primary_id])[primary_id]
+
+        return item[field]
+
+    def _batch_get(self, table_name, ids):
+        found = self.storage.batch_get(table_name, ids, self.TABLE_FIELDS.get(table_name))
+
+        # ids that come back without a row are cached as empty for a short while so they are not re-read
+        items = {primary_id: found.get(primary_id, {}) for primary_id in ids}
+
+        for primary_id, item in items.items():
+            self._cache.put((table_name, primary_id), item, None if item else self.MISSING_TTL_SECONDS)
+
+        return items
+
+
+entity_lookup = EntityLookup()
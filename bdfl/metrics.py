@@ -0,0 +1,214 @@
+"""
+Counts the calls each invocation makes to MFL, DynamoDB, SQS and GroupMe.
+The runtime's shared clients are instrumented when they are built, so every
+call through them is recorded in collector under (service, operation,
+resource): the API operation and table or queue for AWS, the HTTP method and
+endpoint for MFL and GroupMe. Handlers decorated with per_invocation start
+from an empty collector and emit one CloudWatch embedded metric format
+record, see bdfl.logs, when they return, which CloudWatch turns into metrics and which
+reads as plain JSON on stdout locally. Tests can read collector after a
+handler returns to hold it to a call budget
+"""
+import functools
+import os
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+from .logs import emit
+
+NAMESPACE = os.getenv('METRICS_NAMESPACE', 'BDFL')
+METRICS_RECORD = 'metrics'
+# CloudWatch takes up to 100 metrics from one record, the rest stay in it as plain fields
+MAX_EMF_METRICS = 100
+
+_STATS = [('calls', 'Count'), ('errors', 'Count'), ('milliseconds', 'Milliseconds'),
+          ('bytes_sent', 'Bytes'), ('bytes_received', 'Bytes')]
+
+
+class CallMetrics:
+    """Calls, errors, latency and bytes per (service, operation, resource), safe to record from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def record(self, service, operation, resource, seconds, bytes_sent=0, bytes_received=0, error=False):
+        with self._lock:
+            stats = self._stats.setdefault((service, operation, resource or ''), dict.fromkeys(
+                [name for name, _ in _STATS], 0
+            ))
+            stats['calls'] += 1
+            stats['errors'] += int(error)
+            stats['milliseconds'] += seconds * 1000
+            stats['bytes_sent'] += bytes_sent
+            stats['bytes_received'] += bytes_received
+
+    def calls(self, service=None, operation=None, resource=None):
+        """Number of recorded calls, of those matching service, operation and resource when they are given"""
+        return sum(
+            stats['calls'] for (call_service, call_operation, call_resource), stats in self.stats().items()
+            if service in (None, call_service) and operation in (None, call_operation) and resource in (None, call_resource)
+        )
+
+    def stats(self):
+        """{(service, operation, resource): {'calls', 'errors', 'milliseconds', 'bytes_sent', 'bytes_received'}}"""
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._stats.items()}
+
+    def emf_record(self, function_name, duration_secs=None, timestamp=None):
+        """
+        The embedded metric format record of everything recorded, with Function
+        as the only dimension: a total per service, then one metric per stat of
+        each (service, operation, resource) named service.operation.resource.stat
+        """
+        values = {}
+        totals = {}
+
+        for (service, operation, resource), stats in sorted(self.stats().items()):
+            prefix = '.'.join(part for part in (service, operation, resource) if part)
+            for name, unit in _STATS:
+                values[f'{prefix}.{name}'] = (round(stats[name], 1), unit)
+
+            total = totals.setdefault(service, {'calls': 0, 'milliseconds': 0})
+            total['calls'] += stats['calls']
+            total['milliseconds'] += stats['milliseconds']
+
+        metrics = {}
+        if duration_secs is not None:
+            metrics['duration.milliseconds'] = (round(duration_secs * 1000, 1), 'Milliseconds')
+        for service, total in sorted(totals.items()):
+            metrics[f'{service}.calls'] = (total['calls'], 'Count')
+            metrics[f'{service}.milliseconds'] = (round(total['milliseconds'], 1), 'Milliseconds')
+        metrics.update(values)
+
+        record = {
+            '_aws': {
+                'Timestamp': int((timestamp if timestamp is not None else time.time()) * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': NAMESPACE,
+                    'Dimensions': [['Function']],
+                    'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in list(metrics.items())[:MAX_EMF_METRICS]]
+                }]
+            },
+            'type': METRICS_RECORD,
+            'Function': function_name
+        }
+        record.update({name: value for name, (value, _) in metrics.items()})
+
+        return record
+
+
+def instrument_boto3(client, metrics=None):
+    """
+    Records each call client makes, with its operation and the table or queue
+    it names. Pass resource.meta.client for a boto3 resource
+    """
+    metrics = metrics if metrics is not None else collector
+    service = client.meta.service_model.service_name
+    service_id = client.meta.service_model.service_id.hyphenize()
+    events = client.meta.events
+
+    def before_parameter_build(params, context, **kwargs):
+        context['metrics_resource'] = _aws_resource(params)
+
+    def before_call(model, params, context, **kwargs):
+        context['metrics_operation'] = model.name
+        context['metrics_start'] = time.perf_counter()
+
+    def request_created(request, **kwargs):
+        # the serialized body, a dict of form fields before this for query protocol services such as SQS
+        request.context['metrics_bytes_sent'] = len(request.body or b'')
+
+    def record(context, http_response=None):
+        if 'metrics_start' not in context:
+            return
+        metrics.record(
+            service, context['metrics_operation'], context.get('metrics_resource'),
+            time.perf_counter() - context.pop('metrics_start'),
+            bytes_sent=context.get('metrics_bytes_sent', 0),
+            bytes_received=len(http_response.content or b'') if http_response is not None else 0,
+            error=http_response is None or http_response.status_code >= 400
+        )
+
+    def after_call(http_response, context, **kwargs):
+        record(context, http_response)
+
+    def after_call_error(context, **kwargs):
+        # the request itself failed, there is no response
+        record(context)
+
+    events.register(f'before-parameter-build.{service}', before_parameter_build)
+    events.register(f'before-call.{service}', before_call)
+    events.register(f'request-created.{service_id}', request_created)
+    events.register(f'after-call.{service}', after_call)
+    events.register(f'after-call-error.{service}', after_call_error)
+
+    return client
+
+def instrument_session(session, service, metrics=None):
+    """
+    Records each response session gets under service, with its method and
+    endpoint. Latency runs until the response headers arrive, and bytes
+    received come from Content-Length, so streamed bodies are not read here
+    """
+    metrics = metrics if metrics is not None else collector
+
+    def record_response(response, *args, **kwargs):
+        request = response.request
+        body = request.body or b''
+
+        metrics.record(
+            service, request.method, http_endpoint(request.url), response.elapsed.total_seconds(),
+            bytes_sent=len(body.encode('utf-8') if isinstance(body, str) else body),
+            bytes_received=int(response.headers.get('Content-Length') or 0),
+            error=response.status_code >= 400
+        )
+
+    session.hooks['response'].append(record_response)
+
+    return session
+
+def http_endpoint(url):
+    """MFL's export TYPE, or the url path without its leading year or API version: transactions, login, bots/post"""
+    parsed = urlparse(url)
+    export_type = parse_qs(parsed.query).get('TYPE')
+    if export_type:
+        return export_type[0]
+
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    if segments and (segments[0].isdigit() or (segments[0][:1] == 'v' and segments[0][1:].isdigit())):
+        segments = segments[1:]
+
+    return '/'.join(segments)
+
+def _aws_resource(params):
+    if 'TableName' in params:
+        return params['TableName']
+    if 'RequestItems' in params:
+        return ','.join(sorted(params['RequestItems']))
+    if 'QueueUrl' in params:
+        return params['QueueUrl'].rstrip('/').rsplit('/', 1)[-1]
+
+    return params.get('QueueName')
+
+def per_invocation(handler):
+    """Decorates a Lambda handler to record its calls from scratch and emit them as one metrics record"""
+    function_name = handler.__module__
+
+    @functools.wraps(handler)
+    def instrumented(event, context):
+        collector.reset()
+        start = time.perf_counter()
+        try:
+            return handler(event, context)
+        finally:
+            emit(collector.emf_record(function_name, time.perf_counter() - start))
+
+    return instrumented
+
+
+collector = CallMetrics()
@@ -0,0 +1,165 @@
+"""
+Lazy stages for notification flows, each takes an iterable and returns a
+generator so a flow is a chain of calls:
+
+    rows = mfl.iter_transactions('', 'TRADE')
+    trades = only_after(parse(rows, Transaction), checkpoint)
+    messages = store_new(prefetch(trades, entity_ids), create, store, format)
+    for results in publish(messages, publisher): ...
+
+Nothing runs until publish pulls, and at most a bounded number of items sit
+between two stages, so the first message reaches SQS while later rows are
+still being read from MFL
+"""
+import time
+from .lookups import entity_lookup
+from .tracing import span
+from .workers import imap_ordered
+
+# SendMessageBatch takes up to 10 messages
+PUBLISH_BATCH_SIZE = 10
+# a partial batch is sent once its first message has waited this long
+PUBLISH_MAX_WAIT_SECS = 0.5
+# entity ids are prefetched for this many items at a time, one batch_get per table. A chunk is
+# read in full before its first item moves on, so it is kept small enough not to hold up the first message
+PREFETCH_CHUNK_SIZE = 25
+
+
+def parse(rows, model):
+    """Yields model.from_json(row) for each raw MFL row"""
+    for row in rows:
+        yield model.from_json(row)
+
+def only_after(items, timestamp):
+    """Yields items with a timestamp after timestamp, all of them if timestamp is None"""
+    for item in items:
+        if timestamp is None or int(item.timestamp) > timestamp:
+            yield item
+
+def keep(items, kept):
+    """Yields items unchanged, appending each to the list kept, for steps that need all of them after the flow"""
+    for item in items:
+        kept.append(item)
+        yield item
+
+def chunks(items, size):
+    """Yields lists of up to size items"""
+    chunk = []
+
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+def prefetch(items, entity_ids, lookup=None, chunk_size: int = PREFETCH_CHUNK_SIZE):
+    """
+    Yields items unchanged, after loading every (table_name, id) entity_ids
+    yields for them in one batch_get per table and chunk_size items
+    """
+    lookup = lookup if lookup is not None else entity_lookup
+
+    for chunk in chunks(items, chunk_size):
+        ids_by_table = {}
+
+        for item in chunk:
+            for table_name, primary_id in entity_ids(item):
+                ids_by_table.setdefault(table_name, []).append(primary_id)
+
+        for table_name, ids in ids_by_table.items():
+            lookup.prefetch(table_name, ids)
+
+        yield from chunk
+
+def store_new(items, create, store, format_item, max_workers: int = None):
+    """
+    Yields format_item(create(item)) for the items whose created object store
+    accepts, store returns False for an item that was stored before. Each item
+    is created, claimed and formatted in one call on the worker pool, and
+    messages keep the order of items. When an item fails, or items raises,
+    the messages of the items claimed on other threads, before or after it,
+    are still yielded before the error so none that was claimed is dropped
+    """
+    def create_and_store(item):
+        created = create(item)
+        return format_item(created) if store(created) else None
+
+    for message in imap_ordered(create_and_store, items, max_workers, keep_done=True):
+        if message is not None:
+            yield message
+
+def joined(items, join):
+    """
+    Yields the messages join makes of all items, for flows that send their new
+    items together in one message. When items raises, the items read so far
+    are still joined and yielded before the error, as they were claimed already
+    """
+    collected = []
+
+    try:
+        for item in items:
+            collected.append(item)
+    except Exception:
+        yield from join(collected)
+        raise
+
+    yield from join(collected)
+
+def micro_batches(messages, size: int = PUBLISH_BATCH_SIZE, max_wait_secs: float = PUBLISH_MAX_WAIT_SECS):
+    """
+    Yields lists of up to size messages, a batch is cut early when its first
+    message has waited max_wait_secs by the time the next one arrives. When
+    messages raises, the partial batch is still yielded before the error
+    """
+    batch = []
+    started = None
+
+    try:
+        for message in messages:
+            if batch and time.monotonic() - started >= max_wait_secs:
+                yield batch
+                batch = []
+
+            if not batch:
+                started = time.monotonic()
+            batch.append(message)
+
+            if len(batch) == size:
+                yield batch
+                batch = []
+    except Exception:
+        # the messages were claimed already, they would not be sent again by a retry
+        if batch:
+            yield batch
+        raise
+
+    if batch:
+        yield batch
+
+def publish(messages, publisher, size: int = PUBLISH_BATCH_SIZE, max_wait_secs: float = PUBLISH_MAX_WAIT_SECS):
+    """Publishes messages in micro-batches as they become ready, yields the publisher's results of each one"""
+    for batch in micro_batches(messages, size, max_wait_secs):
+        with span('sqs.publish', messages=len(batch)):
+            results = publisher.publish(batch)
+        yield results
+
+def collect(batches_of_results):
+    """Flattens the batches publish yields into one list of results"""
+    return [result for results in batches_of_results for result in results]
+
+
+class LatestTimestamp:
+    """Stage that passes items through and remembers the latest timestamp among them, for checkpoints"""
+
+    def __init__(self):
+        self.value = None
+
+    def track(self, items):
+        for item in items:
+            timestamp = int(item.timestamp)
+            if self.value is None or timestamp > self.value:
+                self.value = timestamp
+            yield item
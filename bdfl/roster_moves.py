@@ -0,0 +1,144 @@
+from pymfl.models.transaction import FreeAgent
+from .lookups import entity_lookup
+from .tracing import oldest_trace, trace_context, traced
+from . import pipeline
+from . import runtime
+
+TRANSACTIONS_TABLE = 'transactions'
+FREE_AGENT_HEADER = '📝FREE AGENT MOVES📝\n'
+INJURED_RESERVE_HEADER = '🏥IR MOVES🏥\n'
+TAXI_SQUAD_HEADER = '🚕TAXI SQUAD MOVES🚕\n'
+
+
+def split_player_ids(transaction):
+    """Splits an 'ids|ids' transaction string, as FREE_AGENT, IR and TAXI use, into two lists of player ids"""
+    first, _, second = transaction.partition('|')
+
+    return (
+        [player_id for player_id in first.split(',') if player_id],
+        [player_id for player_id in second.split(',') if player_id]
+    )
+
+def roster_move_entity_ids(move):
+    """Yields (table_name, id) for the franchise and players a roster move message names"""
+
+    yield 'franchises', move.franchise_id
+
+    for player_ids in split_player_ids(move.transaction):
+        for player_id in player_ids:
+            yield 'players', player_id
+
+def format_player(player_id):
+    name = entity_lookup.get_field('players', 'name', player_id)
+    team = entity_lookup.get_field('players', 'team', player_id)
+    position = entity_lookup.get_field('players', 'position', player_id)
+
+    return f'{name}, {team} {position}'
+
+def format_players(player_ids):
+    return ' and '.join(format_player(player_id) for player_id in player_ids)
+
+def format_free_agent_move(move: FreeAgent):
+    moves = []
+    if move.added_player_ids:
+        moves.append(f'added {format_players(move.added_player_ids)}')
+    if move.dropped_player_ids:
+        moves.append(f'dropped {format_players(move.dropped_player_ids)}')
+
+    return ' and '.join(moves)
+
+def format_injured_reserve_move(move):
+    """IR transactions are 'activated_ids|deactivated_ids', players brought back from and moved to IR"""
+    activated, deactivated = split_player_ids(move.transaction)
+
+    moves = []
+    if deactivated:
+        moves.append(f'moved {format_players(deactivated)} to IR')
+    if activated:
+        moves.append(f'activated {format_players(activated)} from IR')
+
+    return ' and '.join(moves)
+
+def format_taxi_squad_move(move):
+    """TAXI transactions are 'promoted_ids|demoted_ids', players moved off and onto the taxi squad"""
+    promoted, demoted = split_player_ids(move.transaction)
+
+    moves = []
+    if promoted:
+        moves.append(f'promoted {format_players(promoted)} from the taxi squad')
+    if demoted:
+        moves.append(f'moved {format_players(demoted)} to the taxi squad')
+
+    return ' and '.join(moves)
+
+def create_roster_move_key(move):
+    return f'{move.transaction_type}-{move.timestamp}-{move.franchise_id}'
+
+def new_roster_move_lines(moves, format_move):
+    """
+    Lazily formats, stores and traces moves, yields the line of each move that
+    was new. Lines are looked up and moves claimed on the worker pool, see
+    pipeline.store_new
+    """
+    def create_line(move):
+        formatted_move = format_move(move)
+        if not formatted_move:
+            return move, None
+
+        franchise_name = entity_lookup.get_field('franchises', 'name', move.franchise_id)
+
+        return move, f'{franchise_name} {formatted_move}\n'
+
+    def store_line(move_and_line):
+        move, line = move_and_line
+        return line is not None and store_roster_move(move, line)
+
+    def trace_line(move_and_line):
+        move, line = move_and_line
+        return traced(line, trace_context(move.transaction_type, move.timestamp, move.franchise_id))
+
+    return pipeline.store_new(moves, create_line, store_line, trace_line)
+
+def join_roster_move_lines(lines, header):
+    """The lines as one message under header, an empty list without lines"""
+    lines = list(lines)
+
+    if not lines:
+        return []
+
+    return [traced('\n'.join([header] + lines), oldest_trace(lines))]
+
+def store_roster_move(move, message):
+    """
+    Inserts the move only if its key is not stored yet, in one conditional write so
+    overlapping invocations cannot both claim it. Returns True if the move was new
+    """
+
+    return runtime.storage().insert_if_absent(TRANSACTIONS_TABLE, {
+        'key': create_roster_move_key(move),
+        'type': move.transaction_type,
+        'timestamp': move.timestamp,
+        'franchise_id': move.franchise_id,
+        'raw_transaction': move.transaction,
+        'message': message
+    })
+
+# the stages getTransactions streams each type through, and the joins that make one message per type
+
+def new_free_agent_lines(moves):
+    return new_roster_move_lines(moves, format_free_agent_move)
+
+def new_injured_reserve_lines(moves):
+    return new_roster_move_lines(moves, format_injured_reserve_move)
+
+def new_taxi_squad_lines(moves):
+    return new_roster_move_lines(moves, format_taxi_squad_move)
+
+def join_free_agent_lines(lines):
+    return join_roster_move_lines(lines, FREE_AGENT_HEADER)
+
+def join_injured_reserve_lines(lines):
+    return join_roster_move_lines(lines, INJURED_RESERVE_HEADER)
+
+def join_taxi_squad_lines(lines):
+    return join_roster_move_lines(lines, TAXI_SQUAD_HEADER)
@@ -0,0 +1,93 @@
+import time
+from pymfl.models.league_rosters import LeagueRosters
+from pymfl.models.roster_entry import RosterEntry
+from . import runtime
+
+ROSTERS_TABLE = 'rosters'
+# past a lambda's max run time an index is reloaded, in case another container applied transactions since
+DEFAULT_MAX_AGE_SECS = 900
+
+
+class RosterIndex:
+    """
+    The league's LeagueRosters, loaded from the rosters table once and kept in
+    memory, so owner queries cost no API or storage calls. Processed
+    transactions are applied to it and only the players they moved are written
+    back. replace swaps in a fresh export and reports where the two disagreed
+    """
+
+    def __init__(self, storage=None, max_age: float = DEFAULT_MAX_AGE_SECS):
+        self._storage = storage
+        self._max_age = max_age
+        self._rosters = None
+        self._loaded_at = None
+
+    @property
+    def storage(self):
+        return self._storage if self._storage is not None else runtime.storage()
+
+    def clear(self):
+        self._rosters = None
+
+    def rosters(self):
+        """The current LeagueRosters, read from storage if it is not loaded or too old"""
+        if self._rosters is None or time.monotonic() - self._loaded_at > self._max_age:
+            self._rosters = LeagueRosters(
+                RosterEntry(item['id'], item['franchise_id'], item['status'], item.get('salary'), item.get('contract_year'))
+                for item in self.storage.scan(ROSTERS_TABLE)
+            )
+            self._loaded_at = time.monotonic()
+
+        return self._rosters
+
+    def owner(self, player_id):
+        """Returns the id of the franchise rostering player_id, None if it is a free agent"""
+        return self.rosters().owner(player_id)
+
+    def apply(self, transactions):
+        """Applies transactions oldest first and writes the players they moved, returns those player ids"""
+        rosters = self.rosters()
+        changed = set()
+
+        for transaction in sorted(transactions, key=lambda transaction: int(transaction.timestamp)):
+            changed |= rosters.apply(transaction)
+
+        self._write(rosters, changed)
+
+        return changed
+
+    def replace(self, fresh_rosters: LeagueRosters):
+        """
+        Makes fresh_rosters, built from a full rosters export, the index. Returns
+        the mismatches the stored index had, see LeagueRosters.diff, and writes
+        only those players
+        """
+        mismatches = self.rosters().diff(fresh_rosters)
+
+        self._write(fresh_rosters, mismatches.keys())
+        self._rosters = fresh_rosters
+        self._loaded_at = time.monotonic()
+
+        return mismatches
+
+    def _write(self, rosters, player_ids):
+        if not player_ids:
+            return
+
+        with self.storage.batch_writer(ROSTERS_TABLE) as batch:
+            for player_id in player_ids:
+                entry = rosters.get_entry(player_id)
+
+                if entry is None:
+                    batch.delete(player_id)
+                else:
+                    batch.put({
+                        'id': player_id,
+                        'franchise_id': entry.franchise_id,
+                        'status': entry.status,
+                        'salary': entry.salary,
+                        'contract_year': entry.contract_year
+                    })
+
+
+roster_index = RosterIndex()
@@ -0,0 +1,146 @@
+"""
+Clients shared by every handler in the container: the storage backend, the
+DynamoDB resource, the SQS client, the HTTP sessions for MFL and GroupMe and
+the MFL login cache.
+Each is only built, and boto3 and requests only imported, the first time a
+handler needs it, then kept for the life of the container so warm invocations
+reuse its open connections
+"""
+import os
+import threading
+
+# (connect, read) seconds, MFL's players export can take a while to generate
+MFL_TIMEOUT = (5, 30)
+GROUPME_TIMEOUT = (5, 10)
+AWS_CONNECT_TIMEOUT = 5
+AWS_READ_TIMEOUT = 10
+
+MFL_POOL_SIZE = int(os.getenv('MFL_POOL_SIZE', 4))
+GROUPME_POOL_SIZE = int(os.getenv('GROUPME_POOL_SIZE', 4))
+AWS_POOL_SIZE = int(os.getenv('AWS_POOL_SIZE', 10))
+
+# retries of failed connections only, a request that reached the server is not re-sent
+HTTP_CONNECT_RETRIES = 2
+
+# dynamodb, memory or sqlite, the sqlite database is kept at BDFL_SQLITE_PATH
+STORAGE_BACKEND = os.getenv('BDFL_STORAGE', 'dynamodb')
+SQLITE_PATH = os.getenv('BDFL_SQLITE_PATH', 'bdfl.db')
+
+# memory or storage, storage also keeps MFL logins in the storage backend for cold containers
+MFL_LOGIN_STORE = os.getenv('MFL_LOGIN_STORE', 'memory')
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def storage():
+    """The container's bdfl.storage.Storage, picked by STORAGE_BACKEND"""
+    return _shared('storage', _build_storage)
+
+def dynamodb():
+    """The container's DynamoDB service resource"""
+    def build():
+        import boto3
+        from .metrics import instrument_boto3
+
+        resource = boto3.resource('dynamodb', config=_aws_config())
+        instrument_boto3(resource.meta.client)
+        return resource
+
+    return _shared('dynamodb', build)
+
+def sqs():
+    """The container's SQS client"""
+    def build():
+        import boto3
+        from .metrics import instrument_boto3
+
+        return instrument_boto3(boto3.client('sqs', config=_aws_config()))
+
+    return _shared('sqs', build)
+
+def mfl_session():
+    """The container's requests.Session for MFL, pass it to MFL as session"""
+    return _shared('mfl', lambda: _http_session('mfl', MFL_POOL_SIZE, MFL_TIMEOUT))
+
+def groupme_session():
+    """The container's requests.Session for GroupMe, pass it to GroupMe as session"""
+    return _shared('groupme', lambda: _http_session('groupme', GROUPME_POOL_SIZE, GROUPME_TIMEOUT))
+
+def mfl_login_cache():
+    """The container's pymfl.auth.LoginCache, pass it to MFL as login_cache"""
+    def build():
+        from pymfl.auth import LoginCache
+
+        if MFL_LOGIN_STORE == 'storage':
+            from .logins import StoredLogins
+            return LoginCache(store=StoredLogins())
+
+        return LoginCache()
+
+    return _shared('mfl_logins', build)
+
+def reset():
+    """Drops the shared clients so the next call builds new ones from the current boto3 default session"""
+    for client in _clients.values():
+        if hasattr(client, 'close'):
+            client.close()
+
+    _clients.clear()
+
+def _shared(name, build):
+    """Returns the client kept under name, built once even when threads ask for it at the same time"""
+    client = _clients.get(name)
+
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = build()
+
+    return client
+
+def _build_storage():
+    from . import storage as backends
+
+    if STORAGE_BACKEND == 'memory':
+        return backends.MemoryStorage()
+    if STORAGE_BACKEND == 'sqlite':
+        return backends.SQLiteStorage(SQLITE_PATH)
+    if STORAGE_BACKEND == 'dynamodb':
+        return backends.DynamoDBStorage()
+
+    raise ValueError(f'Unknown BDFL_STORAGE: {STORAGE_BACKEND}')
+
+def _aws_config():
+    from botocore.config import Config
+
+    return Config(
+        connect_timeout=AWS_CONNECT_TIMEOUT,
+        read_timeout=AWS_READ_TIMEOUT,
+        max_pool_connections=AWS_POOL_SIZE,
+        retries={'max_attempts': 3}
+    )
+
+def _http_session(service, pool_size, timeout):
+    import requests
+    from .metrics import instrument_session
+
+    class TimeoutHTTPAdapter(requests.adapters.HTTPAdapter):
+        """HTTPAdapter that applies timeout to requests made without one"""
+
+        def send(self, request, **kwargs):
+            if kwargs.get('timeout') is None:
+                kwargs['timeout'] = timeout
+            return super().send(request, **kwargs)
+
+    session = requests.Session()
+
+    for prefix in ('http://', 'https://'):
+        session.mount(prefix, TimeoutHTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=requests.adapters.Retry(total=HTTP_CONNECT_RETRIES, read=False, redirect=False)
+        ))
+
+    return instrument_session(session, service)
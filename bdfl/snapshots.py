@@ -0,0 +1,202 @@
+import base64
+import binascii
+import bisect
+import struct
+import time
+import zlib
+from . import runtime
+
+SNAPSHOTS_TABLE = 'snapshots'
+# a snapshot older than this is ignored and lookups go to the table, players sync daily and franchises monthly
+MAX_AGE_SECS = {
+    'players': 2 * 86400,
+    'franchises': 32 * 86400
+}
+# how long a container keeps a loaded snapshot before checking storage for a newer one
+RELOAD_SECS = 3600
+
+FIELD_SEPARATOR = '\x1f'
+# what an unreadable snapshot raises: bad base64, zlib stream or header, or an item without data
+_DECODE_ERRORS = (binascii.Error, zlib.error, struct.error, ValueError, KeyError)
+
+
+class LookupSnapshot:
+    """
+    Read-only copy of a table's lookup fields packed into one buffer, searched
+    in place so loading it costs no parsing:
+
+        header   magic, format, built_at, record count, id width, fields
+        ids      record count ids, NUL padded to id width, sorted
+        offsets  record count + 1 offsets into values
+        values   each record's field values joined by FIELD_SEPARATOR, utf-8
+
+    get finds an id with a binary search over the ids, O(log n)
+    """
+    MAGIC = b'BDFLSNAP'
+    FORMAT = 1
+    _HEADER = struct.Struct('<8sHQIH')
+    _OFFSET = struct.Struct('<I')
+
+    def __init__(self, data: bytes):
+        buffer = memoryview(data)
+        magic, snapshot_format, self.built_at, self._count, self._id_width = self._HEADER.unpack_from(buffer)
+
+        if magic != self.MAGIC or snapshot_format != self.FORMAT:
+            raise ValueError('Not a lookup snapshot of a known format')
+
+        position = self._HEADER.size
+        (fields_size,) = struct.unpack_from('<H', buffer, position)
+        position += 2
+        self.fields = bytes(buffer[position:position + fields_size]).decode('utf-8').split(FIELD_SEPARATOR)
+        position += fields_size
+
+        self._ids = _FixedWidthColumn(buffer[position:position + self._count * self._id_width], self._id_width)
+        position += self._count * self._id_width
+        self._offsets = buffer[position:position + (self._count + 1) * self._OFFSET.size]
+        position += len(self._offsets)
+        self._values = buffer[position:]
+
+    def __len__(self):
+        return self._count
+
+    def get(self, primary_id):
+        """Returns {field: value} for primary_id, None if it is not in the snapshot"""
+        key = primary_id.encode('utf-8')
+        if len(key) > self._id_width:
+            return None
+
+        key = key.ljust(self._id_width, b'\0')
+        index = bisect.bisect_left(self._ids, key)
+
+        if index == self._count or self._ids[index] != key:
+            return None
+
+        return self._record(index)
+
+    def items(self):
+        """Yields (id, {field: value}) for every record, in id order"""
+        for index in range(self._count):
+            yield self._ids[index].rstrip(b'\0').decode('utf-8'), self._record(index)
+
+    def _record(self, index):
+        (start,) = self._OFFSET.unpack_from(self._offsets, index * self._OFFSET.size)
+        (end,) = self._OFFSET.unpack_from(self._offsets, (index + 1) * self._OFFSET.size)
+        values = bytes(self._values[start:end]).decode('utf-8').split(FIELD_SEPARATOR)
+
+        return dict(zip(self.fields, values))
+
+    @classmethod
+    def pack(cls, items, key_name, fields, built_at):
+        """Packs items, dicts with key_name and fields, into the snapshot format"""
+        records = sorted(
+            (str(item[key_name]).encode('utf-8'), FIELD_SEPARATOR.join(str(item.get(field, '')) for field in fields).encode('utf-8'))
+            for item in items
+        )
+        id_width = max((len(primary_id) for primary_id, _ in records), default=0)
+        field_names = FIELD_SEPARATOR.join(fields).encode('utf-8')
+
+        parts = [
+            cls._HEADER.pack(cls.MAGIC, cls.FORMAT, int(built_at), len(records), id_width),
+            struct.pack('<H', len(field_names)),
+            field_names,
+            b''.join(primary_id.ljust(id_width, b'\0') for primary_id, _ in records)
+        ]
+
+        offset = 0
+        offsets = [cls._OFFSET.pack(0)]
+        for _, values in records:
+            offset += len(values)
+            offsets.append(cls._OFFSET.pack(offset))
+
+        parts += offsets
+        parts += [values for _, values in records]
+
+        return b''.join(parts)
+
+
+class _FixedWidthColumn:
+    """Sequence view of fixed width byte strings, for bisect"""
+
+    def __init__(self, buffer, width):
+        self._buffer = buffer
+        self._width = width
+
+    def __len__(self):
+        return len(self._buffer) // self._width if self._width else 0
+
+    def __getitem__(self, index):
+        return bytes(self._buffer[index * self._width:(index + 1) * self._width])
+
+
+class LookupSnapshots:
+    """
+    Publishes and loads the lookup snapshot of each table through the storage
+    backend. A snapshot is one compressed item in the snapshots table, so a
+    cold container reads a whole table with a single get. get returns None
+    for a snapshot that is missing, unreadable or older than MAX_AGE_SECS, and
+    callers then read the table itself
+    """
+
+    def __init__(self, storage=None, reload_secs: float = RELOAD_SECS):
+        self._storage = storage
+        self._reload_secs = reload_secs
+        self._snapshots = {}
+
+    @property
+    def storage(self):
+        return self._storage if self._storage is not None else runtime.storage()
+
+    def clear(self):
+        self._snapshots = {}
+
+    def get(self, table_name):
+        """Returns the table's LookupSnapshot, None if there is no fresh one"""
+        loaded = self._snapshots.get(table_name)
+
+        if loaded is None or time.monotonic() - loaded[0] > self._reload_secs:
+            loaded = (time.monotonic(), self.stored(table_name))
+            self._snapshots[table_name] = loaded
+
+        snapshot = loaded[1]
+        if snapshot is None or time.time() - snapshot.built_at > MAX_AGE_SECS.get(table_name, 0):
+            return None
+
+        return snapshot
+
+    def publish(self, table_name, items, key_name, fields, built_at=None):
+        """Packs and stores a snapshot of items, unless a newer one is stored already. Returns True if stored"""
+        built_at = int(built_at if built_at is not None else time.time())
+        data = LookupSnapshot.pack(items, key_name, fields, built_at)
+
+        stored = self.storage.put_if_greater(
+            SNAPSHOTS_TABLE,
+            {
+                'name': table_name,
+                'version': built_at,
+                'data': base64.b64encode(zlib.compress(data)).decode('ascii')
+            },
+            'version'
+        )
+
+        if stored:
+            self._snapshots[table_name] = (time.monotonic(), LookupSnapshot(data))
+
+        return stored
+
+    def stored(self, table_name):
+        """Reads the table's stored LookupSnapshot however old it is, None if there is none or it is unreadable"""
+        storage = self.storage
+
+        try:
+            item = storage.get(SNAPSHOTS_TABLE, table_name)
+            if item is None:
+                return None
+
+            return LookupSnapshot(zlib.decompress(base64.b64decode(item['data'])))
+        except _DECODE_ERRORS + storage.errors as e:
+            # a snapshot is only an optimization, lookups still work from the table without one
+            print(f'lookup snapshot {table_name} not loaded: {type(e).__name__}: {e}')
+            return None
+
+
+lookup_snapshots = LookupSnapshots()
@@ -0,0 +1,92 @@
+import os
+import time
+from . import runtime
+from .tracing import message_attributes, trace_of
+
+
+class SQSPublisher:
+    """
+    Publishes messages to an SQS queue in SendMessageBatch calls of up to 10.
+    The client and queue url are resolved once and reused for the life of the
+    container, and passing queue_url in spares a cold start the GetQueueUrl
+    call. Entries SQS rejects are retried on their own, except those SQS
+    marks as the sender's fault, which would fail again. A TracedMessage is
+    sent with its trace context, stamped with the send time, as message
+    attributes
+    """
+    MAX_BATCH_SIZE = 10
+    MAX_RETRIES = 3
+
+    def __init__(self, queue_name, sqs_client=None, queue_url=None):
+        self.queue_name = queue_name
+        self._sqs_client = sqs_client
+        self._queue_url = queue_url
+
+    @property
+    def sqs_client(self):
+        return self._sqs_client if self._sqs_client is not None else runtime.sqs()
+
+    @property
+    def queue_url(self):
+        if self._queue_url is None:
+            self._queue_url = self.sqs_client.get_queue_url(QueueName=self.queue_name)['QueueUrl']
+
+        return self._queue_url
+
+    def publish(self, messages):
+        """
+        Sends messages and returns one result per message in the same order:
+        {'message': message, 'message_id': id or None, 'error': None or the reason it was not sent}
+        """
+        results = [{'message': message, 'message_id': None, 'error': None} for message in messages]
+
+        for start in range(0, len(results), self.MAX_BATCH_SIZE):
+            self._send_batch(results[start:start + self.MAX_BATCH_SIZE], start)
+
+        return results
+
+    def _send_batch(self, results, offset):
+        pending = {str(offset + i): result for i, result in enumerate(results)}
+        retries = 0
+
+        while pending:
+            response = self.sqs_client.send_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[self._entry(entry_id, result['message']) for entry_id, result in pending.items()]
+            )
+
+            for success in response.get('Successful', []):
+                result = pending.pop(success['Id'])
+                result['message_id'] = success['MessageId']
+                result['error'] = None
+
+            for failure in response.get('Failed', []):
+                result = pending[failure['Id']]
+                result['error'] = f"{failure['Code']}: {failure.get('Message', '')}"
+
+                if failure.get('SenderFault'):
+                    del pending[failure['Id']]
+
+            if pending:
+                if retries == self.MAX_RETRIES:
+                    for result in pending.values():
+                        result['error'] = result['error'] or 'Not sent'
+                    return
+                time.sleep(0.1 * 2 ** retries)
+                retries += 1
+
+    def _entry(self, entry_id, message):
+        entry = {'Id': entry_id, 'MessageBody': message}
+
+        trace = trace_of(message)
+        if trace is not None:
+            entry['MessageAttributes'] = message_attributes(trace, time.time())
+
+        return entry
+
+
+def all_published(results):
+    return all(result['error'] is None for result in results)
+
+
+publisher = SQSPublisher('BDFLMessageQueue', queue_url=os.getenv('BDFL_QUEUE_URL'))
@@ -0,0 +1,441 @@
+import abc
+import json
+import threading
+import time
+from . import runtime
+
+# the attribute each table is keyed on
+TABLE_KEYS = {
+    'players': 'id',
+    'franchises': 'id',
+    'trades': 'timestamp',
+    'waivers': 'key',
+    'transactions': 'key',
+    'checkpoints': 'name',
+    'logins': 'key',
+    'rosters': 'id',
+    'injuries': 'id',
+    'snapshots': 'name'
+}
+
+
+class Storage(abc.ABC):
+    """
+    Interface of the tables the handlers read and write. Items are dicts that
+    include the table's key attribute, see TABLE_KEYS. Implementations:
+    DynamoDBStorage, MemoryStorage and SQLiteStorage
+    """
+    # the exceptions the backend raises for a failed operation, for callers that can do without it
+    errors = ()
+
+    @abc.abstractmethod
+    def get(self, table_name, key):
+        """Returns the item with key, None if there is none"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def batch_get(self, table_name, keys, fields=None):
+        """Returns {key: item} for the keys that exist, items projected down to fields and the key when given"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def scan(self, table_name, fields=None):
+        """Yields every item of the table, projected down to fields and the key when given"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def batch_writer(self, table_name):
+        """Context manager with put(item) and delete(key) that are sent in batches and flushed on exit"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def insert_if_absent(self, table_name, item):
+        """Writes item only if its key is not stored yet, atomically, returns True if it was written"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put_if_greater(self, table_name, item, field):
+        """Writes item only if its key is not stored yet or the stored field is less than item's, atomically"""
+        raise NotImplementedError
+
+    def _project(self, table_name, item, fields):
+        if fields is None:
+            return dict(item)
+
+        key_name = TABLE_KEYS[table_name]
+
+        return {name: item[name] for name in [key_name] + list(fields) if name in item}
+
+
+class DynamoDBStorage(Storage):
+    """
+    Storage on the DynamoDB tables named in TABLE_KEYS. Reads go through
+    BatchGetItem, 100 keys at a time with unprocessed keys retried, and the
+    conditional writes are single UpdateItem calls with a ConditionExpression.
+    Calls go through the resource's client, which unlike the resource is safe
+    to share with the worker threads, and still takes and returns plain values
+    """
+    MAX_BATCH_SIZE = 100
+    MAX_RETRIES = 5
+
+    def __init__(self, dynamodb=None):
+        self._dynamodb = dynamodb
+
+    @property
+    def dynamodb(self):
+        return self._dynamodb if self._dynamodb is not None else runtime.dynamodb()
+
+    @property
+    def client(self):
+        return self.dynamodb.meta.client
+
+    @property
+    def errors(self):
+        return (self.client.exceptions.ClientError,)
+
+    def get(self, table_name, key):
+        response = self.client.get_item(
+            TableName=table_name,
+            Key={TABLE_KEYS[table_name]: key},
+            ConsistentRead=True
+        )
+
+        return response.get('Item')
+
+    def batch_get(self, table_name, keys, fields=None):
+        keys = list(dict.fromkeys(keys))
+        items = {}
+
+        for start in range(0, len(keys), self.MAX_BATCH_SIZE):
+            items.update(self._batch_get(table_name, keys[start:start + self.MAX_BATCH_SIZE], fields))
+
+        return items
+
+    def _batch_get(self, table_name, keys, fields):
+        key_name = TABLE_KEYS[table_name]
+        keys_and_projection = {
+            'Keys': [{key_name: key} for key in keys]
+        }
+
+        if fields is not None:
+            # name and position are DynamoDB reserved words so every field goes through a placeholder
+            attribute_names = {f'#F{i}': f for i, f in enumerate([key_name] + list(fields))}
+            keys_and_projection['ProjectionExpression'] = ', '.join(attribute_names.keys())
+            keys_and_projection['ExpressionAttributeNames'] = attribute_names
+
+        items = {}
+        request_items = {table_name: keys_and_projection}
+        retries = 0
+
+        while request_items:
+            response = self.client.batch_get_item(RequestItems=request_items)
+
+            for item in response['Responses'].get(table_name, []):
+                items[item[key_name]] = item
+
+            request_items = response.get('UnprocessedKeys')
+
+            if request_items:
+                if retries == self.MAX_RETRIES:
+                    raise Exception(f'Could not read {table_name} keys: {request_items}')
+                time.sleep(0.05 * 2 ** retries)
+                retries += 1
+
+        return items
+
+    def scan(self, table_name, fields=None):
+        scan_kwargs = {'TableName': table_name}
+
+        if fields is not None:
+            attribute_names = {f'#F{i}': f for i, f in enumerate([TABLE_KEYS[table_name]] + list(fields))}
+            scan_kwargs['ProjectionExpression'] = ', '.join(attribute_names.keys())
+            scan_kwargs['ExpressionAttributeNames'] = attribute_names
+
+        while True:
+            response = self.client.scan(**scan_kwargs)
+
+            yield from response['Items']
+
+            if 'LastEvaluatedKey' not in response:
+                return
+
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def batch_writer(self, table_name):
+        # batch_writer sends 25 items per BatchWriteItem through the client and re-sends unprocessed items
+        key_name = TABLE_KEYS[table_name]
+
+        return _DynamoDBBatchWriter(
+            self.dynamodb.Table(table_name).batch_writer(overwrite_by_pkeys=[key_name]),
+            key_name
+        )
+
+    def insert_if_absent(self, table_name, item):
+        return self._conditional_update(table_name, item, 'attribute_not_exists(#K)', {})
+
+    def put_if_greater(self, table_name, item, field):
+        return self._conditional_update(
+            table_name, item, 'attribute_not_exists(#K) OR #C < :c', {'#C': field}, {':c': item[field]}
+        )
+
+    def _conditional_update(self, table_name, item, condition, condition_names, condition_values=None):
+        """SETs every attribute of item but its key under condition, item needs at least one other attribute"""
+        client = self.client
+        key_name = TABLE_KEYS[table_name]
+        attributes = [name for name in item if name != key_name]
+
+        attribute_names = {'#K': key_name, **condition_names}
+        attribute_values = dict(condition_values or {})
+        assignments = []
+
+        for i, name in enumerate(attributes):
+            attribute_names[f'#A{i}'] = name
+            attribute_values[f':a{i}'] = item[name]
+            assignments.append(f'#A{i}=:a{i}')
+
+        try:
+            client.update_item(
+                TableName=table_name,
+                Key={key_name: item[key_name]},
+                ExpressionAttributeNames=attribute_names,
+                ExpressionAttributeValues=attribute_values,
+                UpdateExpression='SET ' + ', '.join(assignments),
+                ConditionExpression=condition
+            )
+        except client.exceptions.ConditionalCheckFailedException:
+            # the client's modeled exception, so catching it needs no botocore import
+            return False
+
+        return True
+
+
+class _DynamoDBBatchWriter:
+
+    def __init__(self, batch_writer, key_name):
+        self._batch_writer = batch_writer
+        self._key_name = key_name
+
+    def __enter__(self):
+        self._batch_writer.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._batch_writer.__exit__(*exc)
+
+    def put(self, item):
+        self._batch_writer.put_item(Item=item)
+
+    def delete(self, key):
+        self._batch_writer.delete_item(Key={self._key_name: key})
+
+
+class MemoryStorage(Storage):
+    """Storage in process memory, for tests, benchmarks and single process self hosting"""
+
+    def __init__(self):
+        self._tables = {table_name: {} for table_name in TABLE_KEYS}
+        self._lock = threading.Lock()
+
+    def get(self, table_name, key):
+        item = self._tables[table_name].get(key)
+
+        return dict(item) if item is not None else None
+
+    def batch_get(self, table_name, keys, fields=None):
+        table = self._tables[table_name]
+
+        return {key: self._project(table_name, table[key], fields) for key in keys if key in table}
+
+    def scan(self, table_name, fields=None):
+        for item in list(self._tables[table_name].values()):
+            yield self._project(table_name, item, fields)
+
+    def batch_writer(self, table_name):
+        return _DirectBatchWriter(self, table_name)
+
+    def put(self, table_name, item):
+        with self._lock:
+            self._tables[table_name][item[TABLE_KEYS[table_name]]] = dict(item)
+
+    def delete(self, table_name, key):
+        with self._lock:
+            self._tables[table_name].pop(key, None)
+
+    def insert_if_absent(self, table_name, item):
+        key = item[TABLE_KEYS[table_name]]
+
+        with self._lock:
+            if key in self._tables[table_name]:
+                return False
+            self._tables[table_name][key] = dict(item)
+
+        return True
+
+    def put_if_greater(self, table_name, item, field):
+        key = item[TABLE_KEYS[table_name]]
+
+        with self._lock:
+            stored = self._tables[table_name].get(key)
+            if stored is not None and field in stored and not stored[field] < item[field]:
+                return False
+            self._tables[table_name][key] = dict(item)
+
+        return True
+
+
+class _DirectBatchWriter:
+    """Batch writer for storages whose puts and deletes are already cheap"""
+
+    def __init__(self, storage, table_name):
+        self._storage = storage
+        self._table_name = table_name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def put(self, item):
+        self._storage.put(self._table_name, item)
+
+    def delete(self, key):
+        self._storage.delete(self._table_name, key)
+
+
+class SQLiteStorage(Storage):
+    """
+    Storage in a SQLite database file, one table per TABLE_KEYS entry with
+    the key as its primary key, so every lookup is an index search. Items are
+    stored as JSON. Conditional writes run in an IMMEDIATE transaction so they
+    stay atomic across processes sharing the file
+    """
+    MAX_VARIABLES = 500
+
+    def __init__(self, path):
+        import sqlite3
+
+        self.path = path
+        self.errors = (sqlite3.Error,)
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.RLock()
+
+        with self._lock:
+            if path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode=WAL')
+            for table_name in TABLE_KEYS:
+                self._connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{table_name}" (key TEXT PRIMARY KEY, item TEXT NOT NULL) WITHOUT ROWID'
+                )
+
+    def close(self):
+        self._connection.close()
+
+    def get(self, table_name, key):
+        with self._lock:
+            row = self._connection.execute(f'SELECT item FROM "{table_name}" WHERE key = ?', (key,)).fetchone()
+
+        return json.loads(row[0]) if row is not None else None
+
+    def batch_get(self, table_name, keys, fields=None):
+        keys = list(dict.fromkeys(keys))
+        items = {}
+
+        for start in range(0, len(keys), self.MAX_VARIABLES):
+            batch = keys[start:start + self.MAX_VARIABLES]
+            placeholders = ', '.join('?' * len(batch))
+
+            with self._lock:
+                rows = self._connection.execute(
+                    f'SELECT key, item FROM "{table_name}" WHERE key IN ({placeholders})', batch
+                ).fetchall()
+
+            for key, item in rows:
+                items[key] = self._project(table_name, json.loads(item), fields)
+
+        return items
+
+    def scan(self, table_name, fields=None):
+        with self._lock:
+            rows = self._connection.execute(f'SELECT item FROM "{table_name}"').fetchall()
+
+        for (item,) in rows:
+            yield self._project(table_name, json.loads(item), fields)
+
+    def batch_writer(self, table_name):
+        return _SQLiteBatchWriter(self, table_name)
+
+    def insert_if_absent(self, table_name, item):
+        key = item[TABLE_KEYS[table_name]]
+
+        with self._lock:
+            cursor = self._connection.execute(
+                f'INSERT OR IGNORE INTO "{table_name}" (key, item) VALUES (?, ?)', (key, json.dumps(item))
+            )
+
+        return cursor.rowcount == 1
+
+    def put_if_greater(self, table_name, item, field):
+        key = item[TABLE_KEYS[table_name]]
+
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._connection.execute(f'SELECT item FROM "{table_name}" WHERE key = ?', (key,)).fetchone()
+                stored = json.loads(row[0]) if row is not None else {}
+
+                if field in stored and not stored[field] < item[field]:
+                    self._connection.execute('COMMIT')
+                    return False
+
+                self._connection.execute(
+                    f'INSERT OR REPLACE INTO "{table_name}" (key, item) VALUES (?, ?)', (key, json.dumps(item))
+                )
+                self._connection.execute('COMMIT')
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+
+        return True
+
+
+class _SQLiteBatchWriter:
+    """Collects puts and deletes and applies them in one transaction on exit"""
+
+    def __init__(self, storage, table_name):
+        self._storage = storage
+        self._table_name = table_name
+        self._puts = {}
+        self._deletes = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            return
+
+        connection = self._storage._connection
+        table_name = self._table_name
+
+        with self._storage._lock:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany(
+                    f'INSERT OR REPLACE INTO "{table_name}" (key, item) VALUES (?, ?)',
+                    [(key, json.dumps(item)) for key, item in self._puts.items()]
+                )
+                connection.executemany(f'DELETE FROM "{table_name}" WHERE key = ?', [(key,) for key in self._deletes])
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+
+    def put(self, item):
+        key = item[TABLE_KEYS[self._table_name]]
+        self._deletes.discard(key)
+        self._puts[key] = item
+
+    def delete(self, key):
+        self._puts.pop(key, None)
+        self._deletes.add(key)
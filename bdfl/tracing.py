@@ -0,0 +1,207 @@
+"""
+Follows a notification from the MFL transaction it reports to the GroupMe
+post that carries it:
+
+    mfl_timestamp   the transaction happened on MFL
+    detected_at     a handler found it new and formatted its message
+    enqueued_at     the message was sent to SQS
+    posted_at       GroupMe accepted the last post carrying it
+
+The context rides with the message, first as a TracedMessage through the
+pipeline stages and then as SQS message attributes. Spans and latency records
+are emitted as structured logs, see bdfl.logs, so they land in CloudWatch
+Logs, and
+
+    python -m bdfl.tracing [log files ...]
+
+reads them back (from stdin without files) and prints percentiles of each hop
+"""
+import json
+import sys
+import time
+from contextlib import contextmanager
+from .logs import emit
+
+LATENCY_RECORD = 'notification_latency'
+SPAN_RECORD = 'span'
+HOPS = ['mfl_to_detect', 'detect_to_enqueue', 'enqueue_to_post', 'mfl_to_post']
+
+
+class TracedMessage(str):
+    """A message that carries its trace context, a dict, through the stages that pass messages along"""
+
+    def __new__(cls, message, trace):
+        traced_message = super().__new__(cls, message)
+        traced_message.trace = trace
+        return traced_message
+
+
+def trace_context(transaction_type, timestamp, franchise_id):
+    """Starts the context of a notification detected now, the id is the transaction's type, timestamp and franchise"""
+    return {
+        'trace_id': f'{transaction_type}-{timestamp}-{franchise_id}',
+        'mfl_timestamp': int(timestamp) if str(timestamp).isdigit() else None,
+        'detected_at': time.time()
+    }
+
+def traced(message, trace):
+    return TracedMessage(message, trace) if trace is not None else message
+
+def trace_of(message):
+    return getattr(message, 'trace', None)
+
+def oldest_trace(messages):
+    """The context of the message with the oldest MFL timestamp, for a message joined from several"""
+    traces = [trace for trace in map(trace_of, messages) if trace is not None]
+    if not traces:
+        return None
+
+    return min(traces, key=lambda trace: trace['mfl_timestamp'] if trace['mfl_timestamp'] is not None else float('inf'))
+
+def message_attributes(trace, enqueued_at):
+    """SQS MessageAttributes carrying trace, stamped with enqueued_at"""
+    attributes = {'trace_id': {'DataType': 'String', 'StringValue': trace['trace_id']}}
+
+    for name, value in [('mfl_timestamp', trace.get('mfl_timestamp')), ('detected_at', trace.get('detected_at')),
+                        ('enqueued_at', enqueued_at)]:
+        if value is not None:
+            attributes[name] = {'DataType': 'Number', 'StringValue': repr(value)}
+
+    return attributes
+
+def trace_from_record(record):
+    """Reads the context back from the messageAttributes of an SQS record in a Lambda event, None without one"""
+    attributes = record.get('messageAttributes') or {}
+    if 'trace_id' not in attributes:
+        return None
+
+    trace = {'trace_id': attributes['trace_id']['stringValue']}
+    for name in ['mfl_timestamp', 'detected_at', 'enqueued_at']:
+        if name in attributes:
+            trace[name] = float(attributes[name]['stringValue'])
+
+    return trace
+
+def latency_record(trace, posted_at):
+    """The seconds each hop of a posted notification took, hops with a missing end are left out"""
+    times = [trace.get('mfl_timestamp'), trace.get('detected_at'), trace.get('enqueued_at'), posted_at]
+    record = {'type': LATENCY_RECORD, 'trace_id': trace['trace_id']}
+
+    for hop, start, end in zip(HOPS, times, times[1:]):
+        if start is not None and end is not None:
+            record[hop] = round(end - start, 3)
+
+    if times[0] is not None:
+        record['mfl_to_post'] = round(posted_at - times[0], 3)
+
+    return record
+
+@contextmanager
+def span(name, **fields):
+    """Times the block and emits it as a span record with fields"""
+    start = time.time()
+    try:
+        yield
+    finally:
+        emit(dict({'type': SPAN_RECORD, 'name': name, 'start': round(start, 3),
+                   'duration_ms': round((time.time() - start) * 1000, 1)}, **fields))
+
+
+class LatencyHistogram:
+    """
+    Latencies in seconds, counted into log spaced buckets for the shape and
+    kept whole for exact percentiles, which is fine at a league's volume
+    """
+    BUCKETS = [1, 5, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 21600, 86400]
+
+    def __init__(self):
+        self._values = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, value):
+        self._values.append(value)
+
+    def percentile(self, percent):
+        """Nearest-rank percentile, None when empty"""
+        if not self._values:
+            return None
+
+        values = sorted(self._values)
+        rank = max(int(-(-percent * len(values) // 100)), 1)
+
+        return values[rank - 1]
+
+    def buckets(self):
+        """[(upper bound or None for the overflow bucket, count)]"""
+        counts = [0] * (len(self.BUCKETS) + 1)
+
+        for value in self._values:
+            counts[next((i for i, bound in enumerate(self.BUCKETS) if value <= bound), len(self.BUCKETS))] += 1
+
+        return list(zip(self.BUCKETS + [None], counts))
+
+
+class LatencyReport:
+    """Aggregates latency and span records read from logs into one histogram per hop and per span name"""
+    PERCENTILES = [50, 90, 99]
+
+    def __init__(self):
+        self.hops = {hop: LatencyHistogram() for hop in HOPS}
+        self.spans = {}
+
+    def add(self, record):
+        if record.get('type') == LATENCY_RECORD:
+            for hop in HOPS:
+                if hop in record:
+                    self.hops[hop].add(record[hop])
+        elif record.get('type') == SPAN_RECORD:
+            self.spans.setdefault(record['name'], LatencyHistogram()).add(record['duration_ms'] / 1000)
+
+    def add_lines(self, lines):
+        """Adds the JSON record found on each line, lines may carry a log prefix before it"""
+        for line in lines:
+            start = line.find('{')
+            if start == -1:
+                continue
+            try:
+                self.add(json.loads(line[start:]))
+            except ValueError:
+                continue
+
+    def lines(self):
+        header = f'{"":<24}{"count":>8}' + ''.join(f'{f"p{percent}":>10}' for percent in self.PERCENTILES)
+        lines = [header]
+
+        for name, histogram in list(self.hops.items()) + sorted(self.spans.items()):
+            if histogram:
+                lines.append(f'{name:<24}{len(histogram):>8}' + ''.join(
+                    f'{histogram.percentile(percent):>9.1f}s' for percent in self.PERCENTILES
+                ))
+
+        if self.hops['mfl_to_post']:
+            lines.append('')
+            lines.append('mfl_to_post')
+            for bound, count in self.hops['mfl_to_post'].buckets():
+                if count:
+                    label = f'<= {bound}s' if bound is not None else f'> {LatencyHistogram.BUCKETS[-1]}s'
+                    lines.append(f'  {label:<12}{count:>8}')
+
+        return lines
+
+
+def main(paths):
+    report = LatencyReport()
+
+    if paths:
+        for path in paths:
+            with open(path, encoding='utf-8') as log:
+                report.add_lines(log)
+    else:
+        report.add_lines(sys.stdin)
+
+    print('\n'.join(report.lines()))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# no more than the DynamoDB client's connection pool, see runtime.AWS_POOL_SIZE
+MAX_WORKERS = int(os.getenv('TRANSACTION_WORKERS', os.getenv('AWS_POOL_SIZE', 10)))
+
+
+def imap_ordered(function, items, max_workers: int = None, buffer_size: int = None, keep_done: bool = False):
+    """
+    Yields function(item) for each item, with the calls running on up to
+    max_workers threads since each one mostly waits on the network. Results
+    keep the order of items. Each time an item is read, the results at the
+    head that are done are yielded without waiting, and the consumer only
+    blocks on a call when buffer_size calls are ahead of it or items is
+    exhausted, so a slow consumer holds back the source instead of piling up
+    results. Once a call raises no more items are read or submitted, the
+    results before it are still yielded and then its exception is raised.
+    With keep_done, the calls already running when a call or items raises are
+    let finish and the results of those that succeeded are yielded before the
+    exception too, out of order, for calls whose side effects must not go
+    unreported. When that happens, or the consumer stops early, calls that
+    have not started are cancelled and the pool is shut down
+    """
+    max_workers = max_workers or MAX_WORKERS
+    buffer_size = max(buffer_size or 2 * max_workers, max_workers)
+
+    if max_workers <= 1:
+        for item in items:
+            yield function(item)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+    failed = threading.Event()
+
+    def check_failed(future):
+        if not future.cancelled() and future.exception() is not None:
+            failed.set()
+
+    try:
+        for item in items:
+            future = executor.submit(function, item)
+            future.add_done_callback(check_failed)
+            pending.append(future)
+
+            while pending and (pending[0].done() or len(pending) >= buffer_size):
+                yield pending.popleft().result()
+
+            if failed.is_set():
+                break
+
+        while pending:
+            yield pending.popleft().result()
+    except Exception:
+        if keep_done:
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            for future in pending:
+                if not future.cancelled() and future.exception() is None:
+                    yield future.result()
+            pending.clear()
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
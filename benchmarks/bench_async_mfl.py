@@ -0,0 +1,47 @@
+"""
+Compares serial MFL requests against AsyncMFL fetching the same endpoints
+concurrently, against a local stub server with a fixed per-request latency
+
+    python benchmarks/bench_async_mfl.py [latency_seconds]
+"""
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'test')]
+
+from pymfl.mfl import MFL
+from pymfl.async_mfl import AsyncMFL
+from stub_mfl_server import StubMFLServer
+from helpers import MFL_RESPONSES
+
+
+def serial(mfl):
+    return [mfl.franchises(), mfl.transactions(''), mfl.players(), mfl.live_scores()]
+
+async def concurrent(mfl):
+    return await mfl.gather(mfl.franchises(), mfl.transactions(), mfl.players(), mfl.live_scores())
+
+def main(latency):
+    with StubMFLServer(MFL_RESPONSES, delay=latency) as server:
+        MFL._base_url = server.base_url
+
+        start = time.perf_counter()
+        serial(MFL('user', 'pass', 12345, 2020))
+        serial_time = time.perf_counter() - start
+
+        async_mfl = AsyncMFL('user', 'pass', 12345, 2020)
+        start = time.perf_counter()
+        asyncio.run(concurrent(async_mfl))
+        concurrent_time = time.perf_counter() - start
+        async_mfl.close()
+
+    print(f'latency per request: {latency:.3f}s')
+    print(f'serial:     {serial_time:.3f}s')
+    print(f'concurrent: {concurrent_time:.3f}s')
+    print(f'speedup:    {serial_time / concurrent_time:.1f}x')
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.1)
@@ -0,0 +1,128 @@
+"""
+Measures what a cold start costs each handler, every measurement in a fresh
+interpreter: the import time of the handler module as python -X importtime
+reports it and, for getTransactions, the time from importing the module to
+the first handler call returning against moto, with MFL replaced by a stub.
+moto imports boto3 itself, so the first call time excludes importing boto3.
+It also counts the boto3 clients the first call builds
+
+    python benchmarks/bench_cold_start.py
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'test')]
+
+HANDLER_MODULES = [
+    'get_transactions',
+    'get_trades',
+    'get_waivers',
+    'get_players',
+    'get_franchises',
+    'get_rosters',
+    'get_injuries',
+    'get_close_games',
+    'send_bdfl_messages'
+]
+
+SDK_MODULES = ['boto3', 'botocore', 'requests']
+
+
+def import_times(module):
+    """Returns {imported module: cumulative import time in microseconds} for importing module in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+def first_call_time():
+    """Returns {'import_ms', 'first_call_ms', 'clients_created'} for getTransactions in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--first-call'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    return json.loads(result.stdout.splitlines()[-1])
+
+def run_first_call():
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ['MFL_LEAGUEID'] = '12345'
+
+    import boto3
+    from moto import mock_dynamodb2, mock_sqs
+
+    timestamp = str(int(time.time()))
+
+    with mock_dynamodb2(), mock_sqs():
+        boto3.client('sqs').create_queue(QueueName='BDFLMessageQueue')
+
+        dynamodb_client = boto3.client('dynamodb')
+        for table_name, key_name in [('waivers', 'key'), ('transactions', 'key'), ('checkpoints', 'name'), ('players', 'id'), ('franchises', 'id'), ('rosters', 'id'), ('snapshots', 'name')]:
+            dynamodb_client.create_table(
+                TableName=table_name,
+                AttributeDefinitions=[{'AttributeName': key_name, 'AttributeType': 'S'}],
+                KeySchema=[{'AttributeName': key_name, 'KeyType': 'HASH'}]
+            )
+        dynamodb_client.put_item(TableName='franchises', Item={'id': {'S': '0003'}, 'name': {'S': 'Jeff Janis Fan Club'}})
+        for player_id, name in [('14209', 'Josh Oliver'), ('11247', 'Zach Ertz')]:
+            dynamodb_client.put_item(TableName='players', Item={
+                'id': {'S': player_id}, 'name': {'S': name}, 'position': {'S': 'TE'}, 'team': {'S': 'PHI'}
+            })
+
+        clients_created = []
+        boto3._get_default_session().events.register(
+            'creating-client-class', lambda class_attributes, **kwargs: clients_created.append(class_attributes)
+        )
+
+        start = time.perf_counter()
+        import get_transactions
+        imported = time.perf_counter()
+
+        # imported after the handler so its modules are not loaded ahead of the measured import
+        from helpers import StubMFL
+
+        get_transactions.MFL = StubMFL([
+            {'type': 'BBID_WAIVER', 'timestamp': timestamp, 'franchise': '0003', 'transaction': '14209,|1.00|'},
+            {'type': 'FREE_AGENT', 'timestamp': timestamp, 'franchise': '0003', 'transaction': '11247,|'}
+        ])
+        messages = get_transactions.handler({}, None)['body']['transactions']
+        called = time.perf_counter()
+
+    assert len(messages) == 2, messages
+
+    print(json.dumps({
+        'import_ms': (imported - start) * 1000,
+        'first_call_ms': (called - imported) * 1000,
+        'clients_created': len(clients_created)
+    }))
+
+def main():
+    for module in HANDLER_MODULES:
+        times = import_times(module)
+        sdk = ', '.join(name for name in SDK_MODULES if name in times) or 'none'
+        print(f'{module:<20} import: {times[module] / 1000:7.1f}ms  sdk imported: {sdk}')
+
+    result = first_call_time()
+    print(
+        f"getTransactions      import: {result['import_ms']:7.1f}ms  first call: {result['first_call_ms']:7.1f}ms  "
+        f"boto3 clients built: {result['clients_created']}"
+    )
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--first-call']:
+        run_first_call()
+    else:
+        main()
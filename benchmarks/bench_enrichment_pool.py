@@ -0,0 +1,97 @@
+"""
+Wall time of enriching and deduplicating a backlog of transactions when every
+storage call waits as long as a DynamoDB round trip would: the getTransactions
+handler runs against the memory backend wrapped to sleep before each call,
+with the enrichment pool at one worker (one transaction after another) and at
+larger sizes. One worker grows linearly with the backlog. With a pool the
+conditional writes of a prefetch chunk run together, so the time grows with
+the number of chunks instead, at 20ms per call:
+
+    backlog      1 workers   10 workers   50 workers
+          1         143ms       148ms       143ms
+         10         340ms       228ms       228ms
+         25         632ms       230ms       228ms
+         50        1162ms       363ms       356ms
+
+    python benchmarks/bench_enrichment_pool.py [latency_ms] [workers ...]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import get_transactions
+from bdfl import runtime, workers
+from bdfl.cache import lookup_cache
+from bdfl.rosters import roster_index
+from bdfl.snapshots import lookup_snapshots
+from bdfl.sqs import publisher
+from bdfl.storage import MemoryStorage
+from bench_pipeline import StubSQS, mfl, seed, synthetic_transactions
+
+BACKLOG_SIZES = [1, 10, 25, 50]
+
+
+class LatencyStorage(MemoryStorage):
+    """MemoryStorage that sleeps latency seconds before every read and write, as a network round trip would"""
+
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def get(self, table_name, key):
+        time.sleep(self.latency)
+        return super().get(table_name, key)
+
+    def batch_get(self, table_name, keys, fields=None):
+        time.sleep(self.latency)
+        return super().batch_get(table_name, keys, fields)
+
+    def insert_if_absent(self, table_name, item):
+        time.sleep(self.latency)
+        return super().insert_if_absent(table_name, item)
+
+    def put_if_greater(self, table_name, item, field):
+        time.sleep(self.latency)
+        return super().put_if_greater(table_name, item, field)
+
+def measure(latency, count, max_workers):
+    storage = LatencyStorage(0)
+    seed(storage)
+    storage.latency = latency
+
+    runtime.reset()
+    runtime._clients['storage'] = storage
+    lookup_cache.clear()
+    lookup_snapshots.clear()
+    roster_index.clear()
+    workers.MAX_WORKERS = max_workers
+
+    mfl.rows = synthetic_transactions(count, int(time.time()) - count)
+    start = time.perf_counter()
+    get_transactions.handler({}, None)
+
+    return time.perf_counter() - start
+
+def main(latency, worker_counts):
+    get_transactions.MFL = mfl
+    publisher._sqs_client = StubSQS()
+    publisher._queue_url = 'stub'
+    os.environ.setdefault('MFL_LEAGUEID', '12345')
+
+    print(f'{latency * 1000:.0f}ms per storage call')
+    print('backlog  ' + ''.join(f'{max_workers:>5} workers' for max_workers in worker_counts))
+
+    for count in BACKLOG_SIZES:
+        timings = [measure(latency, count, max_workers) for max_workers in worker_counts]
+        print(f'{count:>7}  ' + ''.join(f'{elapsed * 1000:>10.0f}ms' for elapsed in timings))
+
+    runtime.reset()
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.02,
+        [int(max_workers) for max_workers in sys.argv[2:]] or [1, 10, 50]
+    )
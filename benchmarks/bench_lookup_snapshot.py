@@ -0,0 +1,87 @@
+"""
+Compares resolving player ids through the packed lookup snapshot with the
+per-field get_item calls notifications used to make, against moto for a
+synthetic player universe: snapshot size, cold load (one get of the snapshot
+item, decode and decompress), and the latency of each lookup
+
+    python benchmarks/bench_lookup_snapshot.py [number_of_players] [number_of_lookups]
+"""
+import os
+import random
+import sys
+import time
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import boto3
+from moto import mock_dynamodb2
+from bdfl.snapshots import LookupSnapshot, LookupSnapshots
+from bdfl.storage import DynamoDBStorage
+
+FIELDS = ['name', 'position', 'team']
+
+
+def synthetic_players(count):
+    return [
+        {'id': str(10000 + i), 'name': f'Player {i} Test', 'position': 'WR', 'team': f'T{i % 32:02}'}
+        for i in range(count)
+    ]
+
+def get_item_per_field(players_table, player_ids):
+    for player_id in player_ids:
+        for field in FIELDS:
+            players_table.get_item(Key={'id': player_id})['Item'][field]
+
+def snapshot_lookups(snapshot, player_ids):
+    for player_id in player_ids:
+        for field in FIELDS:
+            snapshot.get(player_id)[field]
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main(count, lookups):
+    with mock_dynamodb2():
+        dynamodb_client = boto3.client('dynamodb')
+        for table_name, key_name in [('players', 'id'), ('snapshots', 'name')]:
+            dynamodb_client.create_table(
+                TableName=table_name,
+                AttributeDefinitions=[{'AttributeName': key_name, 'AttributeType': 'S'}],
+                KeySchema=[{'AttributeName': key_name, 'KeyType': 'HASH'}]
+            )
+
+        dynamodb = boto3.resource('dynamodb')
+        storage = DynamoDBStorage(dynamodb)
+        players = synthetic_players(count)
+
+        with storage.batch_writer('players') as batch:
+            for player in players:
+                batch.put(player)
+
+        data = LookupSnapshot.pack(players, 'id', FIELDS, time.time())
+        LookupSnapshots(storage).publish('players', players, 'id', FIELDS)
+
+        player_ids = [player['id'] for player in random.sample(players, min(lookups, count))]
+        field_lookups = len(player_ids) * len(FIELDS)
+
+        print(f'{count} players, snapshot {len(data) / 1024:.1f} KiB packed, {len(zlib.compress(data)) / 1024:.1f} KiB compressed')
+
+        load_time, snapshot = timed(lambda: LookupSnapshots(storage).get('players'))
+        print(f'snapshot cold load                {load_time * 1000:9.2f}ms  1 get')
+
+        elapsed, _ = timed(snapshot_lookups, snapshot, player_ids)
+        print(f'snapshot lookups                  {elapsed * 1000:9.2f}ms  {elapsed / field_lookups * 1e6:8.2f}us per field  0 reads')
+
+        elapsed, _ = timed(get_item_per_field, dynamodb.Table('players'), player_ids)
+        print(f'get_item per field (moto)         {elapsed * 1000:9.2f}ms  {elapsed / field_lookups * 1e6:8.2f}us per field  {field_lookups} reads')
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 3000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    )
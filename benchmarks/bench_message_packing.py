@@ -0,0 +1,74 @@
+"""
+Compares the number of GroupMe posts the previous greedy packer and the
+current one produce for a synthetic trade-deadline SQS batch
+
+    python benchmarks/bench_message_packing.py [number_of_trades]
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from get_trades import format_trade_message
+from get_waivers import format_waiver_message
+from groupme.groupme import GroupMe
+from groupme.packing import message_length
+
+
+def legacy_format_for_character_limit(messages, limit=GroupMe.CHARACTER_LIMIT):
+    """The packer GroupMe.format_bdfl_messages_for_character_limit used before"""
+    messages_to_send = []
+    limited_message = ""
+
+    for message in messages:
+        for i in message.split('\n'):
+            if len(limited_message) + len(i) < limit:
+                limited_message += i + '\n'
+            else:
+                messages_to_send.append(limited_message[:-1])
+                limited_message = i + '\n'
+
+        if len(message) > 0:
+            messages_to_send.append(limited_message[:-1])
+
+    return messages_to_send
+
+def synthetic_batch(number_of_trades, seed=2020):
+    rng = random.Random(seed)
+    teams = ['Jeff Janis Fan Club', 'Bortles Bay', 'Cam Newton Fan Club 🏈', 'Ballin Bellichicks']
+    messages = []
+
+    for _ in range(number_of_trades):
+        franchise1, franchise2 = rng.sample(teams, 2)
+        assets1 = [f'Player {rng.randint(1, 999)}, KCC WR' for _ in range(rng.randint(1, 8))]
+        assets2 = [f'Bortles Bay 2022 Round {rng.randint(1, 5)} Draft Pick' for _ in range(rng.randint(1, 4))]
+        messages.append(format_trade_message(franchise1, franchise2, assets1, assets2))
+
+        if rng.random() < 0.3:
+            waiver = ['$' + str(rng.randint(1, 60)) + '.00', f'Player {rng.randint(1, 999)}, PHI TE', None]
+            messages.append('✅WAIVER CLAIMS COMPLETED✅\n\n' + format_waiver_message(rng.choice(teams), waiver))
+
+    return messages
+
+def main(number_of_trades):
+    messages = synthetic_batch(number_of_trades)
+    groupme = GroupMe('key')
+
+    start = time.perf_counter()
+    legacy_posts = legacy_format_for_character_limit(messages)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    posts = groupme.format_bdfl_messages_for_character_limit(messages)
+    packed_time = time.perf_counter() - start
+
+    limit = GroupMe.CHARACTER_LIMIT
+    print(f'notifications: {len(messages)}')
+    print(f'legacy posts: {len(legacy_posts):>4}  over limit: {sum(message_length(p) > limit for p in legacy_posts)}  {legacy_time * 1000:.1f}ms')
+    print(f'packed posts: {len(posts):>4}  over limit: {sum(message_length(p) > limit for p in posts)}  {packed_time * 1000:.1f}ms')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
@@ -0,0 +1,66 @@
+"""
+Compares memory and construction time of a full MFL players export held as
+the raw JSON dicts, as a plain (dict-backed) class and as the slotted Player
+
+    python benchmarks/bench_models.py [number_of_players]
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pymfl.models.player import Player
+
+
+class DictPlayer():
+    """Player without __slots__, the way the models were before"""
+
+    def __init__(self, player_json):
+        self.player_id = player_json['id']
+        self.name = player_json.get('name')
+        self.position = player_json.get('position')
+        self.team = player_json.get('team')
+        self.injury_status = player_json.get('status')
+        self.injury_details = player_json.get('details')
+
+
+def players_export(count):
+    positions = ['QB', 'RB', 'WR', 'TE', 'PK', 'Def']
+    players = [
+        {'id': str(10000 + i), 'name': f'Player{i}, Test', 'position': positions[i % 6], 'team': f'T{i % 32:02}'}
+        for i in range(count)
+    ]
+
+    return json.dumps({'players': {'player': players}})
+
+def measure(label, build, body, repeat=20):
+    players_json = json.loads(body)['players']['player']
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build(players_json)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    players_json = json.loads(body)['players']['player']
+    players = build(players_json)
+
+    # what is left once the parsed export is released is what the models keep alive
+    del players_json
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'{label:<11} players: {len(players)}  build: {elapsed * 1000:6.1f}ms  retained: {retained / 1024:6.0f}KiB  peak: {peak / 1024:6.0f}KiB')
+
+def main(count):
+    body = players_export(count)
+
+    measure('raw json', lambda players: players, body)
+    measure('dict class', lambda players: [DictPlayer(player) for player in players], body)
+    measure('slotted', lambda players: [Player.from_json(player) for player in players], body)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2500)
@@ -0,0 +1,81 @@
+"""
+Time to first notification, total time and peak traced memory of the trades
+flow on a backfill, publishing as the stream produces messages against
+formatting every message before the first publish. Storage calls sleep as a
+DynamoDB round trip would, see bench_enrichment_pool, and a stub publisher
+records when each micro-batch is sent
+
+    python benchmarks/bench_notification_stream.py [number_of_trades] [latency_ms]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import get_trades
+from bdfl import pipeline, runtime
+from bdfl.cache import lookup_cache
+from bdfl.snapshots import lookup_snapshots
+from pymfl.models.transaction import Trade
+from bench_enrichment_pool import LatencyStorage
+from bench_pipeline import NUMBER_OF_FRANCHISES, seed
+
+
+class RecordingPublisher:
+
+    def __init__(self):
+        self.sent_at = []
+
+    def publish(self, messages):
+        self.sent_at.append(time.perf_counter())
+        return [{'message': message, 'message_id': '1', 'error': None} for message in messages]
+
+def trade_rows(count):
+    for i in range(count):
+        yield {
+            'type': 'TRADE', 'timestamp': str(1608890400 + i), 'comments': '',
+            'franchise': f'{i % NUMBER_OF_FRANCHISES + 1:04}', 'franchise2': f'{(i + 1) % NUMBER_OF_FRANCHISES + 1:04}',
+            'franchise1_gave_up': f'{10000 + i % 2000},{10000 + (i * 7) % 2000},', 'franchise2_gave_up': 'BB_5,'
+        }
+
+def streamed(trades, publisher):
+    return pipeline.collect(pipeline.publish(get_trades.new_trade_messages(trades), publisher))
+
+def formatted_first(trades, publisher):
+    return publisher.publish(get_trades.store_trades_if_not_exist(list(trades)))
+
+def measure(name, flow, count, latency):
+    storage = LatencyStorage(0)
+    seed(storage)
+    storage.latency = latency
+
+    runtime.reset()
+    runtime._clients['storage'] = storage
+    lookup_cache.clear()
+    lookup_snapshots.clear()
+
+    publisher = RecordingPublisher()
+    tracemalloc.start()
+    start = time.perf_counter()
+    published = flow(pipeline.parse(trade_rows(count), Trade), publisher)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    first = publisher.sent_at[0] - start
+    print(f'{name:<16} {len(published):>6} messages  first after {first * 1000:8.0f}ms  all after {elapsed * 1000:8.0f}ms  peak {peak / 1024:8.0f} KiB')
+
+def main(count, latency):
+    print(f'{count} trades, {latency * 1000:.0f}ms per storage call')
+    measure('streamed', streamed, count, latency)
+    measure('formatted first', formatted_first, count, latency)
+    runtime.reset()
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.01
+    )
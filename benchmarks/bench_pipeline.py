@@ -0,0 +1,102 @@
+"""
+Throughput of the getTransactions handler, from MFL's response to the SQS
+publish, with a local storage backend: a stub MFL returns a synthetic
+transactions export and a stub SQS client accepts every batch, so the time
+measured is parsing, dispatch, lookups, dedup writes and formatting
+
+    python benchmarks/bench_pipeline.py [number_of_transactions] [memory|sqlite ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'test')]
+
+import get_transactions
+from bdfl import runtime
+from bdfl.cache import lookup_cache
+from bdfl.sqs import publisher
+from helpers import StubMFL
+
+NUMBER_OF_PLAYERS = 2000
+NUMBER_OF_FRANCHISES = 12
+
+
+def synthetic_transactions(count, start):
+    transactions = []
+
+    for i in range(count):
+        timestamp = str(start + i)
+        franchise = f'{i % NUMBER_OF_FRANCHISES + 1:04}'
+        other_franchise = f'{(i + 1) % NUMBER_OF_FRANCHISES + 1:04}'
+        added = 10000 + i % NUMBER_OF_PLAYERS
+        dropped = 10000 + (i * 7) % NUMBER_OF_PLAYERS
+
+        kind = i % 5
+        if kind == 0:
+            transactions.append({'type': 'TRADE', 'timestamp': timestamp, 'franchise': franchise,
+                                 'franchise2': other_franchise, 'franchise1_gave_up': f'{added},',
+                                 'franchise2_gave_up': f'{dropped},', 'comments': ''})
+        elif kind == 1:
+            transactions.append({'type': 'BBID_WAIVER', 'timestamp': timestamp, 'franchise': franchise,
+                                 'transaction': f'{added},|1.00|{dropped},'})
+        elif kind == 2:
+            transactions.append({'type': 'FREE_AGENT', 'timestamp': timestamp, 'franchise': franchise,
+                                 'transaction': f'{added},|{dropped},'})
+        elif kind == 3:
+            transactions.append({'type': 'IR', 'timestamp': timestamp, 'franchise': franchise,
+                                 'transaction': f'|{added},'})
+        else:
+            transactions.append({'type': 'TAXI', 'timestamp': timestamp, 'franchise': franchise,
+                                 'transaction': f'{added},|'})
+
+    return transactions
+
+# the benchmarks set its rows before each run
+mfl = StubMFL()
+
+class StubSQS:
+
+    def send_message_batch(self, QueueUrl, Entries):
+        return {'Successful': [{'Id': entry['Id'], 'MessageId': entry['Id']} for entry in Entries]}
+
+def seed(storage):
+    with storage.batch_writer('players') as batch:
+        for i in range(NUMBER_OF_PLAYERS):
+            batch.put({'id': str(10000 + i), 'name': f'Player {i}', 'position': 'WR', 'team': f'T{i % 32:02}'})
+
+    with storage.batch_writer('franchises') as batch:
+        for i in range(NUMBER_OF_FRANCHISES):
+            batch.put({'id': f'{i + 1:04}', 'name': f'Franchise {i + 1}'})
+
+def measure(backend, count, directory):
+    runtime.reset()
+    lookup_cache.clear()
+    runtime.STORAGE_BACKEND = backend
+    runtime.SQLITE_PATH = os.path.join(directory, f'{backend}.db')
+    seed(runtime.storage())
+
+    mfl.rows = synthetic_transactions(count, int(time.time()) - count)
+    start = time.perf_counter()
+    response = get_transactions.handler({}, None)
+    elapsed = time.perf_counter() - start
+
+    published = len(response['body']['published'])
+    print(f'{backend:<8} {count:>6} transactions  {published:>6} messages  {elapsed:6.2f}s  {count / elapsed:>8.0f} transactions/s')
+
+def main(count, backends):
+    get_transactions.MFL = mfl
+    publisher._sqs_client = StubSQS()
+    publisher._queue_url = 'stub'
+    os.environ.setdefault('MFL_LEAGUEID', '12345')
+
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in backends:
+            measure(backend, count, directory)
+
+    runtime.reset()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000, sys.argv[2:] or ['memory', 'sqlite'])
@@ -0,0 +1,78 @@
+"""
+Counts DynamoDB write calls made by the daily player sync against moto for a
+synthetic player universe: per-player update_item (the previous sync), the
+first diff-only sync, a no-change day and a day where 1% of players changed
+
+    python benchmarks/bench_player_sync.py [number_of_players]
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import boto3
+from moto import mock_dynamodb2
+from get_players import store_players, format_name
+from pymfl.models.player import Player
+
+WRITE_OPERATIONS = ('PutItem', 'UpdateItem', 'DeleteItem', 'BatchWriteItem')
+
+
+def synthetic_players(count, changed_every=None):
+    players = []
+
+    for i in range(count):
+        team = 'FA' if changed_every and i % changed_every == 0 else f'T{i % 32:02}'
+        players.append({'id': f'{10000 + i}', 'name': f'Player{i}, Test', 'position': 'WR', 'team': team})
+
+    return players
+
+def update_item_per_player(players):
+    players_table = boto3.resource('dynamodb').Table('players')
+
+    for player in players:
+        players_table.update_item(
+            Key={'id': player['id']},
+            ExpressionAttributeNames={'#N': 'name', '#P': 'position', '#T': 'team'},
+            ExpressionAttributeValues={':n': format_name(player['name']), ':p': player['position'], ':t': player['team']},
+            UpdateExpression='SET #N=:n, #P=:p, #T=:t'
+        )
+
+def measure(calls, label, sync, players):
+    calls.clear()
+    start = time.perf_counter()
+    result = sync(players)
+    elapsed = time.perf_counter() - start
+    writes = sum(calls[operation] for operation in WRITE_OPERATIONS)
+
+    print(f'{label:<24} write calls: {writes:>5}  all calls: {sum(calls.values()):>5}  {elapsed:6.2f}s  {result or ""}')
+
+def main(count):
+    with mock_dynamodb2():
+        boto3.client('dynamodb').create_table(
+            TableName='players',
+            AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+            KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}]
+        )
+
+        calls = Counter()
+        boto3.setup_default_session()
+        boto3.DEFAULT_SESSION.events.register(
+            'before-call.dynamodb', lambda model, **kwargs: calls.update([model.name])
+        )
+
+        players_json = synthetic_players(count)
+        players = [Player.from_json(player) for player in players_json]
+        changed_players = [Player.from_json(player) for player in synthetic_players(count, 100)]
+
+        measure(calls, 'update_item per player', update_item_per_player, players_json)
+        measure(calls, 'diff sync, first run', store_players, players)
+        measure(calls, 'diff sync, no change', store_players, players)
+        measure(calls, 'diff sync, 1% changed', store_players, changed_players)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,60 @@
+"""
+Compares peak RSS and wall time of reading a large players export whole with
+MFL.players() against streaming it with MFL.iter_players(), each in its own
+process so peak RSS is not shared, against a local stub server
+
+    python benchmarks/bench_streaming.py [number_of_players]
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'test')]
+
+from pymfl.mfl import MFL
+from pymfl.models.player import Player
+from stub_mfl_server import StubMFLServer
+
+FIELDS = ['id', 'name', 'position', 'team']
+
+
+def players_export(count):
+    """Players with the extra detail fields MFL returns with DETAILS=1"""
+    return {'players': {'timestamp': '1608890400', 'player': [
+        {
+            'id': str(10000 + i), 'name': f'Player{i}, Test', 'position': 'WR', 'team': f'T{i % 32:02}',
+            'status': 'R', 'birthdate': '738460800', 'college': 'Some State University', 'height': '73',
+            'weight': '205', 'draft_year': '2018', 'draft_team': 'KCC', 'draft_round': '3', 'draft_pick': '12',
+            'stats_id': str(30000 + i), 'espn_id': str(40000 + i), 'twitter_username': f'player{i}'
+        }
+        for i in range(count)
+    ]}}
+
+def run(mode, base_url):
+    MFL._base_url = base_url
+    mfl = MFL('user', 'pass', 12345, 2020)
+
+    start = time.perf_counter()
+    if mode == 'load':
+        players = [Player.from_json(player) for player in mfl.players()]
+        count = sum(1 for _ in players)
+    else:
+        count = sum(1 for _ in (Player.from_json(player) for player in mfl.iter_players(FIELDS)))
+    elapsed = time.perf_counter() - start
+
+    peak_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f'{mode:<7} players: {count}  time: {elapsed:6.2f}s  peak rss: {peak_rss_kib / 1024:6.1f}MiB')
+
+def main(count):
+    with StubMFLServer({'players': players_export(count)}) as server:
+        for mode in ('load', 'stream'):
+            subprocess.run([sys.executable, __file__, '--run', mode, server.base_url], check=True)
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--run']:
+        run(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
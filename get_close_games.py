@@ -1,26 +1,33 @@
-import json
 import os
-import boto3
 from pymfl.mfl import MFL
+from pymfl.models.matchup import Matchup
+from bdfl.lookups import entity_lookup
+from bdfl.sqs import publisher
+from bdfl import runtime
+from bdfl.metrics import per_invocation
 
+@per_invocation
 def handler(event, context):
     mfl = MFL(
         os.getenv('MFL_USERNAME'),
         os.getenv('MFL_PASSWORD'),
         os.getenv('MFL_LEAGUEID'),
-        os.getenv('MFL_API_YEAR')
+        os.getenv('MFL_API_YEAR'),
+        session=runtime.mfl_session(),
+        login_cache=runtime.mfl_login_cache()
         )
     
-    live_scores = mfl.live_scores()
+    live_scores = [Matchup.from_json(matchup) for matchup in mfl.live_scores()]
 
     close_games_message = close_games(live_scores)
 
+    published = send_sqs_messages(close_games_message)
+
     body = {
-        'close_games': close_games_message
+        'close_games': close_games_message,
+        'published': published
     }
 
-    send_sqs_messages(close_games_message)
-
     response = {
         "statusCode": 200,
         "body": body
@@ -47,16 +54,16 @@ def close_games(live_scores):
     
     return close_games_message
 
-def create_matchup_object(matchup):
-    franchises = matchup['franchise']
+def create_matchup_object(matchup: Matchup):
+    franchise1, franchise2 = matchup.franchises
 
-    franchise1_id = franchises[0]['id']
-    franchise1_score = franchises[0]['score']
-    franchise1_num_players_left = franchises[0]['playersYetToPlay']
+    franchise1_id = franchise1.franchise_id
+    franchise1_score = franchise1.score
+    franchise1_num_players_left = franchise1.players_yet_to_play
 
-    franchise2_id = franchises[1]['id']
-    franchise2_score = franchises[1]['score']
-    franchise2_num_players_left = franchises[1]['playersYetToPlay']
+    franchise2_id = franchise2.franchise_id
+    franchise2_score = franchise2.score
+    franchise2_num_players_left = franchise2.players_yet_to_play
 
     franchise1_name = get_field_from_id('franchises', 'name', franchise1_id)
     franchise2_name = get_field_from_id('franchises', 'name', franchise2_id)
@@ -111,36 +118,9 @@ def create_close_game_message(matchup_obj):
 
 def get_field_from_id(table_name, field, primary_id):
 
-    dynamodb = boto3.resource('dynamodb')
-
-    table = dynamodb.Table(table_name)
-
-    item = table.get_item(
-        Key={
-            'id': primary_id
-        }
-    )
-
-    name = item['Item'][field]
-
-    return name
+    return entity_lookup.get_field(table_name, field, primary_id)
 
 def send_sqs_messages(messages):
+    """Publishes messages in batches, returns a result per message with its message_id or error"""
 
-    for message in messages:
-        send_sqs_message('BDFLMessageQueue', message)
-
-def send_sqs_message(queue_name, message):
-    sqs_client = boto3.client('sqs')
-    sqs_queue_url = sqs_client.get_queue_url(QueueName=queue_name)['QueueUrl']
-    
-    try:
-        msg = sqs_client.send_message(
-            QueueUrl=sqs_queue_url,
-            MessageBody=message
-        )
-    except Exception as e:
-        print(e)
-        return None
-    
-    return msg
\ No newline at end of file
+    return publisher.publish(messages)
@@ -1,20 +1,29 @@
-import json
 import os
-import boto3
 from pymfl.mfl import MFL
+from pymfl.http_cache import ResponseCache
+from bdfl.lookups import EntityLookup
+from bdfl.snapshots import lookup_snapshots
+from bdfl import runtime
+from bdfl.metrics import per_invocation
 
+response_cache = ResponseCache()
 
+@per_invocation
 def handler(event, context):
     mfl = MFL(
         os.getenv('MFL_USERNAME'),
         os.getenv('MFL_PASSWORD'),
         os.getenv('MFL_LEAGUEID'),
-        os.getenv('MFL_API_YEAR')
+        os.getenv('MFL_API_YEAR'),
+        cache=response_cache,
+        session=runtime.mfl_session(),
+        login_cache=runtime.mfl_login_cache()
         )
     
     franchises = mfl.franchises()
 
-    store_franchises_in_dynamodb(franchises)
+    store_franchises(franchises)
+    publish_franchises_snapshot(franchises)
 
     body = {
         'franchises': franchises.get_franchises()
@@ -27,28 +36,22 @@ def handler(event, context):
 
     return response
 
-def store_franchises_in_dynamodb(franchises):
-    dynamodb = boto3.resource('dynamodb')
-
-    franchise_table = dynamodb.Table('franchises')
-
+def store_franchises(franchises):
     franchise_dict = franchises.get_franchises()
 
-    for fid in franchise_dict.keys():
-        franchise = franchise_dict[fid]
-        franchise_table.update_item(
-            Key={
-                'id': fid
-            },
-            ExpressionAttributeNames={
-                '#N': 'name',
-                '#D': 'division_id',
-                '#B': 'blind_bid_dollars'
-            },
-            ExpressionAttributeValues={
-                ':n': franchise.name, 
-                ':d': franchise.division_id,
-                ':b': franchise.blind_bid_dollars, 
-            },
-            UpdateExpression='SET #N=:n, #D=:d, #B=:b'
-        )
+    with runtime.storage().batch_writer('franchises') as batch:
+        for fid in franchise_dict.keys():
+            franchise = franchise_dict[fid]
+            batch.put({
+                'id': fid,
+                'name': franchise.name,
+                'division_id': franchise.division_id,
+                'blind_bid_dollars': franchise.blind_bid_dollars
+            })
+
+def publish_franchises_snapshot(franchises):
+    """Publishes the lookup snapshot notifications read franchises from, see bdfl.snapshots"""
+    fields = EntityLookup.TABLE_FIELDS['franchises']
+    items = [{'id': fid, 'name': franchise.name} for fid, franchise in franchises.get_franchises().items()]
+
+    return lookup_snapshots.publish('franchises', items, 'id', fields)
@@ -0,0 +1,131 @@
+import os
+import time
+from pymfl.mfl import MFL
+from pymfl.http_cache import ResponseCache
+from bdfl.checkpoints import get_checkpoint, advance_checkpoint
+from bdfl.lookups import entity_lookup
+from bdfl.rosters import roster_index
+from bdfl.sqs import publisher, all_published
+from bdfl import runtime
+from bdfl.metrics import per_invocation
+
+response_cache = ResponseCache()
+
+INJURIES_TABLE = 'injuries'
+SNAPSHOT_CHECKPOINT = 'injuries_synced_at'
+
+@per_invocation
+def handler(event, context):
+    mfl = MFL(
+        os.getenv('MFL_USERNAME'),
+        os.getenv('MFL_PASSWORD'),
+        os.getenv('MFL_LEAGUEID'),
+        os.getenv('MFL_API_YEAR'),
+        cache=response_cache,
+        session=runtime.mfl_session(),
+        login_cache=runtime.mfl_login_cache()
+        )
+
+    synced_at = int(time.time())
+    injured_players = mfl.injuries().get_players()
+
+    current = {
+        player_id: (player.injury_status, player.injury_details)
+        for player_id, player in injured_players.items()
+    }
+    previous = get_injury_snapshot()
+    changes = diff_injuries(previous, current)
+
+    # the first run only records the report, every injury on it would look new
+    if get_checkpoint(SNAPSHOT_CHECKPOINT) is None:
+        notified = []
+    else:
+        notified = rostered_changes(changes)
+
+    messages = format_injury_messages(notified, current)
+    published = publisher.publish(messages)
+
+    # unsent changes are left out of the snapshot so the next run finds them again, the rest are stored
+    unsent = {player_id for (player_id, _, _), result in zip(notified, published) if result['message_id'] is None}
+    store_injury_changes([change for change in changes if change[0] not in unsent], current)
+
+    if all_published(published):
+        advance_checkpoint(SNAPSHOT_CHECKPOINT, synced_at)
+
+    body = {
+        'changes': len(changes),
+        'injuries': messages,
+        'published': published
+    }
+
+    response = {
+        "statusCode": 200,
+        "body": body
+    }
+
+    return response
+
+def get_injury_snapshot():
+    """Returns {player_id: (status, details)} of the injury report as of the previous run"""
+    return {
+        item['id']: (item['status'], item.get('details'))
+        for item in runtime.storage().scan(INJURIES_TABLE)
+    }
+
+def diff_injuries(previous, current):
+    """
+    Returns (player_id, previous_status, status) for every player whose status differs between
+    the two {player_id: (status, details)} reports, a status is None when the player is not on
+    that report. A change of details alone is not a change
+    """
+    previous_statuses = {(player_id, status) for player_id, (status, _) in previous.items()}
+    current_statuses = {(player_id, status) for player_id, (status, _) in current.items()}
+    changed_ids = {player_id for player_id, _ in previous_statuses ^ current_statuses}
+
+    return [
+        (player_id, previous.get(player_id, (None, None))[0], current.get(player_id, (None, None))[0])
+        for player_id in sorted(changed_ids)
+    ]
+
+def rostered_changes(changes):
+    """Drops changes of players no franchise rosters, see bdfl.rosters"""
+    return [change for change in changes if roster_index.owner(change[0]) is not None]
+
+def format_injury_messages(changes, current):
+    """One line per change naming the player and the franchise that rosters them"""
+    entity_lookup.prefetch('players', [player_id for player_id, _, _ in changes])
+    entity_lookup.prefetch('franchises', [roster_index.owner(player_id) for player_id, _, _ in changes])
+
+    messages = []
+
+    for player_id, previous_status, status in changes:
+        name = entity_lookup.get_field('players', 'name', player_id)
+        team = entity_lookup.get_field('players', 'team', player_id)
+        position = entity_lookup.get_field('players', 'position', player_id)
+        franchise_name = entity_lookup.get_field('franchises', 'name', roster_index.owner(player_id))
+        player = f'{name}, {team} {position} ({franchise_name})'
+
+        details = current.get(player_id, (None, None))[1]
+        details = f': {details}' if details else ''
+
+        if status is None:
+            messages.append(f'✅ {player} is off the injury report')
+        elif previous_status is None:
+            messages.append(f'🚑 {player} is {status}{details}')
+        else:
+            messages.append(f'🚑 {player} went from {previous_status} to {status}{details}')
+
+    return messages
+
+def store_injury_changes(changes, current):
+    """Writes only the players whose status changed, removing those that came off the report"""
+    with runtime.storage().batch_writer(INJURIES_TABLE) as batch:
+        for player_id, _, status in changes:
+            if status is None:
+                batch.delete(player_id)
+            else:
+                batch.put({
+                    'id': player_id,
+                    'status': status,
+                    'details': current[player_id][1]
+                })
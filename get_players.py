@@ -1,23 +1,60 @@
-import json
+import hashlib
 import os
-import boto3
+import time
 from pymfl.mfl import MFL
+from pymfl.models.player import Player
+from pymfl.http_cache import ResponseCache
+from bdfl.checkpoints import get_checkpoint, advance_checkpoint
+from bdfl.lookups import EntityLookup
+from bdfl.snapshots import lookup_snapshots
+from bdfl import runtime
+from bdfl.metrics import per_invocation
 
+response_cache = ResponseCache()
 
+SYNC_CHECKPOINT = 'players_synced_at'
+FULL_SYNC_CHECKPOINT = 'players_full_synced_at'
+FULL_SYNC_INTERVAL_SECS = int(os.getenv('PLAYERS_FULL_SYNC_DAYS', 7)) * 86400
+# delta requests start this far before the previous run to tolerate clock skew with MFL
+SINCE_OVERLAP_SECS = 900
+PLAYER_FIELDS = ['id', 'name', 'position', 'team']
+
+@per_invocation
 def handler(event, context):
     mfl = MFL(
         os.getenv('MFL_USERNAME'),
         os.getenv('MFL_PASSWORD'),
         os.getenv('MFL_LEAGUEID'),
-        os.getenv('MFL_API_YEAR')
+        os.getenv('MFL_API_YEAR'),
+        cache=response_cache,
+        session=runtime.mfl_session(),
+        login_cache=runtime.mfl_login_cache()
         )
     
-    players = mfl.players()
+    sync_started_at = int(time.time())
+    last_synced_at = get_checkpoint(SYNC_CHECKPOINT)
+    full_sync = is_full_sync_due(event, last_synced_at, sync_started_at)
+
+    if full_sync:
+        # streamed so the full export is never held in memory at once
+        players = (Player.from_json(player) for player in mfl.iter_players(PLAYER_FIELDS))
+    else:
+        players = [Player.from_json(player) for player in mfl.players(since=str(last_synced_at - SINCE_OVERLAP_SECS))]
+
+    sync_counts = store_players(players, delete_missing=full_sync)
+
+    if full_sync:
+        publish_players_snapshot(sync_started_at)
+    else:
+        publish_players_snapshot(sync_started_at, players, last_synced_at)
 
-    store_players_in_dynamodb(players)
+    advance_checkpoint(SYNC_CHECKPOINT, sync_started_at)
+    if full_sync:
+        advance_checkpoint(FULL_SYNC_CHECKPOINT, sync_started_at)
 
     body = {
-        'trades': players
+        'full_sync': full_sync,
+        'sync': sync_counts
     }
 
     response = {
@@ -27,28 +64,105 @@ def handler(event, context):
 
     return response
 
-def store_players_in_dynamodb(players):
-    dynamodb = boto3.resource('dynamodb')
-
-    players_table = dynamodb.Table('players')
-
-    for player in players:
-        players_table.update_item(
-            Key={
-                'id': player['id']
-            },
-            ExpressionAttributeNames={
-                '#N': 'name',
-                '#P': 'position',
-                '#T': 'team'
-            },
-            ExpressionAttributeValues={
-                ':n': format_name(player['name']) if 'name' in player.keys() else 'N/A', 
-                ':p': player['position'] if 'position' in player.keys() else 'N/A',
-                ':t': player['team'] if 'team' in player.keys() else 'N/A'
-            },
-            UpdateExpression='SET #N=:n, #P=:p, #T=:t'
-        )
+def is_full_sync_due(event, last_synced_at, now):
+    """Full sync when asked for by the event, when there is no checkpoint, or when the last full sync is too old"""
+    if (event or {}).get('full_sync') or last_synced_at is None:
+        return True
+
+    last_full_synced_at = get_checkpoint(FULL_SYNC_CHECKPOINT)
+
+    return last_full_synced_at is None or now - last_full_synced_at >= FULL_SYNC_INTERVAL_SECS
+
+def store_players(players, delete_missing=True):
+    """
+    Writes only players that are new or whose name, position or team changed since the
+    last sync and returns the counts of each. When players is the full export,
+    delete_missing also deletes players MFL no longer returns, a delta sync must
+    pass delete_missing=False. With delete_missing players may be a generator, it is
+    only iterated once
+    """
+    storage = runtime.storage()
+
+    if delete_missing:
+        synced_hashes = get_synced_player_hashes(storage)
+    else:
+        synced_hashes = get_synced_player_hashes_by_id(storage, [player.player_id for player in players])
+    counts = {
+        'inserted': 0,
+        'updated': 0,
+        'unchanged': 0,
+        'deleted': 0
+    }
+
+    with storage.batch_writer('players') as batch:
+        for player in players:
+            item = create_player_item(player)
+            synced_hash = synced_hashes.pop(item['id'], None)
+
+            if synced_hash == item['content_hash']:
+                counts['unchanged'] += 1
+                continue
+
+            batch.put(item)
+            counts['inserted' if synced_hash is None else 'updated'] += 1
+
+        if delete_missing:
+            for player_id in synced_hashes:
+                batch.delete(player_id)
+                counts['deleted'] += 1
+
+    return counts
+
+def publish_players_snapshot(built_at, delta_players=None, last_synced_at=None):
+    """
+    Publishes the lookup snapshot notifications read players from, see
+    bdfl.snapshots. After a delta sync the stored snapshot is patched with
+    delta_players, so only a full sync, or a delta sync without a stored
+    snapshot from the last sync to patch, scans the players table
+    """
+    fields = EntityLookup.TABLE_FIELDS['players']
+    previous = lookup_snapshots.stored('players') if delta_players is not None else None
+
+    if previous is not None and previous.fields == fields and previous.built_at >= last_synced_at:
+        items = {player_id: dict(values, id=player_id) for player_id, values in previous.items()}
+        for player in delta_players:
+            item = create_player_item(player)
+            items[item['id']] = item
+        items = items.values()
+    else:
+        items = runtime.storage().scan('players', fields)
+
+    return lookup_snapshots.publish('players', items, 'id', fields, built_at)
+
+def get_synced_player_hashes(storage):
+    """Returns {player id: content hash} for every stored player, '' for rows synced before hashes existed"""
+    return {
+        item['id']: item.get('content_hash', '')
+        for item in storage.scan('players', ['content_hash'])
+    }
+
+def get_synced_player_hashes_by_id(storage, player_ids):
+    """Same as get_synced_player_hashes for only player_ids, read with batch_get"""
+    return {
+        player_id: item.get('content_hash', '')
+        for player_id, item in storage.batch_get('players', player_ids, ['content_hash']).items()
+    }
+
+def create_player_item(player: Player):
+    item = {
+        'id': player.player_id,
+        'name': format_name(player.name) if player.name is not None else 'N/A',
+        'position': player.position if player.position is not None else 'N/A',
+        'team': player.team if player.team is not None else 'N/A'
+    }
+    item['content_hash'] = hash_player_item(item)
+
+    return item
+
+def hash_player_item(item):
+    content = '\x1f'.join([item['name'], item['position'], item['team']])
+
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
 
 def format_name(player_name):
     
@@ -0,0 +1,47 @@
+import os
+from pymfl.mfl import MFL
+from pymfl.models.league_rosters import LeagueRosters
+from pymfl.http_cache import ResponseCache
+from bdfl.rosters import roster_index
+from bdfl import runtime
+from bdfl.metrics import per_invocation
+
+response_cache = ResponseCache()
+
+@per_invocation
+def handler(event, context):
+    """
+    Daily consistency check of the roster index getTransactions keeps up to date:
+    the full rosters export replaces it, and any player the two disagreed on is reported
+    """
+    mfl = MFL(
+        os.getenv('MFL_USERNAME'),
+        os.getenv('MFL_PASSWORD'),
+        os.getenv('MFL_LEAGUEID'),
+        os.getenv('MFL_API_YEAR'),
+        cache=response_cache,
+        session=runtime.mfl_session(),
+        login_cache=runtime.mfl_login_cache()
+        )
+
+    rosters = LeagueRosters.from_json(mfl.rosters())
+
+    mismatches = roster_index.replace(rosters)
+
+    if mismatches:
+        print('roster index mismatches: ', mismatches)
+
+    body = {
+        'rostered_players': len(rosters),
+        'mismatches': {
+            player_id: {'index': index, 'export': export}
+            for player_id, (index, export) in mismatches.items()
+        }
+    }
+
+    response = {
+        "statusCode": 201,
+        "body": body
+    }
+
+    return response
@@ -1,39 +1,48 @@
-import json
 import os
-import boto3
 import datetime
+import itertools
 from pymfl.mfl import MFL
-
-
+from pymfl.models.transaction import Trade
+from bdfl.lookups import entity_lookup
+from bdfl.sqs import publisher
+from bdfl import pipeline
+from bdfl import tracing
+from bdfl import runtime
+from bdfl.metrics import per_invocation
+
+@per_invocation
 def handler(event, context):
     mfl = MFL(
         os.getenv('MFL_USERNAME'),
         os.getenv('MFL_PASSWORD'),
         os.getenv('MFL_LEAGUEID'),
-        os.getenv('MFL_API_YEAR')
+        os.getenv('MFL_API_YEAR'),
+        session=runtime.mfl_session(),
+        login_cache=runtime.mfl_login_cache()
         )
     
-    trades = mfl.trades()
-
-    test_object = {
-        'timestamp': 'test',
-        'comments': 'test',
-        'franchise': '0008',
-        'franchise2': '0007',
-        'franchise1_gave_up': 'DP_0_1',
-        'franchise2_gave_up': '14136,13631,FP_0004_2022_3,'
-    }
+    trades = pipeline.parse(mfl.iter_transactions("", 'TRADE'), Trade)
+
+    test_object = Trade(
+        timestamp='test',
+        comments='test',
+        franchise_id='0008',
+        franchise2_id='0007',
+        franchise1_gave_up='DP_0_1',
+        franchise2_gave_up='14136,13631,FP_0004_2022_3,'
+    )
 
-    trades.append(test_object)
+    trades = itertools.chain(trades, [test_object])
 
-    new_trades_messages = store_trades_if_not_exist(trades)
+    # each micro-batch is published as soon as its trades are stored, while later ones are still read
+    with tracing.span('get_trades'):
+        published = pipeline.collect(pipeline.publish(new_trade_messages(trades), publisher))
 
     body = {
-        'trades': new_trades_messages
+        'trades': [result['message'] for result in published],
+        'published': published
     }
 
-    send_sqs_messages(new_trades_messages)
-
     response = {
         "statusCode": 200,
         "body": body
@@ -41,41 +50,13 @@ def handler(event, context):
 
     return response
 
-def get_trades_messages(trades):
-
-    trades_messages = []
-
-    for trade in trades:
-        trade_message = create_trade_message(trade)
-        trades_messages.append(trade_message)
-
-    return trades_messages
-
-def create_trade_message(trade):
-    formatted_trade = format_trade(trade)
-
-    message = format_trade_message(
-        formatted_trade['franchise1_name'],
-        formatted_trade['franchise2_name'],
-        formatted_trade['franchise1_assets'],
-        formatted_trade['franchise2_assets']
-    )
-
-    return message
-
-def format_trade(trade):
-
-    formatted_trade = create_trade_object(trade)
-
-    return formatted_trade
-
-def create_trade_object(trade):
-    timestamp = trade['timestamp']
-    comments = trade['comments']
-    franchise1_id = trade['franchise']
-    franchise2_id = trade['franchise2']
-    franchise1_gave_up = trade['franchise1_gave_up']
-    franchise2_gave_up = trade['franchise2_gave_up']
+def create_trade_object(trade: Trade):
+    timestamp = trade.timestamp
+    comments = trade.comments
+    franchise1_id = trade.franchise_id
+    franchise2_id = trade.franchise2_id
+    franchise1_gave_up = trade.franchise1_gave_up
+    franchise2_gave_up = trade.franchise2_gave_up
 
     # get franchise names from ids
     franchise1_name = get_field_from_id('franchises', 'name', franchise1_id)
@@ -136,19 +117,23 @@ def get_assets(assets):
 
 def get_field_from_id(table_name, field, primary_id):
 
-    dynamodb = boto3.resource('dynamodb')
+    return entity_lookup.get_field(table_name, field, primary_id)
 
-    table = dynamodb.Table(table_name)
+def trade_entity_ids(trade: Trade):
+    """Yields (table_name, id) for every franchise and player a trade message names"""
 
-    item = table.get_item(
-        Key={
-            'id': primary_id
-        }
-    )
+    yield 'franchises', trade.franchise_id
+    yield 'franchises', trade.franchise2_id
+
+    assets = trade.franchise1_gave_up + ',' + trade.franchise2_gave_up
 
-    name = item['Item'][field]
+    for trade_item in assets.split(','):
+
+        if is_future_pick(trade_item):
+            yield 'franchises', trade_item.split('_')[1]
 
-    return name
+        elif trade_item and not is_blind_bid_dollars(trade_item) and not is_current_pick(trade_item):
+            yield 'players', trade_item
 
 def format_trade_message(
         franchise1_name,  
@@ -223,95 +208,35 @@ def create_current_pick_message(trade_item):
 def store_trades_if_not_exist(trades):
     """Stores new trades that did not previously exist in db, returns trades that were stored"""
 
-    new_trades = []
+    return list(new_trade_messages(trades))
 
-    for trade in trades:
-        trade_obj = create_trade_object(trade)
-        if is_new_trade(trade_obj):
-            store_trade_in_dynamodb(trade_obj)
-            trade_message = format_trade_message(
-                trade_obj['franchise1_name'],
-                trade_obj['franchise2_name'],
-                trade_obj['franchise1_assets'],
-                trade_obj['franchise2_assets']
-            )
-            new_trades.append(trade_message)
+def new_trade_messages(trades):
+    """Lazily enriches, stores and formats trades, yields the message of each trade that was new"""
 
-    return new_trades
+    trades = pipeline.prefetch(trades, trade_entity_ids, entity_lookup)
 
-def is_new_trade(trade):
-    return not exists_in_dynamodb('timestamp', trade['timestamp'], 'trades')
+    return pipeline.store_new(trades, create_trade_object, store_trade, format_trade_object_message)
 
-def exists_in_dynamodb(key_name, key_value, table_name):
+def format_trade_object_message(trade_obj):
+
+    message = format_trade_message(
+        trade_obj['franchise1_name'],
+        trade_obj['franchise2_name'],
+        trade_obj['franchise1_assets'],
+        trade_obj['franchise2_assets']
+    )
 
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(table_name)
+    return tracing.traced(message, tracing.trace_context('TRADE', trade_obj['timestamp'], trade_obj['franchise1_id']))
 
-    exists = True
+def store_trade(trade_obj):
+    """
+    Inserts the trade only if no trade with its timestamp is stored yet, in one conditional
+    write so overlapping invocations cannot both claim it. Returns True if the trade was new
+    """
 
-    try:
-        item = table.get_item(
-            Key={
-                key_name: key_value
-            }
-        )
-        item = item['Item']
-    except KeyError:
-        exists = False
-    
-    return exists
-
-def store_trade_in_dynamodb(trade_obj):
-
-    dynamodb = boto3.resource('dynamodb')
-
-    trades_table = dynamodb.Table('trades')
-
-    trades_table.update_item(
-        Key={
-            'timestamp': trade_obj['timestamp']
-        },
-        ExpressionAttributeNames={
-            '#C': 'comments',
-            '#FIDO': 'franchise1_id',
-            '#FIDT': 'franchise2_id',
-            '#FGUO': 'franchise1_gave_up',
-            '#FGUT': 'franchise2_gave_up',
-            '#FNO': 'franchise1_name',
-            '#FNT': 'franchise2_name',
-            '#FAO': 'franchise1_assets',
-            '#FAT': 'franchise2_assets'
-        },
-        ExpressionAttributeValues={
-            ':c': trade_obj['comments'],
-            ':fido': trade_obj['franchise1_id'], 
-            ':fidt': trade_obj['franchise2_id'],
-            ':fguo': trade_obj['franchise1_gave_up'], 
-            ':fgut': trade_obj['franchise2_gave_up'],
-            ':fno': trade_obj['franchise1_name'], 
-            ':fnt': trade_obj['franchise2_name'],
-            ':fao': trade_obj['franchise1_assets'], 
-            ':fat': trade_obj['franchise2_assets']
-        },
-        UpdateExpression='SET #C=:c, #FIDO=:fido, #FIDT=:fidt, #FGUO=:fguo, #FGUT=:fgut, #FNO=:fno, #FNT=:fnt, #FAO=:fao, #FAT=:fat'
-    )
+    return runtime.storage().insert_if_absent('trades', trade_obj)
 
 def send_sqs_messages(messages):
+    """Publishes messages in batches, returns a result per message with its message_id or error"""
 
-    for message in messages:
-        send_sqs_message('BDFLMessageQueue', message)
-
-def send_sqs_message(queue_name, message):
-    sqs_client = boto3.client('sqs')
-    sqs_queue_url = sqs_client.get_queue_url(QueueName=queue_name)['QueueUrl']
-    
-    try:
-        msg = sqs_client.send_message(
-            QueueUrl=sqs_queue_url,
-            MessageBody=message
-        )
-    except Exception as e:
-        print(e)
-        return None
-    
-    return msg
+    return publisher.publish(messages)
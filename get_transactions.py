@@ -0,0 +1,85 @@
+import os
+import time
+from pymfl.mfl import MFL
+from pymfl.models.transaction import Transaction
+from bdfl.dispatch import TransactionDispatcher
+from bdfl.sqs import publisher, all_published
+from bdfl import pipeline
+from bdfl import tracing
+from bdfl.checkpoints import BOOTSTRAP_WINDOW_SECS, get_checkpoint, advance_checkpoint
+from bdfl.rosters import roster_index
+from bdfl import roster_moves
+from bdfl import runtime
+import get_trades
+import get_waivers
+from bdfl.metrics import per_invocation
+
+# trades stream out one message each, the other types are joined into one message per type
+dispatcher = TransactionDispatcher()
+dispatcher.register('TRADE', get_trades.new_trade_messages, get_trades.trade_entity_ids)
+dispatcher.register(
+    ('BBID_WAIVER', 'WAIVER'), get_waivers.new_waiver_messages, get_waivers.waiver_entity_ids, get_waivers.join_waiver_lines
+)
+dispatcher.register(
+    'FREE_AGENT', roster_moves.new_free_agent_lines, roster_moves.roster_move_entity_ids, roster_moves.join_free_agent_lines
+)
+dispatcher.register(
+    'IR', roster_moves.new_injured_reserve_lines, roster_moves.roster_move_entity_ids, roster_moves.join_injured_reserve_lines
+)
+dispatcher.register(
+    'TAXI', roster_moves.new_taxi_squad_lines, roster_moves.roster_move_entity_ids, roster_moves.join_taxi_squad_lines
+)
+
+@per_invocation
+def handler(event, context):
+    mfl = MFL(
+        os.getenv('MFL_USERNAME'),
+        os.getenv('MFL_PASSWORD'),
+        os.getenv('MFL_LEAGUEID'),
+        os.getenv('MFL_API_YEAR'),
+        session=runtime.mfl_session(),
+        login_cache=runtime.mfl_login_cache()
+        )
+
+    checkpoint_name = get_transactions_checkpoint_name(os.getenv('MFL_LEAGUEID'))
+    last_processed_timestamp = get_checkpoint(checkpoint_name)
+    if last_processed_timestamp is None:
+        last_processed_timestamp = int(time.time()) - BOOTSTRAP_WINDOW_SECS
+
+    # every type is streamed from one export and routed by the dispatcher, rows of
+    # types without a handler are dropped before parsing as their fields vary
+    latest = pipeline.LatestTimestamp()
+    transactions = []
+    rows = filter_transactions_after(mfl.iter_transactions("", "*"), last_processed_timestamp)
+    parsed = pipeline.keep(latest.track(pipeline.parse(rows, Transaction)), transactions)
+
+    # each micro-batch is published as soon as its messages are stored, while later rows are still read
+    with tracing.span('get_transactions'):
+        published = pipeline.collect(pipeline.publish(dispatcher.stream(parsed), publisher))
+
+    # applying a transaction twice is harmless, so a run retried before the checkpoint moved is fine
+    roster_index.apply(transactions)
+
+    if latest.value is not None and all_published(published):
+        advance_checkpoint(checkpoint_name, latest.value)
+
+    body = {
+        'transactions': [result['message'] for result in published],
+        'published': published
+    }
+
+    response = {
+        "statusCode": 200,
+        "body": body
+    }
+
+    return response
+
+def get_transactions_checkpoint_name(league_id):
+    return f'transactions_{league_id}'
+
+def filter_transactions_after(transactions, last_processed_timestamp):
+    """Lazily drops raw transaction rows at or before the checkpoint, and those of types no handler is registered for"""
+    for transaction in transactions:
+        if dispatcher.handles(transaction.get('type')) and int(transaction['timestamp']) > last_processed_timestamp:
+            yield transaction
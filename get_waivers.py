@@ -1,18 +1,34 @@
-import json
 import os
 import time
-import boto3
 from pymfl.mfl import MFL
-
+from pymfl.models.transaction import Waiver
+from bdfl.lookups import entity_lookup
+from bdfl.sqs import publisher, all_published
+from bdfl.checkpoints import BOOTSTRAP_WINDOW_SECS, get_checkpoint, advance_checkpoint
+from bdfl import pipeline
+from bdfl import tracing
+from bdfl import runtime
+from bdfl.metrics import per_invocation
+
+@per_invocation
 def handler(event, context):
     mfl = MFL(
         os.getenv('MFL_USERNAME'),
         os.getenv('MFL_PASSWORD'),
         os.getenv('MFL_LEAGUEID'),
-        os.getenv('MFL_API_YEAR')
+        os.getenv('MFL_API_YEAR'),
+        session=runtime.mfl_session(),
+        login_cache=runtime.mfl_login_cache()
         )
     
-    waivers = mfl.waivers()
+    checkpoint_name = get_waivers_checkpoint_name(os.getenv('MFL_LEAGUEID'))
+    last_processed_timestamp = get_checkpoint(checkpoint_name)
+    if last_processed_timestamp is None:
+        last_processed_timestamp = int(time.time()) - BOOTSTRAP_WINDOW_SECS
+
+    latest = pipeline.LatestTimestamp()
+    waivers = pipeline.parse(mfl.iter_transactions("", 'WAIVER'), Waiver)
+    waivers = latest.track(pipeline.only_after(waivers, last_processed_timestamp))
 
     # TODO: make tests for function, move to separate file
     # test_object = {
@@ -72,14 +88,18 @@ def handler(event, context):
     # waivers.append(test6_object)
     # waivers.append(test7_object)
 
-    new_waivers_messages = store_waivers_if_not_exist(waivers)
+    # the joined message is published even when a later waiver fails, its claims are stored already
+    with tracing.span('get_waivers'):
+        published = pipeline.collect(pipeline.publish(store_waivers_if_not_exist(waivers), publisher))
+
+    if latest.value is not None and all_published(published):
+        advance_checkpoint(checkpoint_name, latest.value)
 
     body = {
-        'waivers': new_waivers_messages
+        'waivers': [result['message'] for result in published],
+        'published': published
     }
 
-    send_sqs_messages(new_waivers_messages)
-
     response = {
         "statusCode": 200,
         "body": body
@@ -87,9 +107,12 @@ def handler(event, context):
 
     return response
 
+def get_waivers_checkpoint_name(league_id):
+    return f'waivers_{league_id}'
+
 def store_waivers_if_not_exist(waivers):
     """
-    Stores new waivers that did not previously exist in db, returns waivers that were stored
+    Stores new waivers that did not previously exist in db, lazily yields the message of the waivers that were stored
     waiver_object = {
         'key': key,
         'timestamp': timestamp,
@@ -100,36 +123,49 @@ def store_waivers_if_not_exist(waivers):
         'type': t_type
     }
     """
+    # every claim of a run goes out as one message, so the lines are streamed up to here and joined
+    return pipeline.joined(new_waiver_messages(waivers), join_waiver_lines)
+
+def join_waiver_lines(lines):
+    """The waiver lines as one message under the claims header, an empty list without lines"""
     base_string = '✅WAIVER CLAIMS COMPLETED✅\n'
     new_waivers = [base_string]
-
-    for waiver in waivers:
-        waiver_obj = create_waiver_object(waiver)
-        if is_new_waiver(waiver_obj):
-            store_waiver_in_dynamodb(waiver_obj)
-            waiver_message = format_waiver_message(
-                waiver_obj['franchise_name'],
-                waiver_obj['formatted_transaction']
-            )
-            new_waivers.append(waiver_message)
+    new_waivers += lines
 
     new_waivers_message = []
     if len(new_waivers) > 1:
-        new_waivers_message = ['\n'.join(new_waivers)]
+        # the joined message is as stale as its oldest claim
+        new_waivers_message = [tracing.traced('\n'.join(new_waivers), tracing.oldest_trace(new_waivers))]
 
     return new_waivers_message
 
-def create_waiver_object(waiver):
-    timestamp = waiver['timestamp']
-    franchise_id = waiver['franchise']
-    transaction = waiver['transaction']
-    t_type = waiver['type']
+def new_waiver_messages(waivers):
+    """Lazily enriches, stores and formats waivers, yields the message line of each waiver that was new"""
+
+    waivers = pipeline.prefetch(waivers, waiver_entity_ids, entity_lookup)
+
+    return pipeline.store_new(waivers, create_waiver_object, store_waiver, format_waiver_object_message)
+
+def format_waiver_object_message(waiver_obj):
+
+    message = format_waiver_message(
+        waiver_obj['franchise_name'],
+        waiver_obj['formatted_transaction']
+    )
+
+    return tracing.traced(message, tracing.trace_context(waiver_obj['type'], waiver_obj['timestamp'], waiver_obj['franchise_id']))
+
+def create_waiver_object(waiver: Waiver):
+    timestamp = waiver.timestamp
+    franchise_id = waiver.franchise_id
+    transaction = waiver.transaction
+    t_type = waiver.transaction_type
 
     # get franchise names from ids
     franchise_name = get_field_from_id('franchises', 'name', franchise_id)
 
     # get asset names from gave up statement
-    formatted_transaction = format_transaction(transaction)
+    formatted_transaction = format_transaction(waiver)
     player_added_name = formatted_transaction[1]
     key = create_waivers_table_key(timestamp, player_added_name)
     waiver_object = {
@@ -144,27 +180,22 @@ def create_waiver_object(waiver):
 
     return waiver_object
 
-def get_field_from_id(table_name, field, primary_id):
-
-    dynamodb = boto3.resource('dynamodb')
+def waiver_entity_ids(waiver: Waiver):
+    """Yields (table_name, id) for the franchise and players a waiver message names"""
 
-    table = dynamodb.Table(table_name)
-
-    item = table.get_item(
-        Key={
-            'id': primary_id
-        }
-    )
+    yield 'franchises', waiver.franchise_id
+    yield 'players', waiver.added_player_id
 
-    name = item['Item'][field]
+    if waiver.dropped_player_id:
+        yield 'players', waiver.dropped_player_id
 
-    return name
+def get_field_from_id(table_name, field, primary_id):
 
-def format_transaction(transaction):
+    return entity_lookup.get_field(table_name, field, primary_id)
 
-    split_transaction = transaction.split(',')
+def format_transaction(waiver: Waiver):
 
-    player_added_id = split_transaction[0]
+    player_added_id = waiver.added_player_id
     player_added_name = get_field_from_id('players', 'name', player_added_id)
     player_added_team = get_field_from_id('players', 'team', player_added_id)
     player_added_position = get_field_from_id('players', 'position', player_added_id)
@@ -172,10 +203,9 @@ def format_transaction(transaction):
         f'{player_added_name}, {player_added_team} {player_added_position}'
     )
 
-    bid_and_drop = split_transaction[1].split('|')
-    bid = '$' + bid_and_drop[1]
+    bid = '$' + waiver.bid
 
-    player_dropped_id = bid_and_drop[2] if len(bid_and_drop) == 3 else None
+    player_dropped_id = waiver.dropped_player_id
     player_dropped_string = None
     if player_dropped_id:
         player_dropped_name = get_field_from_id('players', 'name', player_dropped_id)
@@ -192,41 +222,10 @@ def format_transaction(transaction):
 def create_waivers_table_key(timestamp, player_added_name):
     return timestamp + '-' + player_added_name.replace(' ', '-').replace(',','')
 
-def is_new_waiver(waiver):
-    return not is_in_dynamodb('key', waiver['key'], 'waivers') and is_timestamp_recent(int(waiver['timestamp']))
-
-def is_in_dynamodb(key_name, key_value, table_name):
-
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(table_name)
-
-    exists = True
-
-    try:
-        item = table.get_item(
-            Key={
-                key_name: key_value
-            }
-        )
-        item = item['Item']
-    except KeyError:
-        exists = False
-    
-    return exists
-
-def is_timestamp_recent(waiver_timestamp):
-    """
-    86400 seconds in a day, add 900 for 15 min max lambda run time to account for waivers that occurred during
-    previous day's lambda invocation. Timestamps that are less than this recency threshold older than the current
-    timestamp are "recent" otherwise the transaction is old and we do not report it
-    """
-    recency_threshold_in_secs = 87300
-    current_timestamp = int(time.time())
-
-    return (current_timestamp - waiver_timestamp) < recency_threshold_in_secs
-
-def store_waiver_in_dynamodb(waiver_obj):
+def store_waiver(waiver_obj):
     """
+    Inserts the waiver only if its key is not stored yet, in one conditional write so
+    overlapping invocations cannot both claim it. Returns True if the waiver was new
        waiver_object = {
         'key': key,
         'franchise_id': franchise_id,
@@ -237,32 +236,7 @@ def store_waiver_in_dynamodb(waiver_obj):
     }
     """
 
-    dynamodb = boto3.resource('dynamodb')
-
-    waivers_table = dynamodb.Table('waivers')
-
-    waivers_table.update_item(
-        Key={
-            'key': waiver_obj['key']
-        },
-        ExpressionAttributeNames={
-            '#FID': 'franchise_id',
-            '#RT': 'raw_transaction',
-            '#FT': 'formatted_transaction',
-            '#FN': 'franchise_name',
-            '#T': 'type',
-            '#TS': 'timestamp'
-        },
-        ExpressionAttributeValues={
-            ':fid': waiver_obj['franchise_id'],
-            ':rt': waiver_obj['raw_transaction'], 
-            ':ft': waiver_obj['formatted_transaction'],
-            ':fn': waiver_obj['franchise_name'], 
-            ':t': waiver_obj['type'],
-            ':ts': waiver_obj['timestamp'],
-        },
-        UpdateExpression='SET #FID=:fid, #RT=:rt, #FT=:ft, #FN=:fn, #T=:t, #TS=:ts'
-    )
+    return runtime.storage().insert_if_absent('waivers', waiver_obj)
 
 def format_waiver_message(
         franchise_name,
@@ -292,21 +266,6 @@ def format_add_drop_string(transaction):
     return message
 
 def send_sqs_messages(messages):
+    """Publishes messages in batches, returns a result per message with its message_id or error"""
 
-    for message in messages:
-        send_sqs_message('BDFLMessageQueue', message)
-
-def send_sqs_message(queue_name, message):
-    sqs_client = boto3.client('sqs')
-    sqs_queue_url = sqs_client.get_queue_url(QueueName=queue_name)['QueueUrl']
-    
-    try:
-        msg = sqs_client.send_message(
-            QueueUrl=sqs_queue_url,
-            MessageBody=message
-        )
-    except Exception as e:
-        print(e)
-        return None
-    
-    return msg
\ No newline at end of file
+    return publisher.publish(messages)
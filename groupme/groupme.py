@@ -1,13 +1,24 @@
-import requests
+from typing import TYPE_CHECKING
+from .packing import pack_messages, pack_messages_with_sources
+
+if TYPE_CHECKING:
+    import requests
 
 class GroupMe:
     _base_url = f'https://api.groupme.com/v3/'
     CHARACTER_LIMIT = 450
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, pool_size: int = 10, session: 'requests.Session' = None):
 
         self._api_key = api_key
-        self._api = requests.Session()
+
+        # a session passed in keeps its own adapters, pool_size only sizes the one created here
+        if session is not None:
+            self._api = session
+        else:
+            import requests
+            self._api = requests.Session()
+            self._api.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
 
     def send_message(self, bot_id, message):
         url = self._base_url + 'bots/post'
@@ -21,20 +32,11 @@ class GroupMe:
     def format_bdfl_messages_for_character_limit(self, messages):
         """
         Takes in array of messages list(str) and returns list of messages
-        that comply with CHARACTER_LIMIT of GroupMe messages
+        that comply with CHARACTER_LIMIT of GroupMe messages, packed into as
+        few posts as possible while keeping their order
         """
-        messages_to_send = []
-        limited_message = ""
-
-        for message in messages:
-            for i in message.split('\n'):
-                if len(limited_message) + len(i) < self.CHARACTER_LIMIT:
-                    limited_message += i + '\n'
-                else:
-                    messages_to_send.append(limited_message[:-1])
-                    limited_message = i + '\n'
-            
-            if len(message) > 0:
-                messages_to_send.append(limited_message[:-1])
-        
-        return messages_to_send
\ No newline at end of file
+        return pack_messages(messages, self.CHARACTER_LIMIT)
+
+    def format_bdfl_messages_with_sources(self, messages):
+        """format_bdfl_messages_for_character_limit, with each post paired with the indexes of the messages it carries"""
+        return pack_messages_with_sources(messages, self.CHARACTER_LIMIT)
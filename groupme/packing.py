@@ -0,0 +1,105 @@
+def message_length(text: str):
+    """Length of text the way GroupMe counts it, in UTF-16 code units, so most emoji count as 2"""
+    return len(text.encode('utf-16-le')) // 2
+
+def hard_wrap(line: str, limit: int):
+    """Splits line into pieces of at most limit, at the last space that fits when there is one"""
+    pieces = []
+
+    while message_length(line) > limit:
+        end = 0
+        length = 0
+        for char in line:
+            char_length = message_length(char)
+            if length + char_length > limit:
+                break
+            length += char_length
+            end += 1
+
+        # a limit smaller than one character still has to make progress
+        end = max(end, 1)
+
+        space = line.rfind(' ', 0, end + 1)
+        if space > 0:
+            pieces.append(line[:space])
+            line = line[space + 1:]
+        else:
+            pieces.append(line[:end])
+            line = line[end:]
+
+    pieces.append(line)
+
+    return pieces
+
+def pack_messages(messages: list, limit: int):
+    """
+    Packs notification messages, in order, into as few posts of at most limit as possible.
+    Among packings with the fewest posts it picks the one that splits the fewest
+    notifications across posts. Notifications sharing a post are separated by a blank
+    line and lines longer than limit are hard wrapped
+    """
+    return [post for post, _ in pack_messages_with_sources(messages, limit)]
+
+def pack_messages_with_sources(messages: list, limit: int):
+    """pack_messages, with each post paired with the indexes in messages of the notifications it carries"""
+    lines = []
+    notification_ids = []
+
+    for notification_id, message in enumerate(messages):
+        message = message.strip('\n')
+        if not message:
+            continue
+
+        for line in message.split('\n'):
+            for piece in hard_wrap(line, limit):
+                lines.append(piece)
+                notification_ids.append(notification_id)
+
+    line_lengths = [message_length(line) for line in lines]
+    count = len(lines)
+
+    # best[j] = (posts, split notifications) for packing lines[:j] with a post ending at j
+    best = [None] * (count + 1)
+    previous = [0] * (count + 1)
+    best[0] = (0, 0)
+
+    for i in range(count):
+        if best[i] is None:
+            continue
+
+        length = -1
+        for j in range(i + 1, count + 1):
+            # each line adds a newline before it, a new notification adds a blank line too
+            length += line_lengths[j - 1] + 1
+            if j - 1 > i and notification_ids[j - 1] != notification_ids[j - 2]:
+                length += 1
+
+            if length > limit:
+                break
+
+            splits = 1 if j < count and notification_ids[j] == notification_ids[j - 1] else 0
+            candidate = (best[i][0] + 1, best[i][1] + splits)
+
+            if best[j] is None or candidate < best[j]:
+                best[j] = candidate
+                previous[j] = i
+
+    boundaries = []
+    j = count
+    while j > 0:
+        boundaries.append((previous[j], j))
+        j = previous[j]
+
+    posts = []
+    for start, end in reversed(boundaries):
+        post_lines = [lines[start]]
+        for k in range(start + 1, end):
+            if notification_ids[k] != notification_ids[k - 1]:
+                post_lines.append('')
+            post_lines.append(lines[k])
+
+        post = '\n'.join(post_lines).strip('\n')
+        if post:
+            posts.append((post, sorted(set(notification_ids[start:end]))))
+
+    return posts
@@ -0,0 +1,138 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .groupme import GroupMe
+
+
+class TokenBucket:
+    """Thread safe token bucket allowing rate acquisitions per second with bursts of up to capacity"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class MessageSender:
+    """
+    Posts messages through GroupMe bots. Messages for different bots are sent
+    concurrently, messages for the same bot strictly in order. Every post takes
+    a token from a shared TokenBucket, and 429 and 5xx responses or connection
+    errors are retried with jittered exponential backoff. A Retry-After is
+    honoured up to max_retry_delay_secs, and no retry waits past deadline (a
+    time.monotonic() value) so the caller is left time to report failures
+    """
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+            self,
+            groupme: GroupMe,
+            rate_per_sec: float = 1.0,
+            burst: int = 3,
+            max_retries: int = 3,
+            backoff_secs: float = 0.5,
+            max_retry_delay_secs: float = 10.0,
+            max_workers: int = 4,
+            deadline: float = None):
+
+        self._groupme = groupme
+        self._bucket = TokenBucket(rate_per_sec, burst)
+        self._max_retries = max_retries
+        self._backoff_secs = backoff_secs
+        self._max_retry_delay_secs = max_retry_delay_secs
+        self._max_workers = max_workers
+        self._deadline = deadline
+
+    def send(self, bot_id, messages):
+        """Sends messages in order through one bot, returns a delivery status per message"""
+        return self.send_all([(bot_id, message) for message in messages])
+
+    def send_all(self, bot_messages):
+        """
+        Takes a list of (bot_id, message) and returns a delivery status per message in the same order:
+        {'bot_id': bot_id, 'message': message, 'delivered': bool, 'status_code': int or None,
+         'attempts': int, 'error': None or the reason it was not delivered,
+         'delivered_at': epoch seconds GroupMe accepted it or None}
+        """
+        statuses = [
+            {'bot_id': bot_id, 'message': message, 'delivered': False, 'status_code': None, 'attempts': 0, 'error': None,
+             'delivered_at': None}
+            for bot_id, message in bot_messages
+        ]
+
+        statuses_by_bot = {}
+        for status in statuses:
+            statuses_by_bot.setdefault(status['bot_id'], []).append(status)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            for future in [pool.submit(self._send_in_order, bot_statuses) for bot_statuses in statuses_by_bot.values()]:
+                future.result()
+
+        return statuses
+
+    def _send_in_order(self, statuses):
+        for status in statuses:
+            self._send_with_retries(status)
+
+    def _send_with_retries(self, status):
+        # imported here rather than with the module so handlers load it with their session, see bdfl.runtime
+        import requests
+
+        while True:
+            self._bucket.acquire()
+            status['attempts'] += 1
+            retry_after = None
+
+            try:
+                response = self._groupme.send_message(status['bot_id'], status['message'])
+            except requests.RequestException as e:
+                status['error'] = str(e)
+            else:
+                status['status_code'] = response.status_code
+                status['delivered'] = 200 <= response.status_code < 300
+
+                if status['delivered']:
+                    status['error'] = None
+                    status['delivered_at'] = time.time()
+                    return
+
+                status['error'] = f'HTTP {response.status_code}'
+                if response.status_code not in self.RETRY_STATUS_CODES:
+                    return
+
+                retry_after = response.headers.get('Retry-After')
+
+            if status['attempts'] > self._max_retries:
+                return
+
+            delay = self._retry_delay(status['attempts'], retry_after)
+            if self._deadline is not None and time.monotonic() + delay > self._deadline:
+                status['error'] += ', out of time to retry'
+                return
+
+            time.sleep(delay)
+
+    def _retry_delay(self, attempt, retry_after):
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self._max_retry_delay_secs)
+
+        return random.uniform(0, self._backoff_secs * 2 ** (attempt - 1))
@@ -0,0 +1,81 @@
+import asyncio
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from .mfl import MFL
+from .http_cache import ResponseCache
+
+
+class AsyncMFL:
+    """
+    asyncio variant of MFL with the same public methods as coroutines. Requests
+    run on a thread pool sized max_concurrency, which bounds how many are in
+    flight at once, so several endpoints can be fetched concurrently:
+
+        league, transactions = await mfl.gather(mfl.franchises(), mfl.transactions())
+    """
+
+    def __init__(
+            self,
+            username: str,
+            password: str,
+            league_id: int,
+            year: int,
+            json: bool = True,
+            max_concurrency: int = 4,
+            cache: ResponseCache = None):
+
+        self._mfl = MFL(username, password, league_id, year, json, cache)
+        self._mfl._api.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=max_concurrency))
+        self._mfl._api.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=max_concurrency))
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def gather(self, *requests):
+        """Awaits requests concurrently and returns their results in the order given"""
+        return await asyncio.gather(*requests)
+
+    async def login(self):
+        return await self._run(self._mfl.login)
+
+    async def league_info(self):
+        return await self._run(self._mfl.league_info)
+
+    async def franchises(self):
+        return await self._run(self._mfl.franchises)
+
+    async def trades(self, number_of_days: str = ""):
+        return await self._run(self._mfl.trades, number_of_days)
+
+    async def waivers(self, number_of_days: str = ""):
+        return await self._run(self._mfl.waivers, number_of_days)
+
+    async def live_scores(self):
+        return await self._run(self._mfl.live_scores)
+
+    async def transactions(self, number_of_days: str = "", transaction_type: str = "*"):
+        return await self._run(self._mfl.transactions, number_of_days, transaction_type)
+
+    async def injuries(self, week: str = ""):
+        return await self._run(self._mfl.injuries, week)
+
+    async def current_week_injuries(self):
+        return await self.injuries()
+
+    async def rosters(self):
+        return await self._run(self._mfl.rosters)
+
+    async def players(self, since: str = ""):
+        return await self._run(self._mfl.players, since)
+
+    async def _run(self, method, *args):
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(self._executor, method, *args)
@@ -0,0 +1,65 @@
+import threading
+import time
+
+
+class MFLAuthenticationError(Exception):
+    """MFL rejected the login, or a request made with the login cookie"""
+
+
+class LoginCache:
+    """
+    MFL_USER_ID login cookies by username and year, kept until they expire or
+    max_age seconds after login, whichever comes first. Cookies are held in
+    memory so warm containers reuse them, and in store if one is given so cold
+    containers can too. store needs get(key), returning the dict passed to
+    put or None, and put(key, login) which may keep whichever login expires last
+    """
+
+    DEFAULT_MAX_AGE = 12 * 60 * 60
+
+    def __init__(self, store=None, max_age: int = DEFAULT_MAX_AGE):
+        self._store = store
+        self._max_age = max_age
+        self._logins = {}
+        self._lock = threading.Lock()
+
+    def get(self, username: str, year) -> str:
+        """Returns the cookie for username's login in year, or None if there is no live one"""
+        key = self._key(username, year)
+
+        with self._lock:
+            login = self._logins.get(key)
+
+        if login is None and self._store is not None:
+            login = self._store.get(key)
+            if login is not None:
+                with self._lock:
+                    self._logins[key] = login
+
+        if login is None or login['expires'] <= time.time():
+            return None
+
+        return login['cookie']
+
+    def put(self, username: str, year, cookie: str, expires: float = None):
+        """Keeps cookie until expires, a unix timestamp, capped at max_age from now"""
+        key = self._key(username, year)
+        max_expires = int(time.time()) + self._max_age
+        login = {'cookie': cookie, 'expires': min(int(expires), max_expires) if expires else max_expires}
+
+        with self._lock:
+            self._logins[key] = login
+
+        if self._store is not None:
+            self._store.put(key, login)
+
+    def clear(self):
+        with self._lock:
+            self._logins = {}
+
+    def _key(self, username, year):
+        return f'{year}-{username}'
+
+
+# shared by MFL instances that are not given a LoginCache
+login_cache = LoginCache()
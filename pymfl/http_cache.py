@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class ResponseCache:
+    """
+    On-disk cache of MFL export responses. Each entry keeps the body next to the
+    ETag/Last-Modified validators it was served with, so it can be parsed whole
+    with fetch or read back in chunks with stream. max_age maps endpoint to:
+        None - never cached, always fetched in full
+        0    - always revalidated with a conditional GET, 304s served from disk
+        n    - served from disk without a request for n seconds, then revalidated
+    Parsed bodies are also kept in memory so warm containers skip json.loads.
+    Callers must treat returned values as read only since they are shared
+    """
+
+    DEFAULT_MAX_AGE = {
+        # just under a day so the daily getPlayers sync always revalidates
+        'players': 23 * 60 * 60,
+        'league': 60 * 60,
+        'rosters': 0,
+        'injuries': 0,
+        'liveScoring': None,
+        'transactions': None
+    }
+
+    def __init__(self, cache_dir: str = None, max_age: dict = None):
+        self._cache_dir = cache_dir or os.getenv(
+            'MFL_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'pymfl-cache')
+        )
+        self._max_age = dict(self.DEFAULT_MAX_AGE, **(max_age or {}))
+        self._parsed = {}
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+    def fetch(self, session, endpoint: str, url: str, cookies: dict = None):
+        """Returns the parsed JSON body for url, using the cache according to endpoint's max age"""
+        key, entry, response = self._open(session, endpoint, url, False, cookies)
+
+        if response is None:
+            return self._cached_body(key, entry)
+
+        if key is None:
+            return self._parse(response.content)
+
+        entry = self._entry(response, hashlib.sha256(response.content).hexdigest())
+        self._write_body(key, [response.content])
+        self._write(key, entry)
+
+        return self._cached_body(key, entry)
+
+    def stream(self, session, endpoint: str, url: str, chunk_size: int = 64 * 1024, cookies: dict = None):
+        """
+        Yields the raw body for url in chunks, using the cache according to endpoint's max age.
+        A body downloaded in full is written to the cache as it streams past
+        """
+        key, entry, response = self._open(session, endpoint, url, True, cookies)
+
+        if response is None:
+            with open(self._body_path(key), 'rb') as f:
+                yield from iter(lambda: f.read(chunk_size), b'')
+            return
+
+        if key is None:
+            yield from response.iter_content(chunk_size)
+            return
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir)
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    yield chunk
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        os.replace(tmp_path, self._body_path(key))
+        self._write(key, self._entry(response, digest.hexdigest()))
+
+    def discard(self, url: str):
+        """Drops the entry for url, so a body that should not have been cached is fetched again"""
+        key = self._key(url)
+        self._parsed.pop(key, None)
+
+        for path in (self._path(key), self._body_path(key)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def clear(self):
+        self._parsed = {}
+
+        for name in os.listdir(self._cache_dir):
+            os.remove(os.path.join(self._cache_dir, name))
+
+    def _open(self, session, endpoint, url, stream, cookies=None):
+        """
+        Returns (key, entry, response): response is None when the cached entry can be served,
+        key is None when endpoint is never cached
+        """
+        max_age = self._max_age.get(endpoint)
+
+        if max_age is None:
+            return None, None, self._get(session, url, {}, stream, cookies)
+
+        key = self._key(url)
+        entry = self._read(key)
+
+        if entry and time.time() - entry['stored_at'] < max_age:
+            return key, entry, None
+
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self._get(session, url, headers, stream, cookies)
+
+        if response.status_code == 304 and entry:
+            response.close()
+            entry['stored_at'] = time.time()
+            self._write(key, entry)
+            return key, entry, None
+
+        return key, None, response
+
+    def _get(self, session, url, headers, stream=False, cookies=None):
+        response = session.get(url, headers=headers, stream=stream, cookies=cookies)
+
+        if response.status_code not in (200, 304):
+            raise Exception(response)
+
+        return response
+
+    def _entry(self, response, digest):
+        return {
+            'stored_at': time.time(),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'digest': digest
+        }
+
+    def _cached_body(self, key, entry):
+        parsed = self._parsed.get(key)
+
+        if parsed is None or parsed[0] != entry['digest']:
+            with open(self._body_path(key), 'rb') as f:
+                parsed = (entry['digest'], self._parse(f.read()))
+            self._parsed[key] = parsed
+
+        return parsed[1]
+
+    def _parse(self, body):
+        return json.loads(body)
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self._cache_dir, key + '.json')
+
+    def _body_path(self, key):
+        return os.path.join(self._cache_dir, key + '.body')
+
+    def _read(self, key):
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return entry if os.path.exists(self._body_path(key)) else None
+
+    def _write(self, key, entry):
+        fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(key))
+
+    def _write_body(self, key, chunks):
+        fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir)
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, self._body_path(key))
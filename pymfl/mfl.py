@@ -1,13 +1,21 @@
-import requests
 import json
 import os
+import threading
+from typing import TYPE_CHECKING
 from .models.franchise import Franchise
 from .models.league_franchises import LeagueFranchises
 from .models.player import Player
 from .models.players import Players
+from .http_cache import ResponseCache
+from .streaming import iter_json_array
+from .auth import LoginCache, MFLAuthenticationError, login_cache as default_login_cache
+
+if TYPE_CHECKING:
+    import requests
 
 class MFL:
     _base_url = 'https://api.myfantasyleague.com/'
+    LOGIN_COOKIE = 'MFL_USER_ID'
 
     def __init__(
             self, 
@@ -15,25 +23,59 @@ class MFL:
             password: str, 
             league_id: int,
             year: int,
-            json: bool = True):
+            json: bool = True,
+            cache: ResponseCache = None,
+            session: 'requests.Session' = None,
+            login_cache: LoginCache = None):
 
         self._year = year
         self._username = username
         self._password = password
         self._league_id = league_id
         self._json = '1' if json else '0'
-        self._api = requests.Session()
+        # a session passed in can be shared between instances to reuse its connections, requests is
+        # only imported when none is, handlers pass the runtime's
+        if session is None:
+            import requests
+            session = requests.Session()
+        self._api = session
+        self._cache = cache
+        # logins are reused across instances until they expire, see LoginCache
+        self._login_cache = login_cache if login_cache is not None else default_login_cache
+        self._login_lock = threading.Lock()
+        self._login_url = self._base_url + f'{self._year}/login'
         self._base_url += f'{self._year}/export?'
 
     def login(self):
-        login = self._get_request(
-            'login',
-            ['USERNAME', 'PASSWORD'],
-            USERNAME=self._username,
-            PASSWORD=self._password
+        """
+        Logs in with a POST so the credentials travel in the body rather than the url,
+        caches the MFL_USER_ID cookie MFL returns and returns it
+        """
+        response = self._api.post(
+            self._login_url,
+            data={'USERNAME': self._username, 'PASSWORD': self._password, 'JSON': '1'}
         )
 
-        return login.status_code
+        if response.status_code != 200:
+            raise Exception(response)
+
+        cookie = response.cookies.get(self.LOGIN_COOKIE)
+        expires = next((c.expires for c in response.cookies if c.name == self.LOGIN_COOKIE), None)
+
+        # each request sends the cookie itself, keep it out of the possibly shared session
+        for jar_cookie in [c for c in self._api.cookies if c.name == self.LOGIN_COOKIE]:
+            self._api.cookies.clear(jar_cookie.domain, jar_cookie.path, jar_cookie.name)
+
+        if cookie is None:
+            status = json.loads(response.content).get('status')
+            cookie = status.get(self.LOGIN_COOKIE) if isinstance(status, dict) else None
+
+        if cookie is None:
+            raise MFLAuthenticationError(f'MFL login failed for {self._username}: {response.content[:200]!r}')
+
+        self._login_cache.put(self._username, self._year, cookie, expires)
+
+        return cookie
 
     def league_info(self):
         league_info = self._get_request(
@@ -52,7 +94,7 @@ class MFL:
         league_franchises = LeagueFranchises()
         
         for franchise_raw in raw_list_of_franchises:
-            franchise = Franchise(franchise_raw)
+            franchise = Franchise.from_json(franchise_raw)
             league_franchises.add_franchise(franchise)
 
         return league_franchises
@@ -85,7 +127,10 @@ class MFL:
             TRANS_TYPE=transaction_type
         )
         
-        return transactions['transactions']['transaction']
+        # MFL omits transaction when there are none and returns a bare object for a single one
+        transaction_list = transactions['transactions'].get('transaction', [])
+
+        return [transaction_list] if isinstance(transaction_list, dict) else transaction_list
     
     def injuries(self, week: str = ""):
         injuries = self._get_request(
@@ -94,38 +139,86 @@ class MFL:
             W=week
         )
 
-        injuries_json = json.loads(injuries.content)
-        raw_list_of_injuries = injuries_json['injuries']['injury']
+        # MFL omits injury when nobody is hurt and returns a bare object for a single one
+        injury_list = injuries['injuries'].get('injury', [])
+        if isinstance(injury_list, dict):
+            injury_list = [injury_list]
 
         injured_players = Players()
 
-        for player_injury in raw_list_of_injuries:
-            player = Player(player_injury)
+        for player_injury in injury_list:
+            player = Player.from_json(player_injury)
             injured_players.add_player(player)
 
-        
         return injured_players
 
     def current_week_injuries(self):
         return self.injuries()
 
     def rosters(self):
+        """Returns list of franchises, each with its id and player list, see LeagueRosters.from_json"""
         rosters = self._get_request(
             'rosters',
             ['L'],
             L=self._league_id
         )
-        
-        return rosters.content
 
-    def players(self):
-        players = self._get_request(
-            'players',
-            ['L'],
-            L=self._league_id
+        # MFL returns a bare object for a league with a single franchise
+        franchise_list = rosters['rosters'].get('franchise', [])
+
+        return [franchise_list] if isinstance(franchise_list, dict) else franchise_list
+
+    def players(self, since: str = ""):
+        """Returns list of players, only those updated after the unix timestamp since if it is passed"""
+        if since:
+            players = self._get_request(
+                'players',
+                ['L', 'SINCE'],
+                L=self._league_id,
+                SINCE=since
+            )
+        else:
+            players = self._get_request(
+                'players',
+                ['L'],
+                L=self._league_id
+            )
+
+        # MFL omits player when nothing changed and returns a bare object for a single player
+        player_list = players['players'].get('player', [])
+
+        return [player_list] if isinstance(player_list, dict) else player_list
+
+    def iter_players(self, fields: list = None, since: str = ""):
+        """Yields players one at a time from the streamed export, with only fields if they are given"""
+        kwargs = {'L': self._league_id}
+        if since:
+            kwargs['SINCE'] = since
+
+        return self._stream_request('players', ['L'], ('players', 'player'), fields, **kwargs)
+
+    def iter_transactions(self, number_of_days: str = "", transaction_type: str = "*", fields: list = None):
+        """Yields transactions one at a time from the streamed export, with only fields if they are given"""
+        return self._stream_request(
+            'transactions',
+            ['L', 'DAYS', 'TRANS_TYPE'],
+            ('transactions', 'transaction'),
+            fields,
+            L=self._league_id,
+            DAYS=number_of_days,
+            TRANS_TYPE=transaction_type
         )
-        
-        return players['players']['player']
+
+    def iter_rosters(self, fields: list = None):
+        """Yields one dict per rostered player, with the owning franchise id under 'franchise'"""
+        franchises = self._stream_request('rosters', ['L'], ('rosters', 'franchise'), None, L=self._league_id)
+
+        for franchise in franchises:
+            players = franchise.get('player', [])
+
+            for player in [players] if isinstance(players, dict) else players:
+                player = dict(player, franchise=franchise['id'])
+                yield player if fields is None else {f: player[f] for f in fields if f in player}
 
     def _build_request(self, endpoint: str, required_args: list(), kwargs):
         """Creates url to use for request given the endpoint name, required arguments, and keyword arguments"""
@@ -153,12 +246,105 @@ class MFL:
 
     def _get_request(self, endpoint, required_args, **kwargs):
         request = self._build_request(endpoint, required_args, kwargs)
+        cookies = self._cached_login_cookies()
+
+        try:
+            return self._fetch(endpoint, request, cookies)
+        except MFLAuthenticationError:
+            if not self._has_credentials():
+                raise
+
+        # MFL wants a login, or no longer accepts the cached one, log in and retry once
+        return self._fetch(endpoint, request, self._renewed_login_cookies(cookies))
+
+    def _fetch(self, endpoint, request, cookies):
+        if self._cache is not None:
+            response_json = self._cache.fetch(self._api, endpoint, request, cookies=cookies)
+        else:
+            response = self._api.get(request, cookies=cookies)
+
+            self._check_response(response)
+
+            response_json = json.loads(response.content)
+
+        if self._is_login_error(response_json):
+            if self._cache is not None:
+                self._cache.discard(request)
+            raise MFLAuthenticationError(response_json['error'])
+
+        return response_json
+
+    def _stream_request(self, endpoint, required_args, path, fields, **kwargs):
+        request = self._build_request(endpoint, required_args, kwargs)
+
+        return iter_json_array(self._authenticated_chunks(endpoint, request), path, fields)
+
+    def _authenticated_chunks(self, endpoint, request):
+        """
+        Yields the body of request in chunks. A login error is a short body that comes
+        in one chunk, so only a short first chunk is checked for one before the
+        request is retried with a new login
+        """
+        cookies = self._cached_login_cookies()
+        chunks = self._chunks(endpoint, request, cookies)
+        first = next(chunks, b'')
+
+        if len(first) < 1024 and self._has_credentials() and self._is_login_error_body(first):
+            chunks.close()
+            chunks = self._chunks(endpoint, request, self._renewed_login_cookies(cookies))
+            first = next(chunks, b'')
+
+        yield first
+        yield from chunks
+
+    def _chunks(self, endpoint, request, cookies):
+        if self._cache is not None:
+            return self._cache.stream(self._api, endpoint, request, cookies=cookies)
+
+        return self._stream_chunks(request, cookies)
+
+    def _stream_chunks(self, request, cookies):
+        with self._api.get(request, stream=True, cookies=cookies) as response:
+            self._check_response(response)
+
+            yield from response.iter_content(64 * 1024)
+
+    def _check_response(self, response):
+        if response.status_code in (401, 403):
+            raise MFLAuthenticationError(response)
 
-        response = self._api.get(request)
-        
         if response.status_code != 200:
             raise Exception(response)
-        
-        response_json = json.loads(response.content)
 
-        return response_json
\ No newline at end of file
+    def _has_credentials(self):
+        return bool(self._username and self._password)
+
+    def _cached_login_cookies(self):
+        """Cookies of the cached login, None to send the request without one"""
+        cookie = self._login_cache.get(self._username, self._year) if self._has_credentials() else None
+
+        return {self.LOGIN_COOKIE: cookie} if cookie is not None else None
+
+    def _renewed_login_cookies(self, rejected_cookies):
+        """Cookies of a login other than rejected_cookies, logging in unless another thread just did"""
+        rejected = (rejected_cookies or {}).get(self.LOGIN_COOKIE)
+
+        with self._login_lock:
+            cookie = self._login_cache.get(self._username, self._year)
+            if cookie is None or cookie == rejected:
+                cookie = self.login()
+
+        return {self.LOGIN_COOKIE: cookie}
+
+    def _is_login_error(self, response_json):
+        """MFL answers requests it needs a login for with a 200 and an error naming the login"""
+        error = response_json.get('error') if isinstance(response_json, dict) else None
+        message = error.get('$t', '') if isinstance(error, dict) else str(error or '')
+
+        return 'logged in' in message.lower() or 'login' in message.lower()
+
+    def _is_login_error_body(self, body):
+        try:
+            return self._is_login_error(json.loads(body))
+        except ValueError:
+            return False
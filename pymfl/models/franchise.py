@@ -1,12 +1,22 @@
 class Franchise():
     """Struct representing franchise object returned from MFL"""
+    __slots__ = ('franchise_id', 'name', 'blind_bid_dollars', 'division_id', 'roster')
 
-    def __init__(self, franchise_json):
-        self.name = franchise_json['name']
-        self.franchise_id = franchise_json['id']
-        self.blind_bid_dollars = franchise_json['bbidAvailableBalance']
-        self.division_id = franchise_json['division']
-        self.roster = {}
+    def __init__(self, franchise_id, name, blind_bid_dollars=None, division_id=None, roster=None):
+        self.franchise_id = franchise_id
+        self.name = name
+        self.blind_bid_dollars = blind_bid_dollars
+        self.division_id = division_id
+        self.roster = roster if roster is not None else {}
+
+    @classmethod
+    def from_json(cls, franchise_json):
+        return cls(
+            franchise_json['id'],
+            franchise_json['name'],
+            franchise_json.get('bbidAvailableBalance'),
+            franchise_json.get('division')
+        )
 
     def __repr__(self):
         id_str = f'franchise id: {self.franchise_id}'
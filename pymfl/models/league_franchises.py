@@ -1,6 +1,7 @@
 from .franchise import Franchise
 
 class LeagueFranchises():
+    __slots__ = ('_franchises',)
 
     def __init__(self):
         self._franchises = {}
@@ -0,0 +1,152 @@
+from .roster_entry import RosterEntry
+from .transaction import Transaction, Trade, Waiver, FreeAgent
+
+class LeagueRosters():
+    """
+    Every rostered player in the league, indexed both by player id and by
+    franchise id so owner and roster queries are dict lookups. apply moves
+    players as transactions are processed, so the index stays current
+    without downloading the rosters export again
+    """
+    __slots__ = ('_entries', '_rosters')
+
+    # status of the players on each side of IR and TAXI transactions, see apply
+    MOVE_STATUSES = {
+        'IR': ('ROSTER', 'INJURED_RESERVE'),
+        'TAXI': ('ROSTER', 'TAXI_SQUAD')
+    }
+
+    def __init__(self, entries=()):
+        self._entries = {}
+        self._rosters = {}
+
+        for entry in entries:
+            self.add_entry(entry)
+
+    @classmethod
+    def from_json(cls, rosters_json):
+        """Builds the index from MFL.rosters(), a list of franchises each with its player list"""
+        league_rosters = cls()
+
+        for franchise in rosters_json:
+            players = franchise.get('player', [])
+
+            for player in [players] if isinstance(players, dict) else players:
+                league_rosters.add_entry(RosterEntry.from_json(player, franchise['id']))
+
+        return league_rosters
+
+    def __repr__(self):
+        return self._rosters.__repr__()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, player_id):
+        return player_id in self._entries
+
+    def add_entry(self, entry: RosterEntry):
+        """Puts entry on its franchise's roster, off any other one"""
+        self.remove_player(entry.player_id)
+
+        self._entries[entry.player_id] = entry
+        self._rosters.setdefault(entry.franchise_id, {})[entry.player_id] = entry
+
+    def remove_player(self, player_id):
+        """Takes player_id off its roster, returns its entry or None if it was not rostered"""
+        entry = self._entries.pop(player_id, None)
+
+        if entry is not None:
+            roster = self._rosters[entry.franchise_id]
+            del roster[player_id]
+            if not roster:
+                del self._rosters[entry.franchise_id]
+
+        return entry
+
+    def get_entry(self, player_id):
+        return self._entries.get(player_id)
+
+    def get_entries(self):
+        return self._entries
+
+    def owner(self, player_id):
+        """Returns the id of the franchise rostering player_id, None if it is a free agent"""
+        entry = self._entries.get(player_id)
+
+        return entry.franchise_id if entry is not None else None
+
+    def roster(self, franchise_id):
+        """Returns {player_id: RosterEntry} for franchise_id, in the shape of Franchise.roster"""
+        return dict(self._rosters.get(franchise_id, {}))
+
+    def apply(self, transaction: Transaction):
+        """
+        Updates the index for a processed transaction and returns the ids of the
+        players whose entry changed. Applying a transaction again changes nothing
+        """
+        before = {}
+
+        def move(player_id, franchise_id, status='ROSTER'):
+            previous = self.remove_player(player_id)
+            before.setdefault(player_id, previous)
+
+            if franchise_id is not None:
+                # the contract stays with the player through trades and status changes
+                salary, contract_year = (previous.salary, previous.contract_year) if previous else (None, None)
+                self.add_entry(RosterEntry(player_id, franchise_id, status, salary, contract_year))
+
+        if isinstance(transaction, Trade):
+            for player_id in _player_ids(transaction.franchise1_gave_up):
+                move(player_id, transaction.franchise2_id)
+            for player_id in _player_ids(transaction.franchise2_gave_up):
+                move(player_id, transaction.franchise_id)
+
+        elif isinstance(transaction, Waiver):
+            if transaction.dropped_player_id:
+                move(transaction.dropped_player_id, None)
+            if transaction.added_player_id:
+                move(transaction.added_player_id, transaction.franchise_id)
+
+        elif isinstance(transaction, FreeAgent):
+            for player_id in transaction.dropped_player_ids:
+                move(player_id, None)
+            for player_id in transaction.added_player_ids:
+                move(player_id, transaction.franchise_id)
+
+        elif transaction.transaction_type in self.MOVE_STATUSES:
+            first_status, second_status = self.MOVE_STATUSES[transaction.transaction_type]
+            first, _, second = transaction.transaction.partition('|')
+
+            for player_ids, status in ((first, first_status), (second, second_status)):
+                for player_id in _player_ids(player_ids):
+                    move(player_id, transaction.franchise_id, status)
+
+        return {
+            player_id for player_id, entry in before.items()
+            if _entry_key(entry) != _entry_key(self._entries.get(player_id))
+        }
+
+    def diff(self, other):
+        """
+        Returns {player_id: (franchise_id, status)} pairs that differ from other, as
+        (this index's, other's), None for a player one of them does not roster
+        """
+        mismatches = {}
+
+        for player_id in self._entries.keys() | other.get_entries().keys():
+            ours = _entry_key(self._entries.get(player_id))
+            theirs = _entry_key(other.get_entry(player_id))
+
+            if ours != theirs:
+                mismatches[player_id] = (ours, theirs)
+
+        return mismatches
+
+
+def _player_ids(assets):
+    """Player ids in a comma separated asset list, skipping draft picks and blind bid dollars"""
+    return [asset for asset in assets.split(',') if asset.isdigit()]
+
+def _entry_key(entry):
+    return (entry.franchise_id, entry.status) if entry is not None else None
@@ -0,0 +1,30 @@
+class MatchupFranchise():
+    """Struct representing one side of a live scoring matchup"""
+    __slots__ = ('franchise_id', 'score', 'players_yet_to_play')
+
+    def __init__(self, franchise_id, score, players_yet_to_play):
+        self.franchise_id = franchise_id
+        self.score = score
+        self.players_yet_to_play = players_yet_to_play
+
+    @classmethod
+    def from_json(cls, franchise_json):
+        return cls(franchise_json['id'], franchise_json['score'], franchise_json.get('playersYetToPlay'))
+
+
+class Matchup():
+    """Struct representing live scoring matchup returned from MFL"""
+    __slots__ = ('franchises',)
+
+    def __init__(self, franchises):
+        self.franchises = franchises
+
+    @classmethod
+    def from_json(cls, matchup_json):
+        return cls([MatchupFranchise.from_json(franchise) for franchise in matchup_json['franchise']])
+
+    def __repr__(self):
+        return ' vs '.join(f'{franchise.franchise_id} {franchise.score}' for franchise in self.franchises)
+
+    def __str__(self):
+        return self.__repr__()
@@ -1,16 +1,38 @@
 class Player():
-    """Struct representing player object returned from MFL"""
+    """
+    Struct representing player object returned from MFL, built from either the
+    players export (name, position, team) or the injuries export (status)
+    """
+    __slots__ = ('player_id', 'name', 'position', 'team', 'injury_status', 'injury_details')
 
-    def __init__(self, player_json):
-        self.player_id = player_json['id']
-        self.injury_status = player_json['status']
-        self.roster_status = self.get_roster
+    def __init__(self, player_id, name=None, position=None, team=None, injury_status=None, injury_details=None):
+        self.player_id = player_id
+        self.name = name
+        self.position = position
+        self.team = team
+        self.injury_status = injury_status
+        self.injury_details = injury_details
+
+    @classmethod
+    def from_json(cls, player_json):
+        # skips __init__, a full players export builds thousands of these
+        get = player_json.get
+        player = cls.__new__(cls)
+        player.player_id = player_json['id']
+        player.name = get('name')
+        player.position = get('position')
+        player.team = get('team')
+        player.injury_status = get('status')
+        player.injury_details = get('details')
+
+        return player
 
     def __repr__(self):
         id_str = f'player id: {self.player_id}'
+        name_str = f'name: {self.name}'
         status_str = f'injury status: {self.injury_status}'
 
-        return '{' + ',\n\t'.join([id_str, status_str]) + '}'
+        return '{' + ',\n\t'.join([id_str, name_str, status_str]) + '}'
     
     def __str__(self):
         return self.__repr__()
@@ -1,6 +1,7 @@
 from .player import Player
 
 class Players():
+    __slots__ = ('_players',)
 
     def __init__(self):
         self._players = {}
@@ -11,4 +12,7 @@ class Players():
     def add_player(self, player: Player): 
         self._players[player.player_id] = player
 
-        return self._players
\ No newline at end of file
+        return self._players
+
+    def get_players(self):
+        return self._players
@@ -0,0 +1,22 @@
+class RosterEntry():
+    """Struct representing a player on a franchise's roster returned from MFL"""
+    __slots__ = ('player_id', 'franchise_id', 'status', 'salary', 'contract_year')
+
+    def __init__(self, player_id, franchise_id, status='ROSTER', salary=None, contract_year=None):
+        self.player_id = player_id
+        self.franchise_id = franchise_id
+        self.status = status
+        self.salary = salary
+        self.contract_year = contract_year
+
+    @classmethod
+    def from_json(cls, player_json, franchise_id):
+        get = player_json.get
+
+        return cls(player_json['id'], franchise_id, get('status', 'ROSTER'), get('salary'), get('contractYear'))
+
+    def __repr__(self):
+        return f'RosterEntry({self.player_id}, {self.franchise_id}, {self.status})'
+
+    def __str__(self):
+        return self.__repr__()
@@ -0,0 +1,101 @@
+class Transaction():
+    """
+    Struct representing a transaction returned from MFL. from_json builds the
+    subclass registered for the transaction's type, or a plain Transaction
+    keeping the raw transaction string for types without one
+    """
+    __slots__ = ('transaction_type', 'timestamp', 'franchise_id', 'transaction')
+
+    TYPES = {}
+
+    def __init__(self, transaction_type, timestamp, franchise_id, transaction=''):
+        self.transaction_type = transaction_type
+        self.timestamp = timestamp
+        self.franchise_id = franchise_id
+        self.transaction = transaction
+
+    @classmethod
+    def register(cls, *transaction_types):
+        def decorator(subclass):
+            for transaction_type in transaction_types:
+                cls.TYPES[transaction_type] = subclass
+            return subclass
+
+        return decorator
+
+    @classmethod
+    def from_json(cls, transaction_json):
+        transaction_class = Transaction.TYPES.get(transaction_json['type'], Transaction)
+
+        return transaction_class._from_json(transaction_json)
+
+    @classmethod
+    def _from_json(cls, transaction_json):
+        return cls(
+            transaction_json['type'],
+            transaction_json['timestamp'],
+            transaction_json['franchise'],
+            transaction_json.get('transaction', '')
+        )
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.transaction_type}, {self.timestamp}, {self.franchise_id})'
+
+    def __str__(self):
+        return self.__repr__()
+
+
+@Transaction.register('TRADE')
+class Trade(Transaction):
+    """franchise gave up franchise1_gave_up to franchise2 for franchise2_gave_up, both comma separated asset ids"""
+    __slots__ = ('franchise2_id', 'franchise1_gave_up', 'franchise2_gave_up', 'comments')
+
+    def __init__(self, timestamp, franchise_id, franchise2_id, franchise1_gave_up, franchise2_gave_up, comments=''):
+        super().__init__('TRADE', timestamp, franchise_id)
+        self.franchise2_id = franchise2_id
+        self.franchise1_gave_up = franchise1_gave_up
+        self.franchise2_gave_up = franchise2_gave_up
+        self.comments = comments
+
+    @classmethod
+    def _from_json(cls, transaction_json):
+        return cls(
+            transaction_json['timestamp'],
+            transaction_json['franchise'],
+            transaction_json['franchise2'],
+            transaction_json['franchise1_gave_up'],
+            transaction_json['franchise2_gave_up'],
+            transaction_json.get('comments', '')
+        )
+
+
+@Transaction.register('BBID_WAIVER', 'WAIVER')
+class Waiver(Transaction):
+    """Waiver claim, transaction is 'added_id,|bid|dropped_id' where dropped_id may be empty"""
+    __slots__ = ('added_player_id', 'bid', 'dropped_player_id')
+
+    def __init__(self, transaction_type, timestamp, franchise_id, transaction):
+        super().__init__(transaction_type, timestamp, franchise_id, transaction)
+
+        added, _, bid_and_drop = transaction.partition(',')
+        bid_and_drop = bid_and_drop.split('|')
+
+        dropped = bid_and_drop[2].rstrip(',') if len(bid_and_drop) > 2 else ''
+
+        self.added_player_id = added
+        self.bid = bid_and_drop[1] if len(bid_and_drop) > 1 else None
+        self.dropped_player_id = dropped or None
+
+
+@Transaction.register('FREE_AGENT')
+class FreeAgent(Transaction):
+    """Free agent move, transaction is 'added_ids|dropped_ids' with each side comma separated"""
+    __slots__ = ('added_player_ids', 'dropped_player_ids')
+
+    def __init__(self, transaction_type, timestamp, franchise_id, transaction):
+        super().__init__(transaction_type, timestamp, franchise_id, transaction)
+
+        added, _, dropped = transaction.partition('|')
+
+        self.added_player_ids = [player_id for player_id in added.split(',') if player_id]
+        self.dropped_player_ids = [player_id for player_id in dropped.split(',') if player_id]
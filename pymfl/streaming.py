@@ -0,0 +1,164 @@
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_whitespace = ' \t\n\r'
+
+
+class _ChunkReader:
+    """Text buffer over an iterator of str or bytes chunks, read in as more of the document is needed"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+
+    def read_more(self):
+        """Appends the next chunk to the unread part of the buffer, returns False at the end of the document"""
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                self.buffer = self.buffer[self.pos:] + chunk
+                self.pos = 0
+                return True
+
+        return False
+
+    def drain(self):
+        """Reads the rest of the document so a source that caches what streams past sees all of it"""
+        while self.read_more():
+            self.pos = len(self.buffer)
+
+    def skip(self, characters):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in characters:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.read_more():
+                return
+
+    def peek(self):
+        self.skip(_whitespace)
+
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else None
+
+    def skip_value(self):
+        """Moves past the next value without decoding it, so skipping a large array holds none of it in memory"""
+        self.skip(_whitespace)
+        depth = 0
+        in_string = escaped = False
+
+        while True:
+            while self.pos < len(self.buffer):
+                character = self.buffer[self.pos]
+
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif character == '\\':
+                        escaped = True
+                    elif character == '"':
+                        in_string = False
+                        if depth == 0:
+                            self.pos += 1
+                            return
+                elif character == '"':
+                    in_string = True
+                elif character in '[{':
+                    depth += 1
+                elif character in ']}':
+                    # a number, true, false or null ends where its enclosing object or array does
+                    if depth == 0:
+                        return
+                    depth -= 1
+                    if depth == 0:
+                        self.pos += 1
+                        return
+                elif depth == 0 and character in _whitespace + ',':
+                    return
+
+                self.pos += 1
+
+            if not self.read_more():
+                return
+
+    def decode_value(self):
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.read_more():
+                    raise
+                continue
+
+            self.pos = end
+            return value
+
+
+def iter_json_array(chunks, path, fields=None):
+    """
+    Yields the elements of the array at path, a sequence of object keys, in the
+    JSON document made of chunks, one element at a time so the whole document is
+    never held in memory. Each element is a dict projected down to fields when
+    they are given. A single object at path, which is how MFL returns a one
+    element list, is yielded on its own and a missing path yields nothing
+    """
+    reader = _ChunkReader(chunks)
+
+    yield from _iter_elements(reader, path, fields)
+
+    reader.drain()
+
+def _iter_elements(reader, path, fields):
+    for key in path:
+        if not _find_member(reader, key):
+            return
+
+    first = reader.peek()
+
+    if first == '{':
+        yield _project(reader.decode_value(), fields)
+        return
+
+    if first != '[':
+        return
+
+    reader.pos += 1
+
+    while True:
+        reader.skip(_whitespace + ',')
+        if reader.peek() in (']', None):
+            return
+
+        yield _project(reader.decode_value(), fields)
+
+def _find_member(reader, key):
+    """
+    Moves to the value of key in the object the reader is at, skipping the
+    values of the keys before it, returns False if the object has no such key.
+    Only this object's own keys are matched, never keys of nested objects or
+    text inside strings
+    """
+    if reader.peek() != '{':
+        return False
+
+    reader.pos += 1
+
+    while True:
+        reader.skip(_whitespace + ',')
+        if reader.peek() != '"':
+            return False
+
+        name = reader.decode_value()
+        reader.skip(_whitespace + ':')
+        if name == key:
+            return True
+
+        reader.skip_value()
+
+def _project(element, fields):
+    if fields is None:
+        return element
+
+    return {field: element[field] for field in fields if field in element}
@@ -1,41 +1,99 @@
-import json
 import os
-from pymfl.mfl import MFL
+import time
 from groupme.groupme import GroupMe
+from groupme.sender import MessageSender
+from bdfl import runtime
+from bdfl import logs
+from bdfl import tracing
+from bdfl.metrics import per_invocation
 
 
+# time kept back from the Lambda timeout to report the batch after the last retry
+DEADLINE_MARGIN_SECS = 5
+
+
+@per_invocation
 def handler(event, context):
 
     messages = []
+    traces = []
     for message_obj in event['Records']:
         messages.append(message_obj['body'])
+        traces.append(tracing.trace_from_record(message_obj))
+
+    groupme = GroupMe(os.getenv('GROUPME_API_KEY'), session=runtime.groupme_session())
 
-    groupme = GroupMe(os.getenv('GROUPME_API_KEY'))
+    posts = groupme.format_bdfl_messages_with_sources(messages)
+    messages_to_send = [post for post, _ in posts]
 
-    messages_to_send = groupme.format_bdfl_messages_for_character_limit(messages)
+    with tracing.span('send_bdfl_messages', messages=len(messages), posts=len(messages_to_send)):
+        statuses = send_messages(groupme, messages_to_send, deadline(context))
 
-    sent_messages = send_messages(messages_to_send)
+    sent_messages = [status['message'] for status in statuses if status['delivered']]
+    failed_messages = [status for status in statuses if not status['delivered']]
+
+    for trace, posted_at in zip(traces, notification_posted_at(len(messages), posts, statuses)):
+        if trace is not None and posted_at is not None:
+            logs.emit(tracing.latency_record(trace, posted_at))
 
     print('number of sent messages: ', len(sent_messages))
     print('sent messages: ', sent_messages)
+    if failed_messages:
+        print('failed messages: ', failed_messages)
 
+    # SQS redelivers only the records whose posts did not all go out
+    undelivered = undelivered_notifications(posts, statuses)
     response = {
         "statusCode": 200,
-        "body": sent_messages
+        "body": sent_messages,
+        "batchItemFailures": [
+            {"itemIdentifier": message_obj['messageId']}
+            for i, message_obj in enumerate(event['Records']) if i in undelivered
+        ]
     }
 
     return response
 
-def send_messages(messages):
+def notification_posted_at(count, posts, statuses):
+    """
+    When each of count notifications was fully posted, the delivery of the last
+    post carrying it, or None if one of its posts was not delivered
+    """
+    posted_at = [None] * count
+    undelivered = undelivered_notifications(posts, statuses)
 
-    sent_messages = []
-    groupme = GroupMe(os.getenv('GROUPME_API_KEY'))
-    bot_id = os.getenv('GROUPME_BOT_ID')
+    for (_, notification_ids), status in zip(posts, statuses):
+        for notification_id in notification_ids:
+            if status['delivered'] and (posted_at[notification_id] is None or status['delivered_at'] > posted_at[notification_id]):
+                posted_at[notification_id] = status['delivered_at']
 
-    for message in messages:
+    return [None if i in undelivered else value for i, value in enumerate(posted_at)]
 
-        print(groupme.send_message(bot_id, message))
+def undelivered_notifications(posts, statuses):
+    """Indexes of the notifications with at least one post that was not delivered"""
+    return {
+        notification_id
+        for (_, notification_ids), status in zip(posts, statuses) if not status['delivered']
+        for notification_id in notification_ids
+    }
+
+def deadline(context):
+    """The time.monotonic() by which retries have to stop, None without a Lambda context"""
+    if context is None:
+        return None
+
+    return time.monotonic() + context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN_SECS
+
+def send_messages(groupme, messages, deadline=None):
+    """Sends messages in order through the BDFL bot, returns the delivery status of each one"""
+
+    sender = MessageSender(
+        groupme,
+        rate_per_sec=float(os.getenv('GROUPME_RATE_PER_SEC', 1)),
+        burst=int(os.getenv('GROUPME_BURST', 3)),
+        max_retry_delay_secs=float(os.getenv('GROUPME_MAX_RETRY_DELAY_SECS', 10)),
+        deadline=deadline
+    )
+    bot_id = os.getenv('GROUPME_BOT_ID')
 
-        sent_messages.append(message)
-    
-    return sent_messages
+    return sender.send(bot_id, messages)
@@ -0,0 +1,57 @@
+import threading
+import boto3
+import pytest
+from moto import mock_dynamodb2, mock_sqs
+from moto.dynamodb2.models import DynamoDBBackend
+from bdfl.cache import lookup_cache
+from bdfl.rosters import roster_index
+from bdfl.snapshots import lookup_snapshots
+from bdfl.storage import TABLE_KEYS
+from helpers import create_table, put_players_and_franchises
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+@pytest.fixture
+def atomic_dynamodb_writes(monkeypatch):
+    """
+    DynamoDB applies each conditional write atomically but moto's in-memory
+    backend does not, so concurrent writes are serialized the way DynamoDB would
+    """
+    lock = threading.Lock()
+    update_item = DynamoDBBackend.update_item
+
+    def atomic_update_item(self, *args, **kwargs):
+        with lock:
+            return update_item(self, *args, **kwargs)
+
+    monkeypatch.setattr(DynamoDBBackend, 'update_item', atomic_update_item)
+
+@pytest.fixture
+def dynamodb_tables(request):
+    """
+    Mocked DynamoDB with every table in TABLE_KEYS, or only the tables a test
+    names by parametrizing this fixture:
+
+        @pytest.mark.parametrize('dynamodb_tables', [['checkpoints']], indirect=True)
+    """
+    with mock_dynamodb2():
+        dynamodb_client = boto3.client('dynamodb')
+        for table_name in getattr(request, 'param', TABLE_KEYS):
+            create_table(dynamodb_client, table_name)
+
+        yield dynamodb_client
+
+@pytest.fixture
+def setup_aws(dynamodb_tables):
+    """Every table with the helpers' players and franchises, and the message queue, with empty container caches"""
+    lookup_cache.clear()
+    roster_index.clear()
+    lookup_snapshots.clear()
+    with mock_sqs():
+        boto3.client('sqs').create_queue(QueueName='BDFLMessageQueue')
+
+        dynamodb_resource = boto3.resource('dynamodb')
+        put_players_and_franchises(dynamodb_resource)
+
+        yield dynamodb_resource
@@ -0,0 +1,88 @@
+"""Data and helpers shared by the tests and benchmarks"""
+from bdfl.storage import TABLE_KEYS
+
+PLAYERS = {
+    '14136': ('Justin Jefferson', 'WR', 'MIN'),
+    '13631': ('Nick Chubb', 'RB', 'CLE'),
+    '14209': ('Josh Oliver', 'TE', 'JAC'),
+    '11247': ('Zach Ertz', 'TE', 'PHI')
+}
+
+FRANCHISES = {
+    '0003': 'Jeff Janis Fan Club',
+    '0007': 'Cam Newton Fan Club',
+    '0008': 'Ballin Bellichicks'
+}
+
+# one response per MFL export, served by stub_mfl_server.StubMFLServer
+MFL_RESPONSES = {
+    'league': {'league': {'franchises': {'franchise': [
+        {'id': '0003', 'name': 'Jeff Janis Fan Club', 'bbidAvailableBalance': '12.00', 'division': '01'}
+    ]}}},
+    'transactions': {'transactions': {'transaction': [
+        {'timestamp': '1608890400', 'franchise': '0003', 'transaction': '14209,|1.00|', 'type': 'BBID_WAIVER'}
+    ]}},
+    'players': {'players': {'player': [
+        {'id': '14209', 'name': 'Oliver, Josh', 'position': 'TE', 'team': 'JAC'}
+    ]}},
+    'liveScoring': {'liveScoring': {'matchup': [
+        {'franchise': [{'id': '0003', 'score': '100'}, {'id': '0004', 'score': '95'}]}
+    ]}}
+}
+
+
+def raw_transactions(timestamp):
+    """One MFL transaction row of each type getTransactions handles, plus rows of types it skips"""
+    return [
+        {'type': 'TRADE', 'timestamp': timestamp, 'franchise': '0008', 'franchise2': '0007',
+         'franchise1_gave_up': '14136,', 'franchise2_gave_up': '13631,', 'comments': 'test'},
+        {'type': 'BBID_WAIVER', 'timestamp': timestamp, 'franchise': '0003', 'transaction': '14209,|1.00|11247,'},
+        {'type': 'FREE_AGENT', 'timestamp': timestamp, 'franchise': '0007', 'transaction': '11247,|14209,'},
+        {'type': 'IR', 'timestamp': timestamp, 'franchise': '0008', 'transaction': '|13631,'},
+        {'type': 'TAXI', 'timestamp': timestamp, 'franchise': '0003', 'transaction': '14136,|'},
+        {'type': 'AUCTION_BID', 'timestamp': timestamp, 'franchise': '0003', 'transaction': '14136,|5|'},
+        # commissioner moves name no franchise and are not parsed
+        {'type': 'LOCK_ROSTERS', 'timestamp': timestamp}
+    ]
+
+class StubMFL:
+    """
+    Stands in for pymfl's MFL class, monkeypatched over a handler's MFL:
+    calling it returns the stub itself, with the session each call passed
+    kept in sessions. iter_transactions returns an iterator over rows, read
+    when it is called, and records the type asked for in transaction_types.
+    Other exports are given as functions by name, StubMFL(rosters=lambda: ROSTERS)
+    """
+
+    def __init__(self, rows=(), **exports):
+        self.rows = rows
+        self.sessions = []
+        self.transaction_types = []
+
+        for name, export in exports.items():
+            setattr(self, name, export)
+
+    def __call__(self, *args, session=None, **kwargs):
+        self.sessions.append(session)
+        return self
+
+    def iter_transactions(self, number_of_days="", transaction_type="*", fields=None):
+        self.transaction_types.append(transaction_type)
+        return iter(self.rows)
+
+
+def create_table(dynamodb_client, table_name):
+    """Creates table_name keyed the way bdfl.storage.TABLE_KEYS says"""
+    key_name = TABLE_KEYS[table_name]
+
+    dynamodb_client.create_table(
+        TableName=table_name,
+        AttributeDefinitions=[{'AttributeName': key_name, 'AttributeType': 'S'}],
+        KeySchema=[{'AttributeName': key_name, 'KeyType': 'HASH'}]
+    )
+
+def put_players_and_franchises(dynamodb_resource, players=None, franchises=None):
+    for pid, (name, position, team) in (players if players is not None else PLAYERS).items():
+        dynamodb_resource.Table('players').put_item(Item={'id': pid, 'name': name, 'position': position, 'team': team})
+    for fid, name in (franchises if franchises is not None else FRANCHISES).items():
+        dynamodb_resource.Table('franchises').put_item(Item={'id': fid, 'name': name})
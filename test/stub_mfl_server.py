@@ -0,0 +1,116 @@
+import hashlib
+import json
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubMFLServer:
+    """
+    Local HTTP server that answers MFL export requests from canned JSON
+    responses keyed by TYPE, waiting delay seconds before each response.
+    Responses carry an ETag and matching If-None-Match requests get a 304.
+    Given users, a {username: password} dict, it also answers POSTs to login
+    with an MFL_USER_ID cookie and rejects exports made without a live one
+    """
+
+    def __init__(self, responses, delay=0, users=None):
+        self.responses = responses
+        self.delay = delay
+        self.users = users
+        self.requests = []
+        self.logins = set()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def expire_logins(self):
+        """Stops accepting every cookie issued so far"""
+        self.logins.clear()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                stub.requests.append((self.command, self.path, dict(self.headers)))
+                time.sleep(stub.delay)
+
+                endpoint = query.get('TYPE')
+                if stub.users is not None and self._cookie() not in stub.logins:
+                    self._send_json({'error': {'$t': 'API requires logged in user'}})
+                    return
+
+                if endpoint not in stub.responses:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                body = json.dumps(stub.responses[endpoint]).encode()
+                etag = '"' + hashlib.sha256(body).hexdigest() + '"'
+
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+                form = {k: v[0] for k, v in parse_qs(body).items()}
+                stub.requests.append((self.command, self.path, dict(self.headers)))
+
+                if not urlparse(self.path).path.endswith('/login'):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                if (stub.users or {}).get(form.get('USERNAME')) != form.get('PASSWORD'):
+                    self._send_json({'error': {'$t': 'Invalid Password'}})
+                    return
+
+                cookie = f'cookie-{len(stub.requests)}'
+                stub.logins.add(cookie)
+                self._send_json({'status': {'MFL_USER_ID': cookie, '$t': 'OK'}}, {'Set-Cookie': f'MFL_USER_ID={cookie}; path=/'})
+
+            def _cookie(self):
+                cookies = SimpleCookie(self.headers.get('Cookie', ''))
+                return cookies['MFL_USER_ID'].value if 'MFL_USER_ID' in cookies else None
+
+            def _send_json(self, response, headers=None):
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
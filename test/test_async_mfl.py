@@ -0,0 +1,51 @@
+import asyncio
+import time
+import pytest
+from pymfl.mfl import MFL
+from pymfl.async_mfl import AsyncMFL
+from stub_mfl_server import StubMFLServer
+from helpers import MFL_RESPONSES
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    with StubMFLServer(MFL_RESPONSES, delay=0.2) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        yield server
+
+def test_async_methods_match_sync_client(stub_server):
+
+    async def fetch():
+        async with AsyncMFL('user', 'pass', 12345, 2020) as mfl:
+            return await mfl.gather(mfl.franchises(), mfl.waivers(), mfl.players(), mfl.live_scores())
+
+    franchises, waivers, players, live_scores = asyncio.run(fetch())
+
+    assert franchises.get_franchises()['0003'].name == 'Jeff Janis Fan Club'
+    assert waivers == MFL_RESPONSES['transactions']['transactions']['transaction']
+    assert players == MFL_RESPONSES['players']['players']['player']
+    assert live_scores == MFL_RESPONSES['liveScoring']['liveScoring']['matchup']
+
+def test_requests_run_concurrently(stub_server):
+
+    async def fetch():
+        async with AsyncMFL('user', 'pass', 12345, 2020, max_concurrency=4) as mfl:
+            return await mfl.gather(mfl.franchises(), mfl.trades(), mfl.players(), mfl.live_scores())
+
+    start = time.perf_counter()
+    asyncio.run(fetch())
+    elapsed = time.perf_counter() - start
+
+    # four 0.2s requests take 0.8s back to back
+    assert elapsed < 0.6
+
+def test_max_concurrency_bounds_requests_in_flight(stub_server):
+
+    async def fetch():
+        async with AsyncMFL('user', 'pass', 12345, 2020, max_concurrency=1) as mfl:
+            return await mfl.gather(mfl.players(), mfl.players(), mfl.players())
+
+    start = time.perf_counter()
+    asyncio.run(fetch())
+
+    assert time.perf_counter() - start >= 0.6
@@ -0,0 +1,92 @@
+import time
+from bdfl.cache import LookupCache
+
+
+def test_get_returns_stored_value_and_counts_hits():
+    cache = LookupCache(ttl_seconds=60, max_entries=10)
+    cache.put(('players', '14209'), {'name': 'Josh Oliver'})
+
+    assert cache.get(('players', '14209')) == {'name': 'Josh Oliver'}
+    assert cache.get(('players', '11247')) is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = time.monotonic()
+    cache = LookupCache(ttl_seconds=60, max_entries=10)
+    cache.put(('franchises', '0003'), {'name': 'Jeff Janis Fan Club'})
+
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 61)
+
+    assert cache.get(('franchises', '0003')) is None
+    assert cache.misses == 1
+    assert len(cache) == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LookupCache(ttl_seconds=60, max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+def test_membership_does_not_count_or_refresh(monkeypatch):
+    now = time.monotonic()
+    cache = LookupCache(ttl_seconds=60, max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+
+    assert 'a' in cache
+    assert 'c' not in cache
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'size': 2}
+
+    cache.put('c', 3)
+    assert 'a' not in cache
+
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 61)
+    assert 'b' not in cache
+
+def test_put_can_expire_sooner_than_the_cache_ttl(monkeypatch):
+    now = time.monotonic()
+    cache = LookupCache(ttl_seconds=60, max_entries=10)
+    cache.put(('players', '99999'), {}, ttl_seconds=5)
+    cache.put(('players', '14209'), {'name': 'Josh Oliver'})
+
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 6)
+
+    assert cache.get(('players', '99999')) is None
+    assert cache.get(('players', '14209')) == {'name': 'Josh Oliver'}
+
+def test_missing_rows_are_re_read_after_the_missing_ttl(monkeypatch):
+    from bdfl.lookups import EntityLookup
+    from bdfl.snapshots import LookupSnapshots
+
+    class Storage:
+        def __init__(self):
+            self.reads = []
+            self.rows = {}
+
+        def batch_get(self, table_name, ids, fields=None):
+            self.reads.append(list(ids))
+            return {primary_id: self.rows[primary_id] for primary_id in ids if primary_id in self.rows}
+
+    class NoSnapshots(LookupSnapshots):
+        def get(self, table_name):
+            return None
+
+    now = time.monotonic()
+    storage = Storage()
+    lookup = EntityLookup(storage, LookupCache(ttl_seconds=60 * 60, max_entries=10), NoSnapshots(storage))
+
+    lookup.prefetch('players', ['99999'])
+    lookup.prefetch('players', ['99999'])
+    assert storage.reads == [['99999']]
+    assert lookup._cache.stats()['hits'] == 0
+
+    storage.rows['99999'] = {'name': 'New Player'}
+    monkeypatch.setattr(time, 'monotonic', lambda: now + EntityLookup.MISSING_TTL_SECONDS + 1)
+
+    assert lookup.get_field('players', 'name', '99999') == 'New Player'
+    assert storage.reads == [['99999'], ['99999']]
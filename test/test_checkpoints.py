@@ -0,0 +1,19 @@
+import pytest
+from bdfl.checkpoints import get_checkpoint, advance_checkpoint
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+pytestmark = pytest.mark.parametrize('dynamodb_tables', [['checkpoints']], indirect=True)
+
+
+def test_missing_checkpoint_is_none(dynamodb_tables):
+    assert get_checkpoint('waivers') is None
+
+def test_checkpoint_only_moves_forward(dynamodb_tables):
+    assert advance_checkpoint('waivers', 1608890400)
+    assert not advance_checkpoint('waivers', 1608800000)
+    assert not advance_checkpoint('waivers', 1608890400)
+    assert advance_checkpoint('waivers', 1608890500)
+
+    assert get_checkpoint('waivers') == 1608890500
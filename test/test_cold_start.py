@@ -0,0 +1,24 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import bench_cold_start
+
+
+@pytest.mark.parametrize('module', bench_cold_start.HANDLER_MODULES)
+def test_handler_import_does_not_load_sdk_modules(module):
+    times = bench_cold_start.import_times(module)
+
+    assert module in times
+    assert [name for name in bench_cold_start.SDK_MODULES if name in times] == []
+
+def test_first_handler_call_builds_each_client_once():
+    result = bench_cold_start.first_call_time()
+
+    assert result['import_ms'] > 0
+    assert result['first_call_ms'] > 0
+    # one DynamoDB resource and one SQS client shared by every helper the handler calls
+    assert result['clients_created'] == 2
@@ -0,0 +1,128 @@
+import pytest
+import get_injuries
+from get_injuries import *
+from pymfl.mfl import MFL
+from pymfl.models.league_rosters import LeagueRosters
+from pymfl.models.player import Player
+from pymfl.models.players import Players
+from bdfl.cache import lookup_cache
+from bdfl.rosters import roster_index
+from bdfl.storage import MemoryStorage
+from bdfl.sqs import publisher
+from bdfl import runtime
+from helpers import StubMFL
+from stub_mfl_server import StubMFLServer
+
+ROSTERS = [
+    {'id': '0003', 'player': [{'id': '14209', 'status': 'ROSTER'}, {'id': '11247', 'status': 'ROSTER'}]},
+    {'id': '0007', 'player': {'id': '13631', 'status': 'ROSTER'}}
+]
+
+
+def report(*injuries):
+    return [{'id': player_id, 'status': status, 'details': details} for player_id, status, details in injuries]
+
+@pytest.mark.parametrize('injury', [report(('14209', 'Out', 'Ankle'))[0], report(('14209', 'Out', 'Ankle'))])
+def test_injuries_parses_export(monkeypatch, injury):
+    with StubMFLServer({'injuries': {'injuries': {'week': '3', 'injury': injury}}}) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        injuries = MFL(None, None, 12345, 2020).injuries().get_players()
+
+    assert (injuries['14209'].injury_status, injuries['14209'].injury_details) == ('Out', 'Ankle')
+
+def test_diff_injuries_keeps_status_changes_only():
+    previous = {'1': ('Questionable', 'Ankle'), '2': ('Out', 'Knee'), '3': ('Doubtful', 'Hip')}
+    current = {'1': ('Questionable', 'Ankle - limited'), '2': ('IR', 'Knee'), '4': ('Out', 'Illness')}
+
+    assert diff_injuries(previous, current) == [
+        ('2', 'Out', 'IR'),
+        ('3', 'Doubtful', None),
+        ('4', None, 'Out')
+    ]
+    assert diff_injuries(current, current) == []
+
+@pytest.fixture
+def league(monkeypatch):
+    storage = MemoryStorage()
+    monkeypatch.setattr(runtime, '_clients', {'storage': storage})
+    lookup_cache.clear()
+    roster_index.clear()
+
+    with storage.batch_writer('players') as batch:
+        for player_id, name, team in [('14209', 'Josh Oliver', 'JAC'), ('11247', 'Zach Ertz', 'PHI'), ('13631', 'Nick Chubb', 'CLE')]:
+            batch.put({'id': player_id, 'name': name, 'position': 'TE', 'team': team})
+    with storage.batch_writer('franchises') as batch:
+        batch.put({'id': '0003', 'name': 'Jeff Janis Fan Club'})
+        batch.put({'id': '0007', 'name': 'Cam Newton Fan Club'})
+    roster_index.replace(LeagueRosters.from_json(ROSTERS))
+
+    injuries = []
+
+    def injury_report(week=""):
+        players = Players()
+        for injury in injuries:
+            players.add_player(Player.from_json(injury))
+        return players
+
+    monkeypatch.setattr(get_injuries, 'MFL', StubMFL(injuries=injury_report))
+
+    monkeypatch.setattr(publisher, 'publish', lambda messages: [
+        {'message': message, 'message_id': '1', 'error': None} for message in messages
+    ])
+
+    yield storage, injuries
+
+    roster_index.clear()
+    lookup_cache.clear()
+
+def test_handler_notifies_rostered_status_changes(league):
+    storage, injuries = league
+
+    injuries[:] = report(('14209', 'Questionable', 'Ankle'), ('11247', 'Out', 'Knee'))
+    assert handler({}, None)['body']['injuries'] == []
+
+    injuries[:] = report(('14209', 'Out', 'Ankle'), ('13631', 'Doubtful', 'Hip'), ('99999', 'Out', 'Illness'))
+    body = handler({}, None)['body']
+
+    assert body['changes'] == 4
+    assert body['injuries'] == [
+        '✅ Zach Ertz, PHI TE (Jeff Janis Fan Club) is off the injury report',
+        '🚑 Nick Chubb, CLE TE (Cam Newton Fan Club) is Doubtful: Hip',
+        '🚑 Josh Oliver, JAC TE (Jeff Janis Fan Club) went from Questionable to Out: Ankle'
+    ]
+    assert storage.get('injuries', '11247') is None
+    assert storage.get('injuries', '99999') == {'id': '99999', 'status': 'Out', 'details': 'Illness'}
+
+    # an unchanged report publishes nothing
+    assert handler({}, None)['body'] == {'changes': 0, 'injuries': [], 'published': []}
+
+def test_unpublished_changes_are_found_again(league, monkeypatch):
+    storage, injuries = league
+
+    injuries[:] = report(('14209', 'Questionable', 'Ankle'))
+    handler({}, None)
+
+    injuries[:] = report(('14209', 'Out', 'Ankle'))
+    monkeypatch.setattr(publisher, 'publish', lambda messages: [
+        {'message': message, 'message_id': None, 'error': 'throttled'} for message in messages
+    ])
+    handler({}, None)
+
+    assert storage.get('injuries', '14209')['status'] == 'Questionable'
+
+def test_published_changes_are_stored_when_others_fail(league, monkeypatch):
+    storage, injuries = league
+
+    injuries[:] = report(('14209', 'Questionable', 'Ankle'), ('11247', 'Questionable', 'Knee'))
+    handler({}, None)
+
+    injuries[:] = report(('14209', 'Out', 'Ankle'), ('11247', 'Out', 'Knee'))
+    monkeypatch.setattr(publisher, 'publish', lambda messages: [
+        {'message': message, 'message_id': None, 'error': 'throttled'} if 'Zach Ertz' in message else
+        {'message': message, 'message_id': '1', 'error': None}
+        for message in messages
+    ])
+    handler({}, None)
+
+    assert storage.get('injuries', '14209')['status'] == 'Out'
+    assert storage.get('injuries', '11247')['status'] == 'Questionable'
@@ -0,0 +1,190 @@
+import pytest
+import time
+import types
+import boto3
+from collections import Counter
+import get_players
+from get_players import *
+from pymfl.models.player import Player
+from bdfl.checkpoints import get_checkpoint
+from bdfl import runtime
+from bdfl.storage import DynamoDBStorage
+from bdfl.snapshots import lookup_snapshots
+from helpers import StubMFL
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+MFL_PLAYERS_JSON = [
+    {'id': '14209', 'name': 'Oliver, Josh', 'position': 'TE', 'team': 'JAC'},
+    {'id': '11247', 'name': 'Ertz, Zach', 'position': 'TE', 'team': 'PHI'},
+    {'id': '13604', 'name': 'Mahomes, Patrick', 'position': 'QB', 'team': 'KCC'},
+    {'id': '0501', 'name': 'Bills, Buffalo', 'position': 'Def'}
+]
+
+MFL_PLAYERS = [Player.from_json(player) for player in MFL_PLAYERS_JSON]
+
+
+@pytest.fixture
+def setup_dynamodb(dynamodb_tables):
+    lookup_snapshots.clear()
+    yield dynamodb_tables
+    lookup_snapshots.clear()
+
+@pytest.fixture
+def dynamodb_calls(setup_dynamodb):
+    calls = Counter()
+
+    def count_call(model, **kwargs):
+        calls[model.name] += 1
+
+    boto3.setup_default_session()
+    boto3.DEFAULT_SESSION.events.register('before-call.dynamodb', count_call)
+    runtime.reset()
+
+    yield calls
+
+    boto3.DEFAULT_SESSION = None
+    runtime.reset()
+
+@pytest.fixture
+def mfl_requests(monkeypatch):
+    """Replaces MFL in get_players with a stub that records the since argument of each players call"""
+    requests = []
+
+    def players(since=''):
+        requests.append(since)
+        return [dict(MFL_PLAYERS_JSON[2], team='BAL')]
+
+    def iter_players(fields=None):
+        requests.append('')
+        yield from MFL_PLAYERS_JSON
+
+    monkeypatch.setattr(get_players, 'MFL', StubMFL(players=players, iter_players=iter_players))
+
+    yield requests
+
+def get_stored_player(player_id):
+    return boto3.resource('dynamodb').Table('players').get_item(Key={'id': player_id})['Item']
+
+def test_format_name():
+    assert format_name('Mahomes, Patrick') == 'Patrick Mahomes'
+
+def test_first_sync_inserts_every_player(setup_dynamodb):
+    counts = store_players(MFL_PLAYERS)
+
+    assert counts == {'inserted': 4, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+
+    stored_player = get_stored_player('0501')
+    assert stored_player['name'] == 'Buffalo Bills'
+    assert stored_player['team'] == 'N/A'
+
+def test_no_change_sync_does_not_write(dynamodb_calls):
+    store_players(MFL_PLAYERS)
+    dynamodb_calls.clear()
+
+    counts = store_players(MFL_PLAYERS)
+
+    assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 4, 'deleted': 0}
+    assert dynamodb_calls['BatchWriteItem'] == 0
+    assert dynamodb_calls['UpdateItem'] == 0
+
+def test_sync_writes_changes_and_deletes_missing_players(setup_dynamodb):
+    store_players(MFL_PLAYERS)
+
+    traded_player = Player('11247', 'Ertz, Zach', 'TE', 'BAL')
+    new_player = Player('15000', 'Lawrence, Trevor', 'QB', 'JAC')
+    players = [MFL_PLAYERS[0], traded_player, new_player, MFL_PLAYERS[3]]
+
+    counts = store_players(players)
+
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 2, 'deleted': 1}
+    assert get_stored_player('11247')['team'] == 'BAL'
+    assert 'Item' not in boto3.resource('dynamodb').Table('players').get_item(Key={'id': '13604'})
+
+def test_rows_without_content_hash_are_rewritten(setup_dynamodb):
+    boto3.resource('dynamodb').Table('players').put_item(
+        Item={'id': '14209', 'name': 'Josh Oliver', 'position': 'TE', 'team': 'JAC'}
+    )
+
+    counts = store_players(MFL_PLAYERS[:1])
+
+    assert counts['updated'] == 1
+    assert get_stored_player('14209')['content_hash'] == hash_player_item(get_stored_player('14209'))
+
+def test_handler_full_syncs_without_checkpoint(setup_dynamodb, mfl_requests):
+    response = handler({}, None)
+
+    assert mfl_requests == ['']
+    assert response['body']['full_sync']
+    assert get_checkpoint(SYNC_CHECKPOINT) == get_checkpoint(FULL_SYNC_CHECKPOINT)
+
+    lookup_snapshots.clear()
+    snapshot = lookup_snapshots.get('players')
+    assert len(snapshot) == len(MFL_PLAYERS)
+    assert snapshot.get('14209') == {'name': 'Josh Oliver', 'position': 'TE', 'team': 'JAC'}
+
+def test_handler_delta_syncs_from_checkpoint(setup_dynamodb, mfl_requests):
+    handler({}, None)
+    last_synced_at = get_checkpoint(SYNC_CHECKPOINT)
+
+    response = handler({}, None)
+
+    assert mfl_requests[1] == str(last_synced_at - SINCE_OVERLAP_SECS)
+    assert not response['body']['full_sync']
+    # players missing from a delta are not deleted
+    assert response['body']['sync'] == {'inserted': 0, 'updated': 1, 'unchanged': 0, 'deleted': 0}
+    assert get_stored_player('14209')['team'] == 'JAC'
+    assert get_stored_player('13604')['team'] == 'BAL'
+
+def test_delta_sync_patches_the_snapshot_without_a_scan(dynamodb_calls, mfl_requests, monkeypatch):
+    handler({}, None)
+    last_synced_at = get_checkpoint(SYNC_CHECKPOINT)
+    monkeypatch.setattr(get_players, 'time', types.SimpleNamespace(time=lambda: last_synced_at + 60))
+    dynamodb_calls.clear()
+
+    handler({}, None)
+
+    assert dynamodb_calls['Scan'] == 0
+    lookup_snapshots.clear()
+    snapshot = lookup_snapshots.get('players')
+    assert snapshot.built_at == last_synced_at + 60
+    assert len(snapshot) == len(MFL_PLAYERS)
+    assert snapshot.get('13604') == {'name': 'Patrick Mahomes', 'position': 'QB', 'team': 'BAL'}
+    assert snapshot.get('14209') == {'name': 'Josh Oliver', 'position': 'TE', 'team': 'JAC'}
+
+def test_delta_sync_without_a_current_snapshot_scans(dynamodb_calls, mfl_requests):
+    store_players(MFL_PLAYERS)
+    dynamodb_calls.clear()
+
+    assert publish_players_snapshot(int(time.time()), [Player.from_json(MFL_PLAYERS_JSON[0])], int(time.time()))
+    assert dynamodb_calls['Scan'] == 1
+    assert len(lookup_snapshots.get('players')) == len(MFL_PLAYERS)
+
+def test_handler_full_syncs_on_schedule(setup_dynamodb, mfl_requests):
+    handler({}, None)
+
+    assert is_full_sync_due({}, get_checkpoint(SYNC_CHECKPOINT), time.time() + FULL_SYNC_INTERVAL_SECS)
+    assert is_full_sync_due({'full_sync': True}, get_checkpoint(SYNC_CHECKPOINT), time.time())
+    assert not is_full_sync_due({}, get_checkpoint(SYNC_CHECKPOINT), time.time())
+
+def test_throttled_batch_reads_back_off_and_give_up(monkeypatch):
+    class ThrottledDynamoDB:
+        """Stands in for the DynamoDB resource and, as meta.client, for its client"""
+
+        def __init__(self):
+            self.calls = 0
+            self.meta = types.SimpleNamespace(client=self)
+
+        def batch_get_item(self, RequestItems):
+            self.calls += 1
+            return {'Responses': {}, 'UnprocessedKeys': RequestItems}
+
+    sleeps = []
+    monkeypatch.setattr(time, 'sleep', sleeps.append)
+    dynamodb = ThrottledDynamoDB()
+
+    with pytest.raises(Exception):
+        get_synced_player_hashes_by_id(DynamoDBStorage(dynamodb), ['14209'])
+
+    assert dynamodb.calls == DynamoDBStorage.MAX_RETRIES + 1
+    assert sleeps == [0.05 * 2 ** retry for retry in range(DynamoDBStorage.MAX_RETRIES)]
@@ -0,0 +1,136 @@
+import pytest
+import boto3
+from collections import Counter
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import get_trades
+from get_trades import *
+from bdfl import pipeline
+from bdfl.cache import LookupCache
+from bdfl.lookups import EntityLookup
+from bdfl.storage import DynamoDBStorage
+from pymfl.models.transaction import Transaction
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+PLAYERS = {
+    '14136': ('Justin Jefferson', 'WR', 'MIN'),
+    '13631': ('Nick Chubb', 'RB', 'CLE'),
+    '13604': ('Patrick Mahomes', 'QB', 'KCC'),
+    '14103': ('Christian McCaffrey', 'RB', 'CAR'),
+    '13590': ('Kenny Golladay', 'WR', 'NYG'),
+    '14209': ('Josh Oliver', 'TE', 'JAC')
+}
+
+FRANCHISES = {
+    '0003': 'Jeff Janis Fan Club',
+    '0004': 'Bortles Bay',
+    '0007': 'Cam Newton Fan Club',
+    '0008': 'Ballin Bellichicks'
+}
+
+TRADES = [Transaction.from_json(trade) for trade in [
+    {
+        'timestamp': '1608890400',
+        'comments': 'test',
+        'franchise': '0008',
+        'franchise2': '0007',
+        'franchise1_gave_up': '14136,13631,13604,',
+        'franchise2_gave_up': '14103,13590,14209,FP_0004_2022_3,',
+        'type': 'TRADE'
+    },
+    {
+        'timestamp': '1608890500',
+        'comments': 'test',
+        'franchise': '0007',
+        'franchise2': '0003',
+        'franchise1_gave_up': '14136,',
+        'franchise2_gave_up': '13631,BB_5,',
+        'type': 'TRADE'
+    }
+]]
+
+
+@pytest.fixture
+def setup_dynamodb(dynamodb_tables):
+    dynamodb_resource = boto3.resource('dynamodb')
+
+    players_table = dynamodb_resource.Table('players')
+    for pid, (name, position, team) in PLAYERS.items():
+        players_table.put_item(Item={'id': pid, 'name': name, 'position': position, 'team': team})
+
+    franchise_table = dynamodb_resource.Table('franchises')
+    for fid, name in FRANCHISES.items():
+        franchise_table.put_item(Item={'id': fid, 'name': name, 'division_id': '01'})
+
+    yield dynamodb_tables, dynamodb_resource
+
+@pytest.fixture
+def dynamodb_calls(setup_dynamodb, monkeypatch):
+    """Counts DynamoDB operations made by get_trades' entity lookup"""
+    _, dynamodb_resource = setup_dynamodb
+    calls = Counter()
+
+    def count_call(model, **kwargs):
+        calls[model.name] += 1
+
+    dynamodb_resource.meta.client.meta.events.register('before-call.dynamodb', count_call)
+    monkeypatch.setattr(get_trades, 'entity_lookup', EntityLookup(DynamoDBStorage(dynamodb_resource), LookupCache(60, 100)))
+
+    yield calls
+
+def test_get_assets_formats_players_and_picks(dynamodb_calls):
+    assets = get_assets('14136,FP_0004_2022_3,BB_10,DP_0_1,')
+
+    assert assets == [
+        'Justin Jefferson, MIN WR',
+        'Bortles Bay 2022 Round 3 Draft Pick',
+        '$10',
+        f'{datetime.date.today().year} Round 1 Pick 1'
+    ]
+
+def test_get_assets_unknown_player_raises(dynamodb_calls):
+    with pytest.raises(Exception, match='Threw error for: 99999'):
+        get_assets('99999,')
+
+def test_trade_enrichment_reads_scale_with_distinct_ids(dynamodb_calls):
+    messages = store_trades_if_not_exist(TRADES)
+
+    assert len(messages) == 2
+    assert '- Justin Jefferson, MIN WR\n' in messages[0]
+    assert 'Bortles Bay 2022 Round 3 Draft Pick' in messages[0]
+
+    # one batch read per table and no per-field reads for players or franchises, only
+    # the check for each table's lookup snapshot, which none was published for
+    assert dynamodb_calls['BatchGetItem'] == 2
+    assert dynamodb_calls['GetItem'] == 2
+
+def test_warm_invocation_reuses_cached_lookups(dynamodb_calls):
+    list(new_trade_messages(TRADES))
+    list(new_trade_messages(TRADES))
+
+    assert dynamodb_calls['BatchGetItem'] == 2
+    assert get_trades.entity_lookup._cache.hits > 0
+
+def test_stored_trade_is_not_posted_again(dynamodb_calls):
+    assert len(store_trades_if_not_exist(TRADES)) == 2
+    assert store_trades_if_not_exist(TRADES) == []
+
+def test_overlapping_invocations_post_each_trade_once(dynamodb_calls, atomic_dynamodb_writes, monkeypatch):
+    # warm the lookup cache so the invocations only overlap on the conditional writes
+    list(pipeline.prefetch(TRADES, trade_entity_ids, get_trades.entity_lookup))
+    invocations = 4
+    # every invocation has enriched a trade before any of them writes it, the window a read-then-write check loses
+    barrier = threading.Barrier(invocations, timeout=5)
+    store_trade = get_trades.store_trade
+
+    def store_together(trade_obj):
+        barrier.wait()
+        return store_trade(trade_obj)
+
+    monkeypatch.setattr(get_trades, 'store_trade', store_together)
+
+    with ThreadPoolExecutor(max_workers=invocations) as pool:
+        results = list(pool.map(lambda _: store_trades_if_not_exist(TRADES), range(invocations)))
+
+    assert sum(len(messages) for messages in results) == len(TRADES)
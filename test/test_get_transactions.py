@@ -0,0 +1,80 @@
+import pytest
+import time
+from collections import Counter
+import get_transactions
+from get_transactions import *
+from bdfl.checkpoints import get_checkpoint
+from bdfl.dispatch import TransactionDispatcher
+from bdfl import runtime
+from bdfl.roster_moves import split_player_ids
+from helpers import StubMFL, raw_transactions
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+@pytest.fixture
+def stub_mfl(monkeypatch):
+    mfl = StubMFL([])
+    monkeypatch.setattr(get_transactions, 'MFL', mfl)
+    monkeypatch.setenv('MFL_LEAGUEID', '12345')
+
+    yield mfl.transaction_types, mfl.rows
+
+def test_split_player_ids():
+    assert split_player_ids('11247,13631,|14209,') == (['11247', '13631'], ['14209'])
+    assert split_player_ids('|14209,') == ([], ['14209'])
+
+def test_dispatcher_routes_by_type_in_registration_order():
+    dispatcher = TransactionDispatcher(entity_lookup=None)
+    dispatcher.register('TRADE', lambda trades: [f'trades {len(trades)}'])
+    dispatcher.register(('BBID_WAIVER', 'WAIVER'), lambda waivers: [f'waivers {len(waivers)}'])
+
+    transactions = [
+        Transaction.from_json({'type': transaction_type, 'timestamp': '1608890400', 'franchise': '0003', 'transaction': '14209,|1.00|'})
+        for transaction_type in ['WAIVER', 'FREE_AGENT', 'BBID_WAIVER']
+    ]
+
+    assert dispatcher.dispatch(transactions) == ['waivers 2']
+    assert not dispatcher.handles('FREE_AGENT')
+
+def test_handler_fetches_every_type_once(setup_aws, stub_mfl):
+    calls, transactions = stub_mfl
+    transactions += raw_transactions(str(int(time.time())))
+
+    read_calls = Counter()
+
+    def count_call(model, **kwargs):
+        read_calls[model.name] += 1
+
+    events = runtime.dynamodb().meta.client.meta.events
+    events.register('before-call.dynamodb', count_call)
+    try:
+        messages = handler({}, None)['body']['transactions']
+    finally:
+        events.unregister('before-call.dynamodb', count_call)
+
+    assert calls == ['*']
+    # every type's franchises and players are read in one batch per table, the only GetItems
+    # are the checkpoint and the check for each table's lookup snapshot
+    assert read_calls['BatchGetItem'] == 2
+    assert read_calls['GetItem'] == 3
+    assert len(messages) == 5
+    assert messages[0].startswith('🚨TRADE COMPLETED🚨')
+    assert 'Jeff Janis Fan Club won Josh Oliver, JAC TE with a $1.00 bid and dropped Zach Ertz, PHI TE' in messages[1]
+    assert 'Cam Newton Fan Club added Zach Ertz, PHI TE and dropped Josh Oliver, JAC TE\n' in messages[2]
+    assert 'Ballin Bellichicks moved Nick Chubb, CLE RB to IR\n' in messages[3]
+    assert 'Jeff Janis Fan Club promoted Justin Jefferson, MIN WR from the taxi squad\n' in messages[4]
+
+def test_handler_posts_each_transaction_once(setup_aws, stub_mfl):
+    _, transactions = stub_mfl
+    timestamp = str(int(time.time()))
+    transactions += raw_transactions(timestamp)
+
+    assert len(handler({}, None)['body']['transactions']) == 5
+    assert get_checkpoint('transactions_12345') == int(timestamp)
+
+    # behind the checkpoint nothing is enriched again, and dedup holds even without it
+    assert handler({}, None)['body']['transactions'] == []
+    assert get_transactions.dispatcher.dispatch(
+        [Transaction.from_json(t) for t in filter_transactions_after(raw_transactions(timestamp), 0)]
+    ) == []
@@ -1,8 +1,15 @@
 import pytest
 import boto3
 import time
-from moto import mock_dynamodb2, mock_sqs
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from moto import mock_sqs
+import get_waivers
 from get_waivers import *
+from bdfl import pipeline
+from bdfl.cache import lookup_cache
+from pymfl.models.transaction import Transaction
+from helpers import StubMFL
 import os
 os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
 
@@ -15,145 +22,95 @@ def setup_sqs():
         yield sqs_client
 
 @pytest.fixture
-def setup_dynamodb():
-    with mock_dynamodb2():
-        dynamodb_client = boto3.client('dynamodb')
-        dynamodb_client.create_table(
-            TableName='waivers',
-            AttributeDefinitions=[
-                {
-                    'AttributeName': 'key',
-                    'AttributeType': 'S'
-                },
-            ],
-            KeySchema=[
-                {
-                    'AttributeName': 'key',
-                    'KeyType': 'HASH'
-                }
-            ]
-        )
-        dynamodb_client.create_table(TableName='players',
-            AttributeDefinitions=[
-                {
-                    'AttributeName': 'id',
-                    'AttributeType': 'S'
-                }
-            ],
-            KeySchema=[
-                {
-                    'AttributeName': 'id',
-                    'KeyType': 'HASH'
-                }
-            ]
-        )
-        dynamodb_client.create_table(TableName='franchises',
-            AttributeDefinitions=[
-                {
-                    'AttributeName': 'id',
-                    'AttributeType': 'S'
-                }
-            ],
-            KeySchema=[
-                {
-                    'AttributeName': 'id',
-                    'KeyType': 'HASH'
-                }
-            ]
-        )
-
-        dynamodb_resource = boto3.resource('dynamodb')
-
-        waivers_table = dynamodb_resource.Table('waivers')
-        waivers_table.update_item(
-            Key={
-                'key': '1608890400-Josh-Oliver-JAC-TE'
-            },
-            ExpressionAttributeNames={
-                '#FID': 'franchise_id',
-                '#RT': 'raw_transaction',
-                '#FT': 'formatted_transaction',
-                '#FN': 'franchise_name',
-                '#T': 'type',
-                '#TS': 'timestamp'
-            },
-            ExpressionAttributeValues={
-                ':fid': '0003',
-                ':rt': '14209,|1.00|', 
-                ':ft': ["$1.00", "Josh Oliver, JAC TE", None],
-                ':fn': 'Jeff Janis Fan Club', 
-                ':t': 'BBID_WAIVER',
-                ':ts': '1608890400',
-            },
-            UpdateExpression='SET #FID=:fid, #RT=:rt, #FT=:ft, #FN=:fn, #T=:t, #TS=:ts'
-        )
-
-        players_table = dynamodb_resource.Table('players')
-        players_table.update_item(
-            Key={
-                'id': '14209'
-            },
-            ExpressionAttributeNames={
-                '#N': 'name',
-                '#P': 'position',
-                '#T': 'team'
-            },
-            ExpressionAttributeValues={
-                ':n': 'Josh Oliver', 
-                ':p': 'TE',
-                ':t': 'JAC'
-            },
-            UpdateExpression='SET #N=:n, #P=:p, #T=:t'
-        )
-        players_table.update_item(
-            Key={
-                'id': '11247'
-            },
-            ExpressionAttributeNames={
-                '#N': 'name',
-                '#P': 'position',
-                '#T': 'team'
-            },
-            ExpressionAttributeValues={
-                ':n': 'Zach Ertz', 
-                ':p': 'TE',
-                ':t': 'PHI'
-            },
-            UpdateExpression='SET #N=:n, #P=:p, #T=:t'
-        )
-
-        franchise_table = dynamodb_resource.Table('franchises')
-        franchise_table.update_item(
-            Key={
-                'id': '0003'
-            },
-            ExpressionAttributeNames={
-                '#N': 'name',
-                '#D': 'division_id',
-                '#B': 'blind_bid_dollars'
-            },
-            ExpressionAttributeValues={
-                ':n': 'Jeff Janis Fan Club', 
-                ':d': '01',
-                ':b': '12.00', 
-            },
-            UpdateExpression='SET #N=:n, #D=:d, #B=:b'
-        )
-        yield dynamodb_client, dynamodb_resource
-
-def test_send_sqs_message_correctly(setup_sqs):
-    message_to_send = 'test message'
-    
-    sent_message = send_sqs_message('BDFLMessageQueue', message_to_send)
-
-    assert sent_message['ResponseMetadata']['HTTPStatusCode'] == 200
+def setup_dynamodb(dynamodb_tables):
+    lookup_cache.clear()
+    dynamodb_resource = boto3.resource('dynamodb')
+
+    waivers_table = dynamodb_resource.Table('waivers')
+    waivers_table.update_item(
+        Key={
+            'key': '1608890400-Josh-Oliver-JAC-TE'
+        },
+        ExpressionAttributeNames={
+            '#FID': 'franchise_id',
+            '#RT': 'raw_transaction',
+            '#FT': 'formatted_transaction',
+            '#FN': 'franchise_name',
+            '#T': 'type',
+            '#TS': 'timestamp'
+        },
+        ExpressionAttributeValues={
+            ':fid': '0003',
+            ':rt': '14209,|1.00|', 
+            ':ft': ["$1.00", "Josh Oliver, JAC TE", None],
+            ':fn': 'Jeff Janis Fan Club', 
+            ':t': 'BBID_WAIVER',
+            ':ts': '1608890400',
+        },
+        UpdateExpression='SET #FID=:fid, #RT=:rt, #FT=:ft, #FN=:fn, #T=:t, #TS=:ts'
+    )
+
+    players_table = dynamodb_resource.Table('players')
+    players_table.update_item(
+        Key={
+            'id': '14209'
+        },
+        ExpressionAttributeNames={
+            '#N': 'name',
+            '#P': 'position',
+            '#T': 'team'
+        },
+        ExpressionAttributeValues={
+            ':n': 'Josh Oliver', 
+            ':p': 'TE',
+            ':t': 'JAC'
+        },
+        UpdateExpression='SET #N=:n, #P=:p, #T=:t'
+    )
+    players_table.update_item(
+        Key={
+            'id': '11247'
+        },
+        ExpressionAttributeNames={
+            '#N': 'name',
+            '#P': 'position',
+            '#T': 'team'
+        },
+        ExpressionAttributeValues={
+            ':n': 'Zach Ertz', 
+            ':p': 'TE',
+            ':t': 'PHI'
+        },
+        UpdateExpression='SET #N=:n, #P=:p, #T=:t'
+    )
+
+    franchise_table = dynamodb_resource.Table('franchises')
+    franchise_table.update_item(
+        Key={
+            'id': '0003'
+        },
+        ExpressionAttributeNames={
+            '#N': 'name',
+            '#D': 'division_id',
+            '#B': 'blind_bid_dollars'
+        },
+        ExpressionAttributeValues={
+            ':n': 'Jeff Janis Fan Club', 
+            ':d': '01',
+            ':b': '12.00', 
+        },
+        UpdateExpression='SET #N=:n, #D=:d, #B=:b'
+    )
+    yield dynamodb_tables, dynamodb_resource
 
 def test_send_sqs_messages_correctly(setup_sqs):
     messages_to_send = ['test message1', 'test message2']
     
-    send_sqs_messages(messages_to_send)
+    results = send_sqs_messages(messages_to_send)
 
-    # if send_sqs_messages raises exception, test will fail
+    assert [result['message'] for result in results] == messages_to_send
+    assert all(result['message_id'] for result in results)
+    assert all_published(results)
 
 def test_format_add_drop_string_player_dropped():
     bid_amt = 130
@@ -190,12 +147,12 @@ def test_format_waiver_message_correctly():
     assert returned_string == expected_string
 
 def test_create_waiver_object(setup_dynamodb):
-    test_waiver = {
+    test_waiver = Transaction.from_json({
         "timestamp": "1608890400",
         "franchise": "0003",
         "transaction": "14209,|1.00|",
         "type": "BBID_WAIVER"
-    }
+    })
 
     expected_waiver_obj = {
         'key': '1608890400-Josh-Oliver-JAC-TE',
@@ -211,41 +168,94 @@ def test_create_waiver_object(setup_dynamodb):
     assert returned_waiver_obj == expected_waiver_obj
 
 def test_store_waivers_if_not_exist_in_db(setup_dynamodb):
-    waivers = [{
+    waivers = [Transaction.from_json({
         "timestamp": str(int(time.time())),
         "franchise": "0003",
         "transaction": "11247,|69.00|",
         "type": "BBID_WAIVER"
-    }]
+    })]
 
     expected_message = ['✅WAIVER CLAIMS COMPLETED✅\n\nJeff Janis Fan Club won Zach Ertz, PHI TE with a $69.00 bid\n']
-    returned_message = store_waivers_if_not_exist(waivers)
+    returned_message = list(store_waivers_if_not_exist(waivers))
 
     assert expected_message == returned_message
 
 def test_store_waivers_if_exist_in_db(setup_dynamodb):
-    waivers = [{
+    waivers = [Transaction.from_json({
         "timestamp": '1608890400',
         "franchise": "0003",
         "transaction": "14209,|10.00|",
         "type": "BBID_WAIVER"
-    }]
+    })]
 
     expected_message = []
-    returned_message = store_waivers_if_not_exist(waivers)
+    returned_message = list(store_waivers_if_not_exist(waivers))
 
     assert expected_message == returned_message
 
 def test_store_waivers_drop_player(setup_dynamodb):
-    waivers = [{
+    waivers = [Transaction.from_json({
         "timestamp": str(int(time.time())),
         "franchise": "0003",
         "transaction": "14209,|10.00|11247",
         "type": "BBID_WAIVER"
-    }]
+    })]
 
     expected_message = ['✅WAIVER CLAIMS COMPLETED✅\n\nJeff Janis Fan Club won Josh Oliver, JAC TE with a $10.00 bid and dropped Zach Ertz, PHI TE\n']
-    returned_message = store_waivers_if_not_exist(waivers)
+    returned_message = list(store_waivers_if_not_exist(waivers))
 
     assert expected_message == returned_message
 
+
+def test_overlapping_invocations_post_each_waiver_once(setup_dynamodb, atomic_dynamodb_writes, monkeypatch):
+    waivers = [Transaction.from_json({
+        "timestamp": str(int(time.time())),
+        "franchise": "0003",
+        "transaction": "11247,|69.00|",
+        "type": "BBID_WAIVER"
+    })]
+    create_waiver_object(waivers[0])
+    invocations = 4
+    # every invocation has enriched the waiver before any of them writes it, the window a read-then-write check loses
+    barrier = threading.Barrier(invocations, timeout=5)
+    store_waiver = get_waivers.store_waiver
+
+    def store_together(waiver_obj):
+        barrier.wait()
+        return store_waiver(waiver_obj)
+
+    monkeypatch.setattr(get_waivers, 'store_waiver', store_together)
+
+    with ThreadPoolExecutor(max_workers=invocations) as pool:
+        results = list(pool.map(lambda _: list(store_waivers_if_not_exist(waivers)), range(invocations)))
+
+    assert sum(len(messages) for messages in results) == 1
+
+def test_only_after_drops_waivers_at_or_before_checkpoint():
+    waivers = [
+        Transaction.from_json({'timestamp': timestamp, 'franchise': '0003', 'transaction': '14209,|1.00|', 'type': 'BBID_WAIVER'})
+        for timestamp in ['1608890400', '1608890500', '1608890600']
+    ]
+
+    assert list(pipeline.only_after(waivers, 1608890500)) == waivers[2:]
+
+def test_handler_skips_waivers_before_checkpoint(setup_dynamodb, setup_sqs, monkeypatch):
+    timestamp = str(int(time.time()))
+    waivers = [{
+        "timestamp": timestamp,
+        "franchise": "0003",
+        "transaction": "11247,|69.00|",
+        "type": "BBID_WAIVER"
+    }]
+
+    monkeypatch.setattr(get_waivers, 'MFL', StubMFL(waivers))
+    monkeypatch.setenv('MFL_LEAGUEID', '12345')
+
+    assert len(handler({}, None)['body']['waivers']) == 1
+    assert get_checkpoint('waivers_12345') == int(timestamp)
+
+    enriched = []
+    monkeypatch.setattr(get_waivers, 'create_waiver_object', enriched.append)
+
+    assert handler({}, None)['body']['waivers'] == []
+    assert enriched == []
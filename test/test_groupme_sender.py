@@ -0,0 +1,125 @@
+import threading
+import time
+import pytest
+import requests
+from groupme.sender import MessageSender, TokenBucket
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeGroupMe:
+    """Records posts and answers each with the next status code queued for its message"""
+
+    def __init__(self, status_codes=None):
+        self.status_codes = status_codes or {}
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def send_message(self, bot_id, message):
+        with self._lock:
+            self.posts.append((bot_id, message))
+            codes = self.status_codes.get(message, [])
+            status_code = codes.pop(0) if codes else 202
+
+        if isinstance(status_code, Exception):
+            raise status_code
+
+        return FakeResponse(status_code)
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(MessageSender, '_retry_delay', lambda self, attempt, retry_after: 0)
+
+def create_sender(groupme, **kwargs):
+    return MessageSender(groupme, rate_per_sec=1000, burst=1000, **kwargs)
+
+def test_messages_keep_their_order_per_bot():
+    groupme = FakeGroupMe()
+    bot_messages = [('bot1', 'a1'), ('bot2', 'b1'), ('bot1', 'a2'), ('bot2', 'b2'), ('bot1', 'a3')]
+
+    statuses = create_sender(groupme).send_all(bot_messages)
+
+    assert [(status['bot_id'], status['message']) for status in statuses] == bot_messages
+    assert all(status['delivered'] for status in statuses)
+    assert [message for bot_id, message in groupme.posts if bot_id == 'bot1'] == ['a1', 'a2', 'a3']
+    assert [message for bot_id, message in groupme.posts if bot_id == 'bot2'] == ['b1', 'b2']
+
+def test_throttled_and_server_errors_are_retried(no_backoff):
+    groupme = FakeGroupMe({'a': [429, 503], 'b': [requests.ConnectionError('reset')]})
+
+    statuses = create_sender(groupme).send('bot', ['a', 'b'])
+
+    assert [status['delivered'] for status in statuses] == [True, True]
+    assert [status['attempts'] for status in statuses] == [3, 2]
+    assert [message for _, message in groupme.posts] == ['a', 'a', 'a', 'b', 'b']
+
+def test_client_errors_are_not_retried_or_counted_as_sent(no_backoff):
+    groupme = FakeGroupMe({'bad': [400], 'down': [500, 500, 500]})
+
+    statuses = create_sender(groupme, max_retries=2).send('bot', ['bad', 'down', 'good'])
+
+    assert [status['delivered'] for status in statuses] == [False, False, True]
+    assert statuses[0]['attempts'] == 1
+    assert statuses[0]['error'] == 'HTTP 400'
+    assert statuses[1]['attempts'] == 3
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    # the first token is available immediately, the other five take 1/50s each
+    assert time.monotonic() - start >= 0.1
+
+def test_retry_after_is_capped():
+    sender = create_sender(FakeGroupMe(), max_retry_delay_secs=5)
+
+    assert sender._retry_delay(1, '2') == 2
+    assert sender._retry_delay(1, '3600') == 5
+
+def test_retries_stop_at_the_deadline(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, 'sleep', sleeps.append)
+    groupme = FakeGroupMe({'a': [503, 503]})
+
+    sender = create_sender(groupme, backoff_secs=0, deadline=time.monotonic() + 30)
+    sender._retry_delay = lambda attempt, retry_after: 20 * attempt
+
+    statuses = sender.send('bot', ['a'])
+
+    assert statuses[0]['delivered'] is False
+    assert statuses[0]['attempts'] == 2
+    assert statuses[0]['error'] == 'HTTP 503, out of time to retry'
+    assert sleeps == [20]
+
+def test_handler_reports_records_with_undelivered_posts(monkeypatch):
+    import send_bdfl_messages
+
+    class Context:
+        def get_remaining_time_in_millis(self):
+            return 60000
+
+    deadlines = []
+
+    def send_messages(groupme, messages, deadline=None):
+        deadlines.append(deadline)
+        return [{'message': message, 'delivered': message != 'down', 'delivered_at': 0.0} for message in messages]
+
+    monkeypatch.setattr(send_bdfl_messages, 'send_messages', send_messages)
+    monkeypatch.setattr(send_bdfl_messages.GroupMe, 'CHARACTER_LIMIT', 4)
+
+    response = send_bdfl_messages.handler({'Records': [
+        {'messageId': '1', 'body': 'up'}, {'messageId': '2', 'body': 'down'}
+    ]}, Context())
+
+    assert response['body'] == ['up']
+    assert response['batchItemFailures'] == [{'itemIdentifier': '2'}]
+    assert 50 < deadlines[0] - time.monotonic() <= 55
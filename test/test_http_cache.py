@@ -0,0 +1,67 @@
+import pytest
+from pymfl.mfl import MFL
+from pymfl.http_cache import ResponseCache
+from stub_mfl_server import StubMFLServer
+
+RESPONSES = {
+    'players': {'players': {'player': [
+        {'id': '14209', 'name': 'Oliver, Josh', 'position': 'TE', 'team': 'JAC'}
+    ]}},
+    'liveScoring': {'liveScoring': {'matchup': []}}
+}
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    with StubMFLServer(RESPONSES) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        yield server
+
+def create_mfl(cache):
+    return MFL('user', 'pass', 12345, 2020, cache=cache)
+
+def test_fresh_entries_are_served_without_a_request(stub_server, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+
+    first = create_mfl(cache).players()
+    second = create_mfl(cache).players()
+
+    assert first == second == RESPONSES['players']['players']['player']
+    assert len(stub_server.requests) == 1
+
+def test_stale_entries_are_revalidated_with_a_conditional_get(stub_server, tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age={'players': 0})
+
+    create_mfl(cache).players()
+    players = create_mfl(cache).players()
+
+    assert players == RESPONSES['players']['players']['player']
+    assert len(stub_server.requests) == 2
+    assert 'If-None-Match' not in stub_server.requests[0][2]
+    assert stub_server.requests[1][2]['If-None-Match'].startswith('"')
+
+def test_cache_survives_a_new_process(stub_server, tmp_path):
+    create_mfl(ResponseCache(str(tmp_path))).players()
+
+    players = create_mfl(ResponseCache(str(tmp_path))).players()
+
+    assert players == RESPONSES['players']['players']['player']
+    assert len(stub_server.requests) == 1
+
+def test_changed_body_replaces_cached_entry(stub_server, tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), max_age={'players': 0})
+    create_mfl(cache).players()
+
+    updated_player = {'id': '14209', 'name': 'Oliver, Josh', 'position': 'TE', 'team': 'BAL'}
+    monkeypatch.setitem(stub_server.responses, 'players', {'players': {'player': [updated_player]}})
+
+    assert create_mfl(cache).players() == [updated_player]
+
+def test_live_scoring_is_never_cached(stub_server, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+
+    create_mfl(cache).live_scores()
+    create_mfl(cache).live_scores()
+
+    assert len(stub_server.requests) == 2
+    assert all('If-None-Match' not in headers for _, _, headers in stub_server.requests)
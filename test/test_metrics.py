@@ -0,0 +1,143 @@
+import json
+import pytest
+import boto3
+from moto import mock_dynamodb2, mock_sqs
+import get_trades
+from bdfl import metrics, runtime
+from bdfl.cache import lookup_cache
+from bdfl.metrics import CallMetrics, http_endpoint, instrument_boto3
+from pymfl.mfl import MFL
+from stub_mfl_server import StubMFLServer
+from helpers import StubMFL, create_table, put_players_and_franchises
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+def test_calls_are_counted_per_service_operation_and_resource():
+    call_metrics = CallMetrics()
+    call_metrics.record('dynamodb', 'GetItem', 'players', 0.002, bytes_sent=40, bytes_received=120)
+    call_metrics.record('dynamodb', 'GetItem', 'players', 0.003, error=True)
+    call_metrics.record('dynamodb', 'UpdateItem', 'trades', 0.004)
+    call_metrics.record('mfl', 'GET', 'transactions', 0.25)
+
+    assert call_metrics.calls() == 4
+    assert call_metrics.calls('dynamodb') == 3
+    assert call_metrics.calls('dynamodb', 'GetItem') == 2
+    assert call_metrics.calls(resource='trades') == 1
+    assert call_metrics.stats()[('dynamodb', 'GetItem', 'players')] == {
+        'calls': 2, 'errors': 1, 'milliseconds': pytest.approx(5.0), 'bytes_sent': 40, 'bytes_received': 120
+    }
+
+def test_emf_record_declares_every_value_it_carries():
+    call_metrics = CallMetrics()
+    call_metrics.record('dynamodb', 'GetItem', 'players', 0.002)
+    call_metrics.record('sqs', 'SendMessageBatch', 'BDFLMessageQueue', 0.01)
+
+    record = call_metrics.emf_record('get_trades', duration_secs=0.5, timestamp=1608890400)
+    (directive,) = record['_aws']['CloudWatchMetrics']
+
+    assert record['_aws']['Timestamp'] == 1608890400000
+    assert directive['Dimensions'] == [['Function']] and record['Function'] == 'get_trades'
+    assert record['duration.milliseconds'] == 500.0
+    assert record['dynamodb.calls'] == 1
+    assert record['sqs.SendMessageBatch.BDFLMessageQueue.calls'] == 1
+    assert record['dynamodb.GetItem.players.milliseconds'] == 2.0
+    assert all(metric['Name'] in record for metric in directive['Metrics'])
+    assert {'Name': 'dynamodb.GetItem.players.bytes_received', 'Unit': 'Bytes'} in directive['Metrics']
+
+def test_emf_record_declares_no_more_than_cloudwatch_takes():
+    call_metrics = CallMetrics()
+    for i in range(30):
+        call_metrics.record('dynamodb', 'GetItem', f'table{i}', 0.001)
+
+    record = call_metrics.emf_record('get_trades')
+
+    assert len(record['_aws']['CloudWatchMetrics'][0]['Metrics']) == metrics.MAX_EMF_METRICS
+    assert record['dynamodb.GetItem.table29.calls'] == 1
+
+@pytest.mark.parametrize('url, endpoint', [
+    ('https://api.myfantasyleague.com/2020/export?TYPE=transactions&L=12345&JSON=1', 'transactions'),
+    ('https://api.myfantasyleague.com/2020/login', 'login'),
+    ('https://api.groupme.com/v3/bots/post', 'bots/post')
+])
+def test_http_endpoint(url, endpoint):
+    assert http_endpoint(url) == endpoint
+
+def test_boto3_calls_are_recorded_with_their_table():
+    call_metrics = CallMetrics()
+
+    with mock_dynamodb2():
+        dynamodb_client = instrument_boto3(boto3.client('dynamodb'), call_metrics)
+        create_table(dynamodb_client, 'players')
+        dynamodb_client.get_item(TableName='players', Key={'id': {'S': '14209'}})
+        dynamodb_client.batch_get_item(RequestItems={'players': {'Keys': [{'id': {'S': '14209'}}]}})
+
+    assert call_metrics.calls('dynamodb', 'CreateTable', 'players') == 1
+    assert call_metrics.calls('dynamodb', 'GetItem', 'players') == 1
+    assert call_metrics.calls('dynamodb', 'BatchGetItem', 'players') == 1
+    assert call_metrics.stats()[('dynamodb', 'GetItem', 'players')]['bytes_sent'] > 0
+
+    with mock_sqs():
+        sqs_client = instrument_boto3(boto3.client('sqs'), call_metrics)
+        queue_url = sqs_client.create_queue(QueueName='BDFLMessageQueue')['QueueUrl']
+        sqs_client.send_message(QueueUrl=queue_url, MessageBody='x' * 5000)
+
+    # SQS sends form fields, counted once they are encoded
+    assert call_metrics.calls('sqs', 'SendMessage', 'BDFLMessageQueue') == 1
+    assert call_metrics.stats()[('sqs', 'SendMessage', 'BDFLMessageQueue')]['bytes_sent'] > 5000
+
+def test_runtime_sessions_record_http_calls(monkeypatch):
+    runtime.reset()
+    metrics.collector.reset()
+
+    with StubMFLServer({'transactions': {'transactions': {}}}) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        MFL(None, None, 12345, 2020, session=runtime.mfl_session()).transactions('')
+
+    runtime.reset()
+
+    assert metrics.collector.calls('mfl', 'GET', 'transactions') == 1
+    assert metrics.collector.stats()[('mfl', 'GET', 'transactions')]['bytes_received'] > 0
+
+@pytest.fixture
+def trade_run(setup_aws, monkeypatch):
+    runtime.reset()
+
+    # 0004 is named by a future pick in the handler's test trade
+    put_players_and_franchises(setup_aws, {}, {'0004': 'Bortles Bay'})
+
+    monkeypatch.setattr(get_trades, 'MFL', StubMFL([
+        {'type': 'TRADE', 'timestamp': str(1608890400 + i), 'comments': 'test', 'franchise': '0003',
+         'franchise2': '0007', 'franchise1_gave_up': '14209,', 'franchise2_gave_up': '13631,'}
+        for i in range(20)
+    ]))
+
+    yield
+
+    runtime.reset()
+    lookup_cache.clear()
+
+def test_trade_run_stays_within_call_budget(trade_run, capsys):
+    body = get_trades.handler({}, None)['body']
+    collector = metrics.collector
+
+    # 20 trades plus the handler's test trade
+    assert len(body['trades']) == 21
+    # the players and franchises snapshot checks, then one batch per table and prefetch chunk
+    assert collector.calls('dynamodb', 'GetItem') <= 2
+    assert collector.calls('dynamodb', 'BatchGetItem') <= 4
+    # one conditional write per trade
+    assert collector.calls('dynamodb', 'UpdateItem', 'trades') == 21
+    assert collector.calls('sqs', 'SendMessageBatch') == 3
+
+    (record,) = [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+        if line.startswith('{') and json.loads(line)['type'] == metrics.METRICS_RECORD
+    ]
+    assert record['Function'] == 'get_trades'
+    assert record['dynamodb.UpdateItem.trades.calls'] == 21
+
+    # a warm run posts nothing and reads nothing it already cached
+    assert get_trades.handler({}, None)['body']['trades'] == []
+    assert collector.calls('dynamodb', 'BatchGetItem') == 0
+    assert collector.calls('sqs') == 0
@@ -0,0 +1,113 @@
+import pytest
+import time
+from pymfl.auth import LoginCache, MFLAuthenticationError
+from pymfl.http_cache import ResponseCache
+from pymfl.mfl import MFL
+from bdfl.logins import StoredLogins
+from bdfl.storage import MemoryStorage
+from bdfl import runtime
+from stub_mfl_server import StubMFLServer
+
+RESPONSES = {
+    'transactions': {'transactions': {'transaction': [{'type': 'TRADE', 'timestamp': '1'}]}},
+    'league': {'league': {'franchises': {'franchise': []}}}
+}
+USERS = {'user': 'secret'}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with StubMFLServer(RESPONSES, users=USERS) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        yield server
+
+def logins(server):
+    return [request for request in server.requests if request[0] == 'POST']
+
+def test_login_posts_credentials_in_the_body(server):
+    mfl = MFL('user', 'secret', 12345, 2020, login_cache=LoginCache())
+
+    cookie = mfl.login()
+
+    method, path, headers = server.requests[0]
+    assert (method, path) == ('POST', '/2020/login')
+    assert 'secret' not in path
+    assert cookie in server.logins
+
+def test_login_is_reused_across_requests_and_instances(server):
+    login_cache = LoginCache()
+
+    for _ in range(2):
+        mfl = MFL('user', 'secret', 12345, 2020, login_cache=login_cache)
+        assert mfl.transactions('') == RESPONSES['transactions']['transactions']['transaction']
+        mfl.league_info()
+
+    # the first request is turned away before the login, the rest carry its cookie
+    assert len(logins(server)) == 1
+    assert len(server.requests) == 6
+
+def test_rejected_login_is_renewed_transparently(server):
+    mfl = MFL('user', 'secret', 12345, 2020, login_cache=LoginCache())
+    mfl.transactions('')
+
+    server.expire_logins()
+
+    assert mfl.transactions('') == RESPONSES['transactions']['transactions']['transaction']
+    assert len(logins(server)) == 2
+
+def test_rejected_login_is_not_served_from_the_response_cache(server, tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age={'league': 3600})
+    # an anonymous request gets the login error, which must not stick in the cache
+    with pytest.raises(MFLAuthenticationError):
+        MFL(None, None, 12345, 2020, cache=cache).league_info()
+
+    assert MFL('user', 'secret', 12345, 2020, cache=cache, login_cache=LoginCache()).league_info() == RESPONSES['league']
+
+def test_expired_login_is_renewed(server, monkeypatch):
+    login_cache = LoginCache(max_age=60)
+    mfl = MFL('user', 'secret', 12345, 2020, login_cache=login_cache)
+    mfl.transactions('')
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    mfl.transactions('')
+
+    assert len(logins(server)) == 2
+
+def test_wrong_password_raises(server):
+    mfl = MFL('user', 'wrong', 12345, 2020, login_cache=LoginCache())
+
+    with pytest.raises(MFLAuthenticationError):
+        mfl.transactions('')
+
+def test_streamed_request_logs_in_when_turned_away(monkeypatch):
+    players = {'players': {'player': [{'id': '1'}, {'id': '2'}]}}
+
+    with StubMFLServer({'players': players}, users=USERS) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        mfl = MFL('user', 'secret', 12345, 2020, login_cache=LoginCache())
+
+        assert list(mfl.iter_players()) == players['players']['player']
+        assert len(logins(server)) == 1
+
+def test_public_league_requests_do_not_log_in(monkeypatch):
+    with StubMFLServer(RESPONSES) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        MFL('user', 'secret', 12345, 2020, login_cache=LoginCache()).transactions('')
+
+    assert logins(server) == []
+
+def test_requests_without_credentials_do_not_log_in(monkeypatch):
+    with StubMFLServer(RESPONSES) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        MFL(None, None, 12345, 2020).transactions('')
+
+    assert logins(server) == []
+
+def test_stored_login_is_reused_by_a_cold_container(server, monkeypatch):
+    monkeypatch.setattr(runtime, '_clients', {'storage': MemoryStorage()})
+
+    MFL('user', 'secret', 12345, 2020, login_cache=LoginCache(store=StoredLogins())).transactions('')
+    MFL('user', 'secret', 12345, 2020, login_cache=LoginCache(store=StoredLogins())).transactions('')
+
+    assert len(logins(server)) == 1
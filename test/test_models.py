@@ -0,0 +1,66 @@
+import pytest
+from pymfl.models.franchise import Franchise
+from pymfl.models.player import Player
+from pymfl.models.transaction import Transaction, Trade, Waiver, FreeAgent
+from pymfl.models.matchup import Matchup
+from pymfl.models.roster_entry import RosterEntry
+
+
+def test_franchise_from_json():
+    franchise = Franchise.from_json({'id': '0003', 'name': 'Jeff Janis Fan Club', 'bbidAvailableBalance': '12.00', 'division': '01'})
+
+    assert (franchise.franchise_id, franchise.name, franchise.blind_bid_dollars, franchise.division_id) == (
+        '0003', 'Jeff Janis Fan Club', '12.00', '01'
+    )
+    assert franchise.roster == {}
+
+def test_player_from_players_and_injuries_exports():
+    player = Player.from_json({'id': '14209', 'name': 'Oliver, Josh', 'position': 'TE', 'team': 'JAC'})
+    injured = Player.from_json({'id': '14209', 'status': 'Questionable', 'details': 'Ankle'})
+
+    assert (player.name, player.position, player.team, player.injury_status) == ('Oliver, Josh', 'TE', 'JAC', None)
+    assert (injured.injury_status, injured.injury_details) == ('Questionable', 'Ankle')
+
+def test_models_are_slotted():
+    with pytest.raises(AttributeError):
+        Player('14209').roster_status = 'ROSTER'
+
+def test_transaction_from_json_builds_registered_type():
+    trade = Transaction.from_json({
+        'type': 'TRADE', 'timestamp': '1608890400', 'franchise': '0008', 'franchise2': '0007',
+        'franchise1_gave_up': 'DP_0_1,', 'franchise2_gave_up': '14136,'
+    })
+    taxi = Transaction.from_json({'type': 'TAXI', 'timestamp': '1608890400', 'franchise': '0008', 'transaction': '|14136,'})
+
+    assert isinstance(trade, Trade)
+    assert (trade.franchise_id, trade.franchise2_id, trade.comments) == ('0008', '0007', '')
+    assert type(taxi) is Transaction
+    assert taxi.transaction == '|14136,'
+
+@pytest.mark.parametrize('transaction,added,bid,dropped', [
+    ('14209,|1.00|', '14209', '1.00', None),
+    ('14209,|10.00|11247', '14209', '10.00', '11247'),
+    ('8670,|1.00|13988,', '8670', '1.00', '13988')
+])
+def test_waiver_parses_transaction(transaction, added, bid, dropped):
+    waiver = Transaction.from_json({'type': 'BBID_WAIVER', 'timestamp': '1608890400', 'franchise': '0003', 'transaction': transaction})
+
+    assert isinstance(waiver, Waiver)
+    assert (waiver.added_player_id, waiver.bid, waiver.dropped_player_id) == (added, bid, dropped)
+
+def test_free_agent_parses_transaction():
+    free_agent = Transaction.from_json({'type': 'FREE_AGENT', 'timestamp': '1608890400', 'franchise': '0003', 'transaction': '13130,|13604,11247,'})
+
+    assert isinstance(free_agent, FreeAgent)
+    assert free_agent.added_player_ids == ['13130']
+    assert free_agent.dropped_player_ids == ['13604', '11247']
+
+def test_matchup_and_roster_entry_from_json():
+    matchup = Matchup.from_json({'franchise': [
+        {'id': '0003', 'score': '100.5', 'playersYetToPlay': '2'},
+        {'id': '0004', 'score': '95', 'playersYetToPlay': '0'}
+    ]})
+    entry = RosterEntry.from_json({'id': '14209', 'status': 'TAXI_SQUAD', 'salary': '1.00'}, '0003')
+
+    assert [(f.franchise_id, f.score, f.players_yet_to_play) for f in matchup.franchises] == [('0003', '100.5', '2'), ('0004', '95', '0')]
+    assert (entry.player_id, entry.franchise_id, entry.status, entry.salary) == ('14209', '0003', 'TAXI_SQUAD', '1.00')
@@ -0,0 +1,70 @@
+from hypothesis import given, strategies as st
+from groupme.groupme import GroupMe
+from groupme.packing import message_length, hard_wrap, pack_messages
+
+line_text = st.text(alphabet=st.sampled_from('ab cd🚨✅👀é'), max_size=40)
+notification = st.lists(line_text, min_size=1, max_size=6).map(lambda lines: '\n'.join(lines) + '\n')
+batch = st.lists(notification, max_size=12)
+
+
+def minimum_post_count(messages, limit):
+    """Line by line next fit, which gives the fewest posts when order is kept"""
+    posts = 0
+    length = None
+    previous_id = None
+
+    for notification_id, message in enumerate(messages):
+        message = message.strip('\n')
+        if not message:
+            continue
+        for line in message.split('\n'):
+            for piece in hard_wrap(line, limit):
+                added = message_length(piece) + (0 if length is None else 1 + (notification_id != previous_id))
+                if length is None or length + added > limit:
+                    posts += 1
+                    length = message_length(piece)
+                else:
+                    length += added
+                previous_id = notification_id
+
+    return posts
+
+def visible_text(texts):
+    return ''.join(''.join(texts).split())
+
+def test_message_length_counts_emoji_as_two():
+    assert message_length('🚨TRADE COMPLETED🚨') == 19
+    assert message_length('é') == 1
+
+def test_hard_wrap_prefers_spaces():
+    assert hard_wrap('aaa bbb ccc', 7) == ['aaa bbb', 'ccc']
+    assert hard_wrap('aaaaaaaaaa', 4) == ['aaaa', 'aaaa', 'aa']
+
+def test_small_notifications_share_a_post():
+    messages = ['🚨TRADE COMPLETED🚨\n\nA GIVES UP:\n- x\n', 'B won y with a $1.00 bid\n']
+
+    assert GroupMe('key').format_bdfl_messages_for_character_limit(messages) == [
+        '🚨TRADE COMPLETED🚨\n\nA GIVES UP:\n- x\n\nB won y with a $1.00 bid'
+    ]
+
+def test_notification_is_moved_rather_than_split_when_post_count_is_the_same():
+    first = 'a' * 30 + '\n'
+    second = 'b' * 10 + '\n' + 'c' * 10 + '\n'
+
+    assert pack_messages([first, second], 40) == ['a' * 30, 'b' * 10 + '\n' + 'c' * 10]
+
+def test_empty_batch_has_no_posts():
+    assert pack_messages([], 450) == []
+    assert pack_messages(['\n'], 450) == []
+
+@given(batch, st.integers(min_value=2, max_value=60))
+def test_posts_fit_the_limit(messages, limit):
+    assert all(message_length(post) <= limit for post in pack_messages(messages, limit))
+
+@given(batch, st.integers(min_value=2, max_value=60))
+def test_posts_keep_message_order(messages, limit):
+    assert visible_text(pack_messages(messages, limit)) == visible_text(messages)
+
+@given(batch, st.integers(min_value=2, max_value=60))
+def test_post_count_is_minimal(messages, limit):
+    assert len(pack_messages(messages, limit)) <= minimum_post_count(messages, limit)
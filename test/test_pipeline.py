@@ -0,0 +1,223 @@
+import pytest
+import threading
+import time
+import get_trades
+import get_transactions
+from bdfl.checkpoints import get_checkpoint
+from bdfl import pipeline
+from bdfl.cache import lookup_cache
+from bdfl.snapshots import lookup_snapshots
+from bdfl.storage import MemoryStorage
+from bdfl.sqs import publisher
+from bdfl import runtime
+from helpers import StubMFL
+
+
+def test_micro_batches_are_cut_by_size_and_by_wait():
+    assert list(pipeline.micro_batches(range(23), size=10)) == [list(range(10)), list(range(10, 20)), [20, 21, 22]]
+
+    def slow_messages():
+        yield 'first'
+        time.sleep(0.05)
+        yield 'second'
+        yield 'third'
+
+    assert list(pipeline.micro_batches(slow_messages(), size=10, max_wait_secs=0.01)) == [['first'], ['second', 'third']]
+
+def test_micro_batches_flush_the_partial_batch_before_an_error():
+    def failing_messages():
+        yield 'claimed'
+        raise ValueError('lookup failed')
+
+    batches = pipeline.micro_batches(failing_messages(), size=10)
+
+    assert next(batches) == ['claimed']
+    with pytest.raises(ValueError):
+        next(batches)
+
+def test_joined_joins_the_items_read_before_an_error():
+    def lines():
+        yield 'a'
+        yield 'b'
+        raise ValueError('boom')
+
+    joined = []
+    with pytest.raises(ValueError):
+        for message in pipeline.joined(lines(), lambda items: ['+'.join(items)]):
+            joined.append(message)
+
+    assert joined == ['a+b']
+
+def test_store_new_yields_claims_made_after_a_failed_item():
+    claimed = []
+    later_claimed = threading.Event()
+
+    def create(item):
+        if item == 3:
+            # fails only once an item after it has been claimed on another thread
+            later_claimed.wait(timeout=5)
+            raise ValueError('lookup failed')
+        return item
+
+    def store(item):
+        claimed.append(item)
+        if item == 5:
+            later_claimed.set()
+        return item != 1
+
+    messages = []
+    with pytest.raises(ValueError):
+        for message in pipeline.store_new(range(20), create, store, str, max_workers=4):
+            messages.append(message)
+
+    assert 5 in claimed
+    assert sorted(messages, key=int) == [str(item) for item in sorted(claimed) if item != 1]
+
+def test_store_new_yields_claims_made_before_the_source_fails():
+    def items():
+        yield from [1, 2]
+        raise ValueError('read failed')
+
+    messages = []
+    with pytest.raises(ValueError):
+        for message in pipeline.store_new(items(), lambda item: item, lambda item: item != 2, str, max_workers=4):
+            messages.append(message)
+
+    assert messages == ['1']
+
+def test_only_after_and_latest_timestamp():
+    class Item:
+        def __init__(self, timestamp):
+            self.timestamp = timestamp
+
+    items = [Item(str(timestamp)) for timestamp in [100, 300, 200]]
+    latest = pipeline.LatestTimestamp()
+
+    assert [item.timestamp for item in latest.track(pipeline.only_after(items, 100))] == ['300', '200']
+    assert latest.value == 300
+    assert list(pipeline.only_after(items, None)) == items
+
+def test_prefetch_batches_lookups_per_chunk():
+    class Lookup:
+        def __init__(self):
+            self.calls = []
+
+        def prefetch(self, table_name, ids):
+            self.calls.append((table_name, ids))
+
+    lookup = Lookup()
+    items = list(pipeline.prefetch(range(5), lambda item: [('players', str(item))], lookup, chunk_size=2))
+
+    assert items == list(range(5))
+    assert lookup.calls == [('players', ['0', '1']), ('players', ['2', '3']), ('players', ['4'])]
+
+@pytest.fixture
+def trades_league(monkeypatch):
+    storage = MemoryStorage()
+    monkeypatch.setattr(runtime, '_clients', {'storage': storage})
+    lookup_cache.clear()
+    lookup_snapshots.clear()
+
+    with storage.batch_writer('players') as batch:
+        for i in range(60):
+            batch.put({'id': str(10000 + i), 'name': f'Player {i}', 'position': 'WR', 'team': 'MIN'})
+        # named by the test trade the handler adds
+        batch.put({'id': '14136', 'name': 'Justin Jefferson', 'position': 'WR', 'team': 'MIN'})
+        batch.put({'id': '13631', 'name': 'Nick Chubb', 'position': 'RB', 'team': 'CLE'})
+    with storage.batch_writer('franchises') as batch:
+        for franchise_id in ['0003', '0004', '0007', '0008']:
+            batch.put({'id': franchise_id, 'name': f'Franchise {franchise_id}'})
+
+    yield storage
+
+    lookup_cache.clear()
+    lookup_snapshots.clear()
+
+def test_trades_are_published_while_mfl_rows_are_still_read(trades_league, monkeypatch):
+    rows_read = []
+    rows_read_at_publish = []
+
+    def rows():
+        for i in range(200):
+            rows_read.append(i)
+            yield {'type': 'TRADE', 'timestamp': str(1608890400 + i), 'comments': '', 'franchise': '0003',
+                   'franchise2': '0007', 'franchise1_gave_up': f'{10000 + i % 60},', 'franchise2_gave_up': 'BB_5,'}
+
+    def publish(messages):
+        rows_read_at_publish.append(len(rows_read))
+        return [{'message': message, 'message_id': '1', 'error': None} for message in messages]
+
+    mfl = StubMFL(rows())
+    monkeypatch.setattr(get_trades, 'MFL', mfl)
+    monkeypatch.setattr(publisher, 'publish', publish)
+
+    body = get_trades.handler({}, None)['body']
+
+    assert mfl.transaction_types == ['TRADE']
+    # the 200 trades plus the handler's test trade, in feed order
+    assert len(body['trades']) == 201
+    assert body['trades'][0].startswith('🚨TRADE COMPLETED🚨\n\nFranchise 0003 GIVES UP:\n- Player 0, MIN WR')
+    assert body['trades'][59].startswith('🚨TRADE COMPLETED🚨\n\nFranchise 0003 GIVES UP:\n- Player 59, MIN WR')
+    assert rows_read_at_publish[0] < 200
+
+    # a second run finds every trade stored already
+    assert get_trades.handler({}, None)['body']['trades'] == []
+
+def test_get_transactions_streams_trades_and_joins_waivers(trades_league, monkeypatch):
+    now = int(time.time())
+    rows_read = []
+    rows_read_at_publish = []
+
+    def rows():
+        for i in range(120):
+            rows_read.append(i)
+            if i % 2:
+                yield {'type': 'BBID_WAIVER', 'timestamp': str(now - i), 'franchise': '0004',
+                       'transaction': f'{10000 + i % 60},|1.00|'}
+            else:
+                yield {'type': 'TRADE', 'timestamp': str(now - i), 'comments': '', 'franchise': '0003',
+                       'franchise2': '0007', 'franchise1_gave_up': f'{10000 + i % 60},', 'franchise2_gave_up': 'BB_5,'}
+
+    def publish(messages):
+        rows_read_at_publish.append(len(rows_read))
+        return [{'message': message, 'message_id': '1', 'error': None} for message in messages]
+
+    monkeypatch.setattr(get_transactions, 'MFL', StubMFL(rows()))
+    monkeypatch.setattr(publisher, 'publish', publish)
+    monkeypatch.setenv('MFL_LEAGUEID', '12345')
+
+    messages = get_transactions.handler({}, None)['body']['transactions']
+
+    # 60 trades one message each, then every waiver claim in one message
+    assert len(messages) == 61
+    assert all(message.startswith('🚨TRADE COMPLETED🚨') for message in messages[:60])
+    assert messages[60].startswith('✅WAIVER CLAIMS COMPLETED✅') and messages[60].count('won') == 60
+    assert rows_read_at_publish[0] < 120
+    assert get_checkpoint('transactions_12345') == now
+
+def test_get_transactions_publishes_joined_claims_before_a_later_chunk_fails(trades_league, monkeypatch):
+    now = int(time.time())
+    published = []
+
+    rows = [
+        {'type': 'BBID_WAIVER', 'timestamp': str(now - 1), 'franchise': '0004', 'transaction': '10000,|1.00|'},
+        # 99999 is in no table, the trade fails in the second chunk after the waiver was claimed
+        {'type': 'TRADE', 'timestamp': str(now), 'comments': '', 'franchise': '0003',
+         'franchise2': '0007', 'franchise1_gave_up': '99999,', 'franchise2_gave_up': 'BB_5,'}
+    ]
+
+    def publish(messages):
+        published.extend(messages)
+        return [{'message': message, 'message_id': '1', 'error': None} for message in messages]
+
+    monkeypatch.setattr(get_transactions, 'MFL', StubMFL(rows))
+    monkeypatch.setattr(get_transactions.dispatcher, '_chunk_size', 1)
+    monkeypatch.setattr(publisher, 'publish', publish)
+    monkeypatch.setenv('MFL_LEAGUEID', '12345')
+
+    with pytest.raises(Exception, match='Threw error for: 99999'):
+        get_transactions.handler({}, None)
+
+    assert trades_league.get('waivers', f'{now - 1}-Player-0-MIN-WR') is not None
+    assert published == ['✅WAIVER CLAIMS COMPLETED✅\n\nFranchise 0004 won Player 0, MIN WR with a $1.00 bid\n']
+    assert get_checkpoint('transactions_12345') is None
@@ -0,0 +1,150 @@
+import pytest
+import time
+import get_rosters
+import get_transactions
+from pymfl.mfl import MFL
+from pymfl.models.league_rosters import LeagueRosters
+from pymfl.models.transaction import Transaction
+from bdfl.rosters import RosterIndex, roster_index
+from bdfl.storage import MemoryStorage
+from bdfl.sqs import publisher
+from bdfl import runtime
+from helpers import StubMFL
+from stub_mfl_server import StubMFLServer
+
+ROSTERS = [
+    {'id': '0003', 'player': [
+        {'id': '14209', 'status': 'ROSTER', 'salary': '5.00'},
+        {'id': '11247', 'status': 'INJURED_RESERVE'}
+    ]},
+    {'id': '0007', 'player': {'id': '13631', 'status': 'TAXI_SQUAD'}},
+    {'id': '0008'}
+]
+
+
+def transaction(transaction_type, franchise='0003', **fields):
+    return Transaction.from_json(dict({'type': transaction_type, 'timestamp': '1608890400', 'franchise': franchise}, **fields))
+
+def test_rosters_export_is_indexed_both_ways(monkeypatch):
+    with StubMFLServer({'rosters': {'rosters': {'franchise': ROSTERS}}}) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        rosters = LeagueRosters.from_json(MFL(None, None, 12345, 2020).rosters())
+
+    assert len(rosters) == 3
+    assert rosters.owner('13631') == '0007'
+    assert rosters.owner('14136') is None
+    assert rosters.roster('0003').keys() == {'14209', '11247'}
+    assert rosters.roster('0008') == {}
+    assert rosters.get_entry('11247').status == 'INJURED_RESERVE'
+
+@pytest.mark.parametrize('applied,owners,changed', [
+    (transaction('TRADE', '0003', franchise2='0007', franchise1_gave_up='14209,DP_0_1,', franchise2_gave_up='13631,BB_10,'),
+     {'14209': '0007', '13631': '0003'}, {'14209', '13631'}),
+    (transaction('BBID_WAIVER', '0008', transaction='14136,|1.00|'), {'14136': '0008'}, {'14136'}),
+    (transaction('WAIVER', '0003', transaction='14136,|0|11247,'), {'14136': '0003', '11247': None}, {'14136', '11247'}),
+    (transaction('FREE_AGENT', '0003', transaction='14136,|14209,11247,'),
+     {'14136': '0003', '14209': None, '11247': None}, {'14136', '14209', '11247'}),
+    (transaction('AUCTION_BID', '0003', transaction='14136,|5|'), {'14136': None}, set())
+])
+def test_transactions_move_players(applied, owners, changed):
+    rosters = LeagueRosters.from_json(ROSTERS)
+
+    assert rosters.apply(applied) == changed
+    assert {player_id: rosters.owner(player_id) for player_id in owners} == owners
+    # applying it again changes nothing
+    assert rosters.apply(applied) == set()
+
+def test_ir_and_taxi_moves_change_status_and_keep_contract():
+    rosters = LeagueRosters.from_json(ROSTERS)
+
+    rosters.apply(transaction('IR', '0003', transaction='11247,|14209,'))
+    rosters.apply(transaction('TAXI', '0007', transaction='13631,|'))
+
+    assert rosters.get_entry('14209').status == 'INJURED_RESERVE'
+    assert rosters.get_entry('14209').salary == '5.00'
+    assert rosters.get_entry('11247').status == 'ROSTER'
+    assert rosters.get_entry('13631').status == 'ROSTER'
+
+def test_diff_reports_disagreements():
+    rosters = LeagueRosters.from_json(ROSTERS)
+    fresh = LeagueRosters.from_json(ROSTERS)
+    fresh.apply(transaction('FREE_AGENT', '0008', transaction='14136,|'))
+    fresh.apply(transaction('TAXI', '0007', transaction='13631,|'))
+
+    assert rosters.diff(fresh) == {
+        '14136': (None, ('0008', 'ROSTER')),
+        '13631': (('0007', 'TAXI_SQUAD'), ('0007', 'ROSTER'))
+    }
+    assert fresh.diff(fresh) == {}
+
+def test_index_writes_only_moved_players_and_reloads():
+    storage = MemoryStorage()
+    index = RosterIndex(storage)
+    assert index.replace(LeagueRosters.from_json(ROSTERS)) == {
+        '14209': (None, ('0003', 'ROSTER')),
+        '11247': (None, ('0003', 'INJURED_RESERVE')),
+        '13631': (None, ('0007', 'TAXI_SQUAD'))
+    }
+
+    changed = index.apply([
+        transaction('FREE_AGENT', '0008', transaction='|14136,'),
+        transaction('FREE_AGENT', '0003', transaction='14136,|14209,')
+    ])
+
+    assert changed == {'14136', '14209'}
+    reloaded = RosterIndex(storage)
+    assert reloaded.owner('14136') == '0003'
+    assert reloaded.owner('14209') is None
+    assert reloaded.rosters().diff(index.rosters()) == {}
+
+def test_index_is_reloaded_once_it_is_too_old(monkeypatch):
+    storage = MemoryStorage()
+    index = RosterIndex(storage, max_age=60)
+    index.rosters()
+
+    RosterIndex(storage).replace(LeagueRosters.from_json(ROSTERS))
+    assert index.owner('14209') is None
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 61)
+    assert index.owner('14209') == '0003'
+
+@pytest.fixture
+def memory_runtime(monkeypatch):
+    monkeypatch.setattr(runtime, '_clients', {'storage': MemoryStorage()})
+    monkeypatch.setenv('MFL_LEAGUEID', '12345')
+    roster_index.clear()
+    yield runtime.storage()
+    roster_index.clear()
+
+def test_get_transactions_applies_new_transactions(memory_runtime, monkeypatch):
+    timestamp = str(int(time.time()))
+
+    monkeypatch.setattr(get_transactions, 'MFL', StubMFL([
+        {'type': 'FREE_AGENT', 'timestamp': timestamp, 'franchise': '0007', 'transaction': '14136,|'}
+    ]))
+    def stream(transactions):
+        # reads every transaction like the real stages, without storing or formatting any
+        for _ in transactions:
+            pass
+        return iter(())
+
+    monkeypatch.setattr(get_transactions.dispatcher, 'stream', stream)
+    monkeypatch.setattr(publisher, 'publish', lambda messages: [])
+
+    get_transactions.handler({}, None)
+
+    assert roster_index.owner('14136') == '0007'
+    assert memory_runtime.get('rosters', '14136')['franchise_id'] == '0007'
+
+def test_get_rosters_replaces_index_and_reports_mismatches(memory_runtime, monkeypatch):
+    roster_index.apply([transaction('FREE_AGENT', '0008', transaction='14136,|')])
+
+    monkeypatch.setattr(get_rosters, 'MFL', StubMFL(rosters=lambda: ROSTERS))
+
+    body = get_rosters.handler({}, None)['body']
+
+    assert body['rostered_players'] == 3
+    assert body['mismatches']['14136'] == {'index': ('0008', 'ROSTER'), 'export': None}
+    assert roster_index.owner('14136') is None
+    assert roster_index.owner('14209') == '0003'
@@ -0,0 +1,88 @@
+import pytest
+import boto3
+import time
+import requests
+import get_transactions
+import send_bdfl_messages
+from bdfl import runtime
+from pymfl.mfl import MFL
+from stub_mfl_server import StubMFLServer
+from helpers import StubMFL, raw_transactions
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+@pytest.fixture
+def fresh_runtime():
+    runtime.reset()
+    yield runtime
+    runtime.reset()
+
+def test_clients_are_built_once_per_process(fresh_runtime):
+    assert runtime.mfl_session() is runtime.mfl_session()
+    assert runtime.groupme_session() is runtime.groupme_session()
+    assert runtime.mfl_session() is not runtime.groupme_session()
+
+def test_handler_calls_reuse_clients(setup_aws, fresh_runtime, monkeypatch):
+    mfl = StubMFL(raw_transactions(str(int(time.time()))))
+    monkeypatch.setattr(get_transactions, 'MFL', mfl)
+    monkeypatch.setenv('MFL_LEAGUEID', '12345')
+
+    clients_created = []
+
+    def count_client(class_attributes, **kwargs):
+        clients_created.append(class_attributes)
+
+    events = boto3._get_default_session().events
+    events.register('creating-client-class', count_client)
+    try:
+        for _ in range(3):
+            get_transactions.handler({}, None)
+    finally:
+        events.unregister('creating-client-class', count_client)
+
+    # one DynamoDB and one SQS client for all three invocations
+    assert len(clients_created) == 2
+    assert mfl.sessions[0] is runtime.mfl_session()
+    assert mfl.sessions == [mfl.sessions[0]] * 3
+
+def test_send_bdfl_messages_reuses_groupme_session(fresh_runtime, monkeypatch):
+    sessions = []
+
+    def send_messages(groupme, messages, deadline=None):
+        sessions.append(groupme._api)
+        return [{'message': message, 'delivered': True, 'delivered_at': 0.0} for message in messages]
+
+    monkeypatch.setattr(send_bdfl_messages, 'send_messages', send_messages)
+
+    for _ in range(2):
+        send_bdfl_messages.handler({'Records': [{'body': 'message'}]}, None)
+
+    assert sessions == [runtime.groupme_session()] * 2
+
+def test_mfl_session_applies_default_timeout(fresh_runtime, monkeypatch):
+    monkeypatch.setattr(runtime, 'MFL_TIMEOUT', (1, 0.2))
+
+    with StubMFLServer({'transactions': {'transactions': {}}}, delay=0.5) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        mfl = MFL('user', 'pass', 12345, 2020, session=runtime.mfl_session())
+
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            mfl.transactions('')
+
+def test_storage_backend_is_picked_by_setting(fresh_runtime, monkeypatch, tmp_path):
+    from bdfl.storage import MemoryStorage, SQLiteStorage
+
+    monkeypatch.setattr(runtime, 'STORAGE_BACKEND', 'memory')
+    assert isinstance(runtime.storage(), MemoryStorage)
+    assert runtime.storage() is runtime.storage()
+
+    runtime.reset()
+    monkeypatch.setattr(runtime, 'STORAGE_BACKEND', 'sqlite')
+    monkeypatch.setattr(runtime, 'SQLITE_PATH', str(tmp_path / 'bdfl.db'))
+    assert isinstance(runtime.storage(), SQLiteStorage)
+
+    runtime.reset()
+    monkeypatch.setattr(runtime, 'STORAGE_BACKEND', 'postgres')
+    with pytest.raises(ValueError):
+        runtime.storage()
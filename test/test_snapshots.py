@@ -0,0 +1,125 @@
+import pytest
+import time
+import boto3
+from hypothesis import given, strategies as st
+import get_franchises
+from bdfl.cache import LookupCache
+from bdfl.lookups import EntityLookup
+from bdfl.snapshots import LookupSnapshot, LookupSnapshots, SNAPSHOTS_TABLE
+from bdfl.storage import DynamoDBStorage, MemoryStorage
+from pymfl.models.franchise import Franchise
+from pymfl.models.league_franchises import LeagueFranchises
+
+PLAYERS = [
+    {'id': '14209', 'name': 'Josh Oliver', 'position': 'TE', 'team': 'JAC'},
+    {'id': '9431', 'name': 'Zach Ertz', 'position': 'TE', 'team': 'PHI'},
+    {'id': '13631', 'name': 'Nick Chubb', 'position': 'RB', 'team': 'CLE'},
+    {'id': '0501', 'name': 'Amon-Ra St. Brown', 'position': 'WR', 'team': 'DET'}
+]
+FIELDS = ['name', 'position', 'team']
+
+
+class CountingStorage(MemoryStorage):
+
+    def __init__(self):
+        super().__init__()
+        self.batch_gets = 0
+
+    def batch_get(self, table_name, keys, fields=None):
+        self.batch_gets += 1
+        return super().batch_get(table_name, keys, fields)
+
+def test_snapshot_finds_every_id_and_only_those():
+    snapshot = LookupSnapshot(LookupSnapshot.pack(PLAYERS, 'id', FIELDS, 1608890400))
+
+    assert len(snapshot) == 4
+    assert snapshot.built_at == 1608890400
+    for player in PLAYERS:
+        assert snapshot.get(player['id']) == {field: player[field] for field in FIELDS}
+    for missing_id in ['', '0', '1420', '142090', '99999', '0000000000']:
+        assert snapshot.get(missing_id) is None
+
+@given(st.dictionaries(
+    st.text(alphabet='0123456789', min_size=1, max_size=6),
+    st.text(alphabet=st.characters(blacklist_characters='\x1f', blacklist_categories=('Cs',)), max_size=20),
+    max_size=50
+))
+def test_snapshot_round_trips_any_names(names):
+    items = [{'id': primary_id, 'name': name} for primary_id, name in names.items()]
+    snapshot = LookupSnapshot(LookupSnapshot.pack(items, 'id', ['name'], 0))
+
+    assert {primary_id: snapshot.get(primary_id)['name'] for primary_id in names} == names
+
+def test_unknown_data_is_rejected():
+    with pytest.raises(ValueError):
+        LookupSnapshot(b'\0' * 64)
+
+def test_published_snapshot_serves_lookups_without_reads():
+    storage = CountingStorage()
+    LookupSnapshots(storage).publish('players', PLAYERS, 'id', FIELDS)
+
+    entity_lookup = EntityLookup(storage, LookupCache(60, 100))
+    entity_lookup.prefetch('players', ['14209', '13631'])
+
+    assert entity_lookup.get_field('players', 'name', '14209') == 'Josh Oliver'
+    assert entity_lookup.get_field('players', 'team', '0501') == 'DET'
+    assert storage.batch_gets == 0
+
+def test_missing_ids_and_stale_snapshots_fall_back_to_the_table(monkeypatch):
+    storage = CountingStorage()
+    with storage.batch_writer('players') as batch:
+        batch.put({'id': '14136', 'name': 'Justin Jefferson', 'position': 'WR', 'team': 'MIN'})
+        batch.put({'id': '14209', 'name': 'Josh Oliver', 'position': 'TE', 'team': 'BAL'})
+    LookupSnapshots(storage).publish('players', PLAYERS, 'id', FIELDS, built_at=time.time() - 86400)
+
+    entity_lookup = EntityLookup(storage, LookupCache(60, 100))
+    entity_lookup.prefetch('players', ['14209', '14136'])
+    assert entity_lookup.get_field('players', 'name', '14136') == 'Justin Jefferson'
+    assert entity_lookup.get_field('players', 'team', '14209') == 'JAC'
+    assert storage.batch_gets == 1
+
+    stale = EntityLookup(storage, LookupCache(60, 100))
+    monkeypatch.setattr(time, 'time', lambda: storage.get(SNAPSHOTS_TABLE, 'players')['version'] + 3 * 86400)
+    assert stale.get_field('players', 'team', '14209') == 'BAL'
+
+def test_older_snapshot_does_not_replace_newer():
+    storage = MemoryStorage()
+    snapshots = LookupSnapshots(storage)
+
+    assert snapshots.publish('players', PLAYERS, 'id', FIELDS, built_at=200)
+    assert not snapshots.publish('players', PLAYERS[:1], 'id', FIELDS, built_at=100)
+    assert storage.get(SNAPSHOTS_TABLE, 'players')['version'] == 200
+
+def test_corrupt_snapshot_is_ignored():
+    storage = MemoryStorage()
+    storage.put_if_greater(SNAPSHOTS_TABLE, {'name': 'players', 'version': int(time.time()), 'data': 'bm90IGEgc25hcHNob3Q='}, 'version')
+
+    assert LookupSnapshots(storage).get('players') is None
+
+def test_get_franchises_publishes_snapshot(monkeypatch):
+    storage = MemoryStorage()
+    snapshots = LookupSnapshots(storage)
+    monkeypatch.setattr(get_franchises, 'lookup_snapshots', snapshots)
+
+    franchises = LeagueFranchises()
+    franchises.add_franchise(Franchise('0003', 'Jeff Janis Fan Club'))
+    get_franchises.publish_franchises_snapshot(franchises)
+
+    assert LookupSnapshots(storage).get('franchises').get('0003') == {'name': 'Jeff Janis Fan Club'}
+
+def test_snapshot_items_round_trip():
+    snapshot = LookupSnapshot(LookupSnapshot.pack(PLAYERS, 'id', FIELDS, 1608890400))
+
+    assert dict(snapshot.items()) == {player['id']: {field: player[field] for field in FIELDS} for player in PLAYERS}
+
+def test_storage_failures_other_than_decoding_are_not_swallowed():
+    class BrokenStorage(MemoryStorage):
+        def get(self, table_name, key):
+            raise RuntimeError('bug')
+
+    with pytest.raises(RuntimeError):
+        LookupSnapshots(BrokenStorage()).get('players')
+
+@pytest.mark.parametrize('dynamodb_tables', [['players']], indirect=True)
+def test_unreachable_snapshot_table_is_ignored(dynamodb_tables):
+    assert LookupSnapshots(DynamoDBStorage(boto3.resource('dynamodb'))).get('players') is None
@@ -0,0 +1,99 @@
+import pytest
+import boto3
+from collections import Counter
+from moto import mock_sqs
+from bdfl.sqs import SQSPublisher, all_published
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+@pytest.fixture
+def sqs_client():
+    with mock_sqs():
+        sqs_client = boto3.client('sqs')
+        sqs_client.create_queue(QueueName='BDFLMessageQueue')
+        yield sqs_client
+
+@pytest.fixture
+def sqs_calls(sqs_client):
+    calls = Counter()
+
+    def count_call(model, **kwargs):
+        calls[model.name] += 1
+
+    sqs_client.meta.events.register('before-call.sqs', count_call)
+
+    yield calls
+
+def receive_all(sqs_client, queue_url):
+    bodies = []
+
+    while True:
+        response = sqs_client.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)
+        if 'Messages' not in response:
+            return bodies
+        bodies += [message['Body'] for message in response['Messages']]
+
+def test_publish_batches_messages_and_resolves_queue_url_once(sqs_client, sqs_calls):
+    publisher = SQSPublisher('BDFLMessageQueue', sqs_client)
+    messages = [f'message {i}' for i in range(25)]
+
+    results = publisher.publish(messages)
+    publisher.publish(['one more'])
+
+    assert [result['message'] for result in results] == messages
+    assert all_published(results)
+    assert sqs_calls['GetQueueUrl'] == 1
+    assert sqs_calls['SendMessageBatch'] == 4
+    assert sorted(receive_all(sqs_client, publisher.queue_url)) == sorted(messages + ['one more'])
+
+def test_publish_with_queue_url_skips_get_queue_url(sqs_client, sqs_calls):
+    queue_url = sqs_client.get_queue_url(QueueName='BDFLMessageQueue')['QueueUrl']
+    sqs_calls.clear()
+    publisher = SQSPublisher('BDFLMessageQueue', sqs_client, queue_url=queue_url)
+
+    assert all_published(publisher.publish(['a']))
+    assert sqs_calls['GetQueueUrl'] == 0
+
+def test_publish_retries_only_failed_entries(sqs_client, monkeypatch):
+    publisher = SQSPublisher('BDFLMessageQueue', sqs_client)
+    send_message_batch = sqs_client.send_message_batch
+    sent_entries = []
+
+    def flaky_send_message_batch(QueueUrl, Entries):
+        sent_entries.append([entry['Id'] for entry in Entries])
+        if len(sent_entries) > 1:
+            return send_message_batch(QueueUrl=QueueUrl, Entries=Entries)
+
+        response = send_message_batch(QueueUrl=QueueUrl, Entries=Entries[1:])
+        response['Failed'] = [{'Id': Entries[0]['Id'], 'Code': 'InternalError', 'SenderFault': False}]
+        return response
+
+    monkeypatch.setattr(sqs_client, 'send_message_batch', flaky_send_message_batch)
+    monkeypatch.setattr(SQSPublisher, 'MAX_RETRIES', 1)
+    monkeypatch.setattr('time.sleep', lambda secs: None)
+
+    results = publisher.publish(['a', 'b', 'c'])
+
+    assert sent_entries == [['0', '1', '2'], ['0']]
+    assert all_published(results)
+
+def test_sender_fault_is_reported_not_retried(sqs_client, monkeypatch):
+    publisher = SQSPublisher('BDFLMessageQueue', sqs_client)
+    calls = []
+
+    def rejecting_send_message_batch(QueueUrl, Entries):
+        calls.append(Entries)
+        return {
+            'Successful': [],
+            'Failed': [{'Id': entry['Id'], 'Code': 'InvalidMessageContents', 'SenderFault': True} for entry in Entries]
+        }
+
+    monkeypatch.setattr(sqs_client, 'send_message_batch', rejecting_send_message_batch)
+
+    results = publisher.publish(['bad'])
+
+    assert len(calls) == 1
+    assert results[0]['message_id'] is None
+    assert results[0]['error'].startswith('InvalidMessageContents')
+    assert not all_published(results)
@@ -0,0 +1,91 @@
+import pytest
+import boto3
+from concurrent.futures import ThreadPoolExecutor
+from moto import mock_dynamodb2
+from bdfl.storage import TABLE_KEYS, Storage, DynamoDBStorage, MemoryStorage, SQLiteStorage
+from helpers import create_table
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+@pytest.fixture(params=['dynamodb', 'memory', 'sqlite'])
+def storage(request, tmp_path):
+    if request.param == 'memory':
+        yield MemoryStorage()
+    elif request.param == 'sqlite':
+        storage = SQLiteStorage(str(tmp_path / 'bdfl.db'))
+        yield storage
+        storage.close()
+    else:
+        with mock_dynamodb2():
+            dynamodb_client = boto3.client('dynamodb')
+            for table_name in TABLE_KEYS:
+                create_table(dynamodb_client, table_name)
+            yield DynamoDBStorage(boto3.resource('dynamodb'))
+
+def player(player_id, team='JAC'):
+    return {'id': player_id, 'name': f'Player {player_id}', 'position': 'TE', 'team': team}
+
+def test_batch_get_projects_fields_and_skips_missing_keys(storage):
+    with storage.batch_writer('players') as batch:
+        for i in range(150):
+            batch.put(player(str(i)))
+
+    items = storage.batch_get('players', ['3', '149', '3', 'missing'], ['name'])
+
+    assert items == {'3': {'id': '3', 'name': 'Player 3'}, '149': {'id': '149', 'name': 'Player 149'}}
+    assert len(storage.batch_get('players', [str(i) for i in range(150)])) == 150
+    assert storage.get('players', '7') == player('7')
+    assert storage.get('players', 'missing') is None
+
+def test_batch_writer_puts_and_deletes(storage):
+    with storage.batch_writer('players') as batch:
+        batch.put(player('1'))
+        batch.put(player('2'))
+
+    with storage.batch_writer('players') as batch:
+        batch.put(player('1', 'BAL'))
+        batch.delete('2')
+
+    assert sorted(storage.scan('players', ['team']), key=lambda item: item['id']) == [{'id': '1', 'team': 'BAL'}]
+
+def test_insert_if_absent_claims_a_key_once(storage):
+    trade = {'timestamp': '1608890400', 'comments': 'test', 'franchise1_assets': ['a', 'b']}
+
+    assert storage.insert_if_absent('trades', trade)
+    assert not storage.insert_if_absent('trades', dict(trade, comments='other'))
+    assert storage.get('trades', '1608890400') == trade
+
+def test_put_if_greater_only_moves_forward(storage):
+    assert storage.put_if_greater('checkpoints', {'name': 'waivers', 'value': 10}, 'value')
+    assert not storage.put_if_greater('checkpoints', {'name': 'waivers', 'value': 10}, 'value')
+    assert not storage.put_if_greater('checkpoints', {'name': 'waivers', 'value': 5}, 'value')
+    assert storage.put_if_greater('checkpoints', {'name': 'waivers', 'value': 11}, 'value')
+    assert int(storage.get('checkpoints', 'waivers')['value']) == 11
+
+def test_concurrent_inserts_claim_a_key_once(storage, atomic_dynamodb_writes):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        claimed = list(pool.map(lambda i: storage.insert_if_absent('waivers', {'key': 'k', 'owner': str(i)}), range(8)))
+
+    assert claimed.count(True) == 1
+
+def test_sqlite_storage_persists_and_indexes_keys(tmp_path):
+    path = str(tmp_path / 'bdfl.db')
+    storage = SQLiteStorage(path)
+    storage.insert_if_absent('waivers', {'key': 'k', 'franchise_id': '0003'})
+    storage.close()
+
+    storage = SQLiteStorage(path)
+    plan = storage._connection.execute('EXPLAIN QUERY PLAN SELECT item FROM "waivers" WHERE key = ?', ('k',)).fetchall()
+
+    assert storage.get('waivers', 'k') == {'key': 'k', 'franchise_id': '0003'}
+    assert 'PRIMARY KEY' in plan[0][-1]
+    storage.close()
+
+def test_backend_must_implement_every_operation():
+    class NoWrites(Storage):
+        def get(self, table_name, key):
+            return None
+
+    with pytest.raises(TypeError):
+        NoWrites()
@@ -0,0 +1,107 @@
+import json
+import pytest
+from hypothesis import given, strategies as st
+from pymfl.mfl import MFL
+from pymfl.http_cache import ResponseCache
+from pymfl.streaming import iter_json_array
+from stub_mfl_server import StubMFLServer
+
+players_strategy = st.lists(st.fixed_dictionaries({
+    'id': st.text(alphabet='0123456789', min_size=1, max_size=5),
+    'name': st.text(max_size=20),
+    'team': st.text(alphabet='ABCéü🏈 ,[]{}"', max_size=4)
+}), max_size=20)
+
+RESPONSES = {
+    'players': {'version': '1.0', 'players': {'timestamp': '1608890400', 'player': [
+        {'id': '14209', 'name': 'Oliver, Josh', 'position': 'TE', 'team': 'JAC', 'status': 'R'},
+        {'id': '11247', 'name': 'Ertz, Zach', 'position': 'TE', 'team': 'PHI', 'status': 'R'}
+    ]}, 'encoding': 'utf-8'},
+    'rosters': {'rosters': {'franchise': [
+        {'id': '0003', 'player': [{'id': '14209', 'status': 'ROSTER'}, {'id': '11247', 'status': 'IR'}]},
+        {'id': '0004', 'player': {'id': '13604', 'status': 'ROSTER'}}
+    ]}}
+}
+
+
+def chunked(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@given(players_strategy, st.integers(min_value=1, max_value=50))
+def test_streamed_elements_match_json_loads(players, chunk_size):
+    document = json.dumps({'players': {'timestamp': '1', 'player': players}}, ensure_ascii=False)
+
+    streamed = list(iter_json_array(chunked(document, chunk_size), ('players', 'player')))
+
+    assert streamed == players
+
+def test_fields_are_projected():
+    document = json.dumps(RESPONSES['players'])
+
+    streamed = list(iter_json_array(chunked(document, 7), ('players', 'player'), ['id', 'team']))
+
+    assert streamed == [{'id': '14209', 'team': 'JAC'}, {'id': '11247', 'team': 'PHI'}]
+
+def test_single_object_and_missing_path():
+    assert list(iter_json_array(['{"players": {"player": {"id": "1"}}}'], ('players', 'player'))) == [{'id': '1'}]
+    assert list(iter_json_array(['{"players": {"timestamp": "1"}}'], ('players', 'player'))) == []
+
+def test_only_keys_at_their_depth_are_matched():
+    document = json.dumps({
+        'note': 'see "players": {"player": [1]}',
+        'league': {'players': {'player': [{'id': 'nested'}]}},
+        'counts': [1, -2.5e3, True, None, {'player': 'x'}, '\\"]}'],
+        'players': {'timestamp': 1, 'player': [{'id': '1', 'players': {'player': 'inner'}}]}
+    })
+
+    for chunk_size in (1, 3, 1000):
+        assert list(iter_json_array(chunked(document, chunk_size), ('players', 'player'))) == [
+            {'id': '1', 'players': {'player': 'inner'}}
+        ]
+
+def test_key_nested_elsewhere_is_not_found():
+    document = json.dumps({'error': {'players': {'player': [{'id': '1'}]}}, 'players': {'timestamp': 1}})
+
+    assert list(iter_json_array([document], ('players', 'player'))) == []
+
+@given(st.dictionaries(st.text(max_size=8), st.recursive(
+    st.none() | st.booleans() | st.floats(allow_nan=False) | st.text(alphabet='ab"\\{}[],: é', max_size=6),
+    lambda children: st.lists(children, max_size=3) | st.dictionaries(st.text(max_size=3), children, max_size=3),
+    max_leaves=10
+), max_size=4), players_strategy, st.integers(min_value=1, max_value=50))
+def test_keys_before_the_path_are_skipped(decoys, players, chunk_size):
+    decoys.pop('players', None)
+    document = json.dumps(dict(decoys, players={'player': players}), ensure_ascii=False)
+
+    assert list(iter_json_array(chunked(document, chunk_size), ('players', 'player'))) == players
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    with StubMFLServer(RESPONSES) as server:
+        monkeypatch.setattr(MFL, '_base_url', server.base_url)
+        yield server
+
+def test_iter_players_streams_export(stub_server):
+    players = MFL('user', 'pass', 12345, 2020).iter_players(['id', 'name'])
+
+    assert list(players) == [{'id': '14209', 'name': 'Oliver, Josh'}, {'id': '11247', 'name': 'Ertz, Zach'}]
+
+def test_iter_rosters_flattens_franchises(stub_server):
+    rosters = MFL('user', 'pass', 12345, 2020).iter_rosters(['id', 'franchise', 'status'])
+
+    assert list(rosters) == [
+        {'id': '14209', 'franchise': '0003', 'status': 'ROSTER'},
+        {'id': '11247', 'franchise': '0003', 'status': 'IR'},
+        {'id': '13604', 'franchise': '0004', 'status': 'ROSTER'}
+    ]
+
+def test_streamed_export_is_cached(stub_server, tmp_path):
+    cache = ResponseCache(str(tmp_path))
+
+    first = list(MFL('user', 'pass', 12345, 2020, cache=cache).iter_players())
+    second = list(MFL('user', 'pass', 12345, 2020, cache=cache).iter_players())
+
+    assert first == second == RESPONSES['players']['players']['player']
+    assert len(stub_server.requests) == 1
+    assert MFL('user', 'pass', 12345, 2020, cache=cache).players() == first
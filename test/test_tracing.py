@@ -0,0 +1,140 @@
+import json
+import pytest
+import boto3
+from moto import mock_sqs
+import send_bdfl_messages
+from bdfl import tracing
+from bdfl.sqs import SQSPublisher
+from bdfl.tracing import LatencyHistogram, LatencyReport, TracedMessage
+from groupme.packing import pack_messages, pack_messages_with_sources
+import os
+os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+def lambda_record(message):
+    """An SQS message as the Lambda SQS event source hands it over"""
+    return {
+        'body': message['Body'],
+        'messageAttributes': {
+            name: {'stringValue': value['StringValue'], 'dataType': value['DataType']}
+            for name, value in message.get('MessageAttributes', {}).items()
+        }
+    }
+
+def emitted(capsys, record_type):
+    return [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+        if line.startswith('{') and json.loads(line)['type'] == record_type
+    ]
+
+def test_trace_context_travels_as_sqs_message_attributes():
+    trace = tracing.trace_context('TRADE', '1608890400', '0003')
+    message = TracedMessage('🚨TRADE COMPLETED🚨', trace)
+
+    with mock_sqs():
+        sqs_client = boto3.client('sqs')
+        queue_url = sqs_client.create_queue(QueueName='BDFLMessageQueue')['QueueUrl']
+        SQSPublisher('BDFLMessageQueue', sqs_client).publish([message, 'untraced'])
+
+        received = sqs_client.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10, MessageAttributeNames=['All'])
+        records = {record['body']: record for record in map(lambda_record, received['Messages'])}
+
+    traced_back = tracing.trace_from_record(records['🚨TRADE COMPLETED🚨'])
+    assert traced_back['trace_id'] == 'TRADE-1608890400-0003'
+    assert traced_back['mfl_timestamp'] == 1608890400
+    assert traced_back['detected_at'] == pytest.approx(trace['detected_at'], abs=0.001)
+    assert traced_back['detected_at'] <= traced_back['enqueued_at']
+    assert tracing.trace_from_record(records['untraced']) is None
+
+def test_joined_message_keeps_oldest_trace():
+    lines = [
+        TracedMessage('a', tracing.trace_context('IR', '1608890500', '0003')),
+        TracedMessage('b', tracing.trace_context('IR', '1608890400', '0007')),
+        'header'
+    ]
+
+    assert tracing.oldest_trace(lines)['trace_id'] == 'IR-1608890400-0007'
+    assert tracing.oldest_trace(['header']) is None
+    assert tracing.traced('header', None) == 'header'
+
+def test_latency_record_splits_hops():
+    trace = {'trace_id': 'TRADE-100-0003', 'mfl_timestamp': 100, 'detected_at': 400.25, 'enqueued_at': 400.75}
+
+    assert tracing.latency_record(trace, 402.0) == {
+        'type': 'notification_latency',
+        'trace_id': 'TRADE-100-0003',
+        'mfl_to_detect': 300.25,
+        'detect_to_enqueue': 0.5,
+        'enqueue_to_post': 1.25,
+        'mfl_to_post': 302.0
+    }
+
+def test_notification_is_posted_with_its_last_post():
+    messages = ['first\nnotification', 'second', 'third']
+    posts = [('first', [0]), ('notification\n\nsecond', [0, 1]), ('third', [2])]
+    statuses = [
+        {'delivered': True, 'delivered_at': 10.0},
+        {'delivered': True, 'delivered_at': 11.0},
+        {'delivered': False, 'delivered_at': None}
+    ]
+
+    assert send_bdfl_messages.notification_posted_at(len(messages), posts, statuses) == [11.0, 11.0, None]
+
+def test_pack_messages_with_sources_names_each_posts_notifications():
+    posts = pack_messages_with_sources(['a' * 8, 'b' * 8, 'c' * 8], 20)
+
+    assert posts == [('a' * 8, [0]), ('b' * 8 + '\n\n' + 'c' * 8, [1, 2])]
+    assert [post for post, _ in posts] == pack_messages(['a' * 8, 'b' * 8, 'c' * 8], 20)
+
+def test_send_handler_emits_latency_per_posted_notification(monkeypatch, capsys):
+    def send_messages(groupme, messages, deadline=None):
+        return [{'message': message, 'delivered': True, 'delivered_at': 1608890700.5} for message in messages]
+
+    monkeypatch.setattr(send_bdfl_messages, 'send_messages', send_messages)
+
+    trace = {'trace_id': 'TRADE-1608890400-0003', 'mfl_timestamp': 1608890400, 'detected_at': 1608890690.0, 'enqueued_at': 1608890690.5}
+    record = {'body': 'trade', 'messageAttributes': {
+        name: {'stringValue': value['StringValue'], 'dataType': value['DataType']}
+        for name, value in tracing.message_attributes(trace, trace['enqueued_at']).items()
+    }}
+
+    send_bdfl_messages.handler({'Records': [record, {'body': 'untraced'}]}, None)
+
+    assert emitted(capsys, 'notification_latency') == [{
+        'type': 'notification_latency',
+        'trace_id': 'TRADE-1608890400-0003',
+        'mfl_to_detect': 290.0,
+        'detect_to_enqueue': 0.5,
+        'enqueue_to_post': 10.0,
+        'mfl_to_post': 300.5
+    }]
+
+def test_span_emits_duration(capsys):
+    with tracing.span('get_trades', messages=3):
+        pass
+
+    (span,) = emitted(capsys, 'span')
+    assert span['name'] == 'get_trades' and span['messages'] == 3 and span['duration_ms'] >= 0
+
+def test_histogram_percentiles_and_buckets():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.add(value)
+
+    assert [histogram.percentile(percent) for percent in [50, 90, 99, 100]] == [50, 90, 99, 100]
+    assert dict(histogram.buckets())[60] == 30
+    assert LatencyHistogram().percentile(50) is None
+
+def test_report_reads_records_from_log_lines():
+    report = LatencyReport()
+    report.add_lines([
+        '2020-12-25T10:00:00.000Z\tabc-123\tINFO\t' + json.dumps({'type': 'notification_latency', 'trace_id': 'x', 'mfl_to_post': 120.0, 'enqueue_to_post': 2.0}),
+        json.dumps({'type': 'span', 'name': 'get_trades', 'start': 0, 'duration_ms': 1500.0}),
+        'number of sent messages:  1',
+        '{not json'
+    ])
+
+    assert report.hops['mfl_to_post'].percentile(50) == 120.0
+    assert len(report.hops['mfl_to_detect']) == 0
+    assert report.spans['get_trades'].percentile(99) == 1.5
+    assert any(line.startswith('mfl_to_post') and '120.0s' in line for line in report.lines())
@@ -0,0 +1,111 @@
+import pytest
+import random
+import threading
+import time
+from bdfl.workers import imap_ordered
+
+
+def test_results_keep_the_order_of_items():
+    def slow_square(number):
+        time.sleep(random.uniform(0, 0.01))
+        return number * number
+
+    assert list(imap_ordered(slow_square, range(50), max_workers=8)) == [number * number for number in range(50)]
+
+def test_empty_items_yield_nothing():
+    assert list(imap_ordered(lambda item: item, [], max_workers=8)) == []
+
+def test_no_more_than_max_workers_calls_run_at_once():
+    lock = threading.Lock()
+    running = [0]
+    most_running = [0]
+
+    def call(item):
+        with lock:
+            running[0] += 1
+            most_running[0] = max(most_running[0], running[0])
+        time.sleep(0.005)
+        with lock:
+            running[0] -= 1
+        return item
+
+    assert list(imap_ordered(call, range(30), max_workers=4)) == list(range(30))
+    assert 1 < most_running[0] <= 4
+
+def test_one_worker_runs_inline():
+    threads = list(imap_ordered(lambda item: threading.current_thread(), range(3), max_workers=1))
+
+    assert threads == [threading.current_thread()] * 3
+
+def counted(items, read):
+    for item in items:
+        read.append(item)
+        yield item
+
+def test_reads_no_further_than_the_buffer():
+    read = []
+    head_done = threading.Event()
+
+    def call(item):
+        if item == 0:
+            head_done.wait(5)
+        return item * 2
+
+    results = imap_ordered(call, counted(range(100), read), max_workers=2, buffer_size=4)
+    threading.Timer(0.1, head_done.set).start()
+
+    assert read == []
+    assert next(results) == 0
+    assert len(read) == 4
+
+    results.close()
+    assert len(read) == 4
+
+def test_yields_a_done_head_without_filling_the_buffer():
+    read = []
+
+    def slow_source():
+        for item in counted(range(100), read):
+            yield item
+            time.sleep(0.05)
+
+    results = imap_ordered(lambda item: item * 2, slow_source(), max_workers=2, buffer_size=4)
+
+    assert next(results) == 0
+    assert len(read) <= 2
+    results.close()
+
+def test_submits_nothing_after_a_failed_call():
+    read = []
+
+    def call(item):
+        if item == 1:
+            raise ValueError(item)
+        return item
+
+    def slow_source():
+        for item in counted(range(100), read):
+            yield item
+            time.sleep(0.02)
+
+    results = []
+    with pytest.raises(ValueError):
+        for result in imap_ordered(call, slow_source(), max_workers=2, buffer_size=50):
+            results.append(result)
+
+    assert results == [0]
+    assert len(read) <= 3
+
+def test_raises_the_first_failed_item_in_order():
+    def call(item):
+        if item in (3, 5):
+            raise ValueError(item)
+        return item
+
+    results = []
+    with pytest.raises(ValueError) as error:
+        for result in imap_ordered(call, range(20), max_workers=4):
+            results.append(result)
+
+    assert error.value.args == (3,)
+    assert results == [0, 1, 2]